@@ -1,8 +1,92 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent
 REPO_ROOT = BASE_DIR.parent.parent  # points to resume-optimizer/
-WORK_DIR = REPO_ROOT / ".work"      # temp storage for uploaded/edited docs
-WORK_DIR.mkdir(parents=True, exist_ok=True)
+WORK_DIR = Path(os.environ.get("RESUME_WORK_DIR", REPO_ROOT / ".work"))  # uploaded/edited docs (created at startup)
 
 MAX_UPLOAD_MB = 10
+
+# checks of an upload before it is parsed (services/upload_check.py): zip parts,
+# their total inflated size, the inflation ratio of parts over 1 MB, and the
+# size and element count of word/document.xml
+UPLOAD_MAX_ENTRIES = int(os.environ.get("RESUME_UPLOAD_MAX_ENTRIES", 1000))
+UPLOAD_MAX_UNCOMPRESSED_MB = int(os.environ.get("RESUME_UPLOAD_MAX_UNCOMPRESSED_MB", 64))
+UPLOAD_MAX_RATIO = int(os.environ.get("RESUME_UPLOAD_MAX_RATIO", 200))
+UPLOAD_MAX_XML_MB = int(os.environ.get("RESUME_UPLOAD_MAX_XML_MB", 8))
+UPLOAD_MAX_ELEMENTS = int(os.environ.get("RESUME_UPLOAD_MAX_ELEMENTS", 250_000))
+
+# .work garbage collection (services/reaper.py)
+REAPER_ENABLED = os.environ.get("RESUME_REAPER_ENABLED", "1") == "1"
+WORK_TTL_SECONDS = int(os.environ.get("RESUME_WORK_TTL_SECONDS", 30 * 24 * 3600))  # by last access
+WORK_MAX_BYTES = int(os.environ.get("RESUME_WORK_MAX_BYTES", 5 * 1024 ** 3))        # LRU eviction above this
+STRAY_FILE_GRACE_SECONDS = 3600      # uploaded copies / tmp.docx left next to current.docx
+REAPER_INTERVAL_SECONDS = 600        # pause between full passes
+REAPER_BATCH_SIZE = 200              # resume dirs examined per step
+
+# document storage (services/backends.py): "local" | "sqlite" | "s3"
+STORAGE_BACKEND = os.environ.get("RESUME_STORAGE_BACKEND", "local")
+STORAGE_SQLITE_PATH = Path(os.environ.get("RESUME_STORAGE_SQLITE_PATH", WORK_DIR / "blobs.sqlite3"))
+S3_BUCKET = os.environ.get("RESUME_S3_BUCKET", "resume-optimizer")
+S3_PREFIX = os.environ.get("RESUME_S3_PREFIX", "resumes/")
+S3_ENDPOINT_URL = os.environ.get("RESUME_S3_ENDPOINT_URL")  # e.g. http://localhost:9000 for MinIO
+
+# resume metadata index (services/meta_index.py)
+META_INDEX_PATH = Path(os.environ.get("RESUME_META_INDEX_PATH", WORK_DIR / "index.sqlite3"))
+
+# inverted index for ranking many resumes against one JD (services/inverted_index.py)
+RANK_INDEX_PATH = Path(os.environ.get("RESUME_RANK_INDEX_PATH", WORK_DIR / "postings.sqlite3"))
+
+# page-fit estimate after edits (services/layout.py)
+LAYOUT_TARGET_PAGES = int(os.environ.get("RESUME_LAYOUT_TARGET_PAGES", 1))
+
+# write-behind of patches (services/hot_docs.py): edits go to an in-memory
+# document that is written once the resume is quiet (or after a max delay);
+# one worker process only
+WRITE_BEHIND_ENABLED = os.environ.get("RESUME_WRITE_BEHIND", "0") == "1"
+WRITE_BEHIND_QUIET_SECONDS = float(os.environ.get("RESUME_WRITE_BEHIND_QUIET_SECONDS", 2.0))
+WRITE_BEHIND_MAX_DELAY_SECONDS = float(os.environ.get("RESUME_WRITE_BEHIND_MAX_DELAY_SECONDS", 10.0))
+HOT_DOCS_MAX = int(os.environ.get("RESUME_HOT_DOCS_MAX", 256))   # parsed documents kept per worker
+
+# parsed copies of the last committed versions, kept per worker for dry runs
+# and outlines without a re-parse (services/hot_docs.py): ~5 MB each; 0 = none
+PARSED_DOCS_MAX = int(os.environ.get("RESUME_PARSED_DOCS_MAX", 8))
+
+# compact per-version outlines for the read paths (services/outline.py)
+OUTLINE_CACHE_MAX = int(os.environ.get("RESUME_OUTLINE_CACHE_MAX", 4096))
+# ... and the copy every worker process shares (services/outline_store.py)
+OUTLINE_SHARED_ENABLED = os.environ.get("RESUME_OUTLINE_SHARED", "1") == "1"
+OUTLINE_SHARED_PATH = Path(os.environ.get("RESUME_OUTLINE_SHARED_PATH", WORK_DIR / "outlines.sqlite3"))
+OUTLINE_SHARED_MAX_BYTES = int(os.environ.get("RESUME_OUTLINE_SHARED_MAX_BYTES", 64 * 1024 ** 2))
+
+# GET /resume/{id}/events (services/events.py): versions committed by other
+# workers are noticed by polling this often; comments keep idle streams open
+EVENTS_POLL_SECONDS = float(os.environ.get("RESUME_EVENTS_POLL_SECONDS", 1.0))
+EVENTS_KEEPALIVE_SECONDS = float(os.environ.get("RESUME_EVENTS_KEEPALIVE_SECONDS", 15.0))
+
+# POST /resume/bulk (services/bulk.py): processes parsing uploaded documents,
+# and how many documents may be in flight at once (read ahead of the pool)
+BULK_WORKERS = int(os.environ.get("RESUME_BULK_WORKERS", min(os.cpu_count() or 1, 8)))
+BULK_MAX_IN_FLIGHT = int(os.environ.get("RESUME_BULK_MAX_IN_FLIGHT", 2 * BULK_WORKERS))
+
+# Idempotency-Key on uploads and edits (services/idempotency.py): responses
+# kept this long / this many, shared by the workers; duplicates of a request
+# still running wait up to WAIT seconds; a claim older than LOCK is abandoned
+IDEMPOTENCY_ENABLED = os.environ.get("RESUME_IDEMPOTENCY", "1") == "1"
+IDEMPOTENCY_PATH = Path(os.environ.get("RESUME_IDEMPOTENCY_PATH", WORK_DIR / "idempotency.sqlite3"))
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get("RESUME_IDEMPOTENCY_TTL_SECONDS", 24 * 3600))
+IDEMPOTENCY_MAX_KEYS = int(os.environ.get("RESUME_IDEMPOTENCY_MAX_KEYS", 100_000))
+IDEMPOTENCY_WAIT_SECONDS = float(os.environ.get("RESUME_IDEMPOTENCY_WAIT_SECONDS", 30.0))
+IDEMPOTENCY_LOCK_SECONDS = float(os.environ.get("RESUME_IDEMPOTENCY_LOCK_SECONDS", 300.0))
+
+# run the parse / edit / save of PATCHes in worker processes (services/offload.py);
+# not combined with write-behind, whose documents live in this process
+OFFLOAD_ENABLED = os.environ.get("RESUME_OFFLOAD", "0") == "1"
+OFFLOAD_WORKERS = int(os.environ.get("RESUME_OFFLOAD_WORKERS", os.cpu_count() or 1))
+
+# import every service at startup instead of on first use (main.warmup)
+WARMUP = os.environ.get("RESUME_WARMUP", "0") == "1"
+
+
+def ensure_work_dir():
+    WORK_DIR.mkdir(parents=True, exist_ok=True)
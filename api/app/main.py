@@ -1,19 +1,99 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .config import REAPER_ENABLED, WRITE_BEHIND_ENABLED, OFFLOAD_ENABLED, WARMUP, ensure_work_dir
 from .routers.resume import router as resume_router
+from .services.lazy import lazy_import, load_all
+from .services.idempotency import IdempotencyMiddleware
 
-app = FastAPI(title="Resume Optimizer API")
+# the background services pull in the indexes / python-docx: load them when started
+reaper = lazy_import(".services.reaper", __package__)
+hot_docs = lazy_import(".services.hot_docs", __package__)
+bulk = lazy_import(".services.bulk", __package__)
+offload = lazy_import(".services.offload", __package__)
 
-# ✅ Allow your React dev server to call this API
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:5173",  # Vite dev server
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-app.include_router(resume_router)
\ No newline at end of file
+def warmup():
+    """
+    Import every lazily loaded service and parse the blank template once,
+    so the first request doesn't pay for it.
+    """
+    load_all()
+    from docx import Document
+    Document()
+
+
+def create_app(warm: bool | None = None) -> FastAPI:
+    """
+    App factory (uvicorn --factory app.main:create_app). warm: run warmup()
+    at startup; defaults to RESUME_WARMUP.
+    """
+    app = FastAPI(title="Resume Optimizer API")
+
+    # inside CORS, so replayed responses get this request's CORS headers
+    app.add_middleware(IdempotencyMiddleware)
+
+    # ✅ Allow your React dev server to call this API
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            "http://localhost:5173",  # Vite dev server
+        ],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    app.include_router(resume_router)
+
+    @app.on_event("startup")
+    def _prepare():
+        ensure_work_dir()
+        if WARMUP if warm is None else warm:
+            warmup()
+
+    @app.on_event("startup")
+    def _start_reaper():
+        if REAPER_ENABLED:
+            reaper.start_background_reaper()
+
+    @app.on_event("shutdown")
+    def _stop_reaper():
+        if reaper.is_loaded:
+            reaper.stop_background_reaper()
+
+    @app.on_event("startup")
+    def _start_write_behind():
+        if WRITE_BEHIND_ENABLED:
+            hot_docs.start_flusher()
+
+    @app.on_event("shutdown")
+    def _flush_write_behind():
+        if hot_docs.is_loaded:
+            hot_docs.stop_flusher()  # writes out every pending edit
+
+    @app.on_event("startup")
+    def _start_offload():
+        if OFFLOAD_ENABLED and not WRITE_BEHIND_ENABLED:
+            offload.start()
+
+    @app.on_event("shutdown")
+    def _stop_offload():
+        if offload.is_loaded:
+            offload.shutdown()
+
+    @app.on_event("shutdown")
+    def _stop_bulk_pool():
+        if bulk.is_loaded:
+            bulk.shutdown_pool()
+
+    return app
+
+
+def __getattr__(name):
+    # "app.main:app" keeps working; the app is only built when asked for
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(name)
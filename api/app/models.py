@@ -12,6 +12,30 @@ class SectionsResponse(BaseModel):
     resume_id: str
     detected_sections: List[str]
     section_tables: Dict[str, List[int]]  # e.g. {"EXPERIENCE":[1,2,3], "PROJECTS":[4,5,6]}
+    version: Optional[int] = None
+
+
+class EntryMeta(BaseModel):
+    table_index: int
+    left: str
+    right: str
+    bullet_count: int
+
+
+class ResumeMeta(BaseModel):
+    resume_id: str
+    version: int
+    content_hash: str
+    detected_sections: List[str]
+    section_tables: Dict[str, List[int]]
+    tables_found: int
+    updated_at: float
+    entries: Optional[Dict[str, List[EntryMeta]]] = None
+
+
+class ResumeListResponse(BaseModel):
+    total: int
+    items: List[ResumeMeta]
 
 
 class PatchHeaderRequest(BaseModel):
@@ -46,6 +70,22 @@ class PatchBulletsRequest(BaseModel):
     keep_one_blank_line_before_next: bool = True
 
 
+class EditBulletRequest(BaseModel):
+    text: str = Field(min_length=1)
+    expected_version: Optional[int] = None  # 409 if the resume moved on
+
+
+class InsertBulletRequest(BaseModel):
+    text: str = Field(min_length=1)
+    index: Optional[int] = None  # insert before this bullet; None = append
+    expected_version: Optional[int] = None
+
+
+class MoveBulletRequest(BaseModel):
+    to_index: int
+    expected_version: Optional[int] = None
+
+
 class PatchSkillsRequest(BaseModel):
     # full section replacement
     lines: List[str]
@@ -58,7 +98,169 @@ class PreviewResponse(BaseModel):
     meta: Dict[str, Any] = Field(default_factory=dict)
 
 
+class SectionFit(BaseModel):
+    section: str
+    start_page: int
+    end_page: int
+    height_pt: float
+    overflow_pt: float  # part of the section past the target page count
+
+
+class PageFit(BaseModel):
+    pages: int
+    target_pages: int
+    fits: bool
+    page_width_pt: float
+    page_height_pt: float
+    body_height_pt: float
+    last_page_used_pt: float
+    free_pt: float
+    overflow_pt: float
+    sections: List[SectionFit]
+    took_ms: float
+
+
 class PatchResponse(BaseModel):
     resume_id: str
     section: str
     message: str
+    changed: bool = True            # False: nothing to change, nothing written
+    version: Optional[int] = None   # unchanged when changed is False
+    page_fit: Optional[PageFit] = None  # estimated layout after the edit
+    dry_run: bool = False           # True: nothing was written, see preview
+    preview: Optional[str] = None   # section text after the edit (dry runs)
+
+
+class BulletOpResponse(BaseModel):
+    resume_id: str
+    section: str
+    table_index: int
+    version: int
+    changed: bool = True
+    bullets: List[str]  # the entry's bullets after the operation
+    page_fit: Optional[PageFit] = None
+    dry_run: bool = False
+
+
+class ScoreRequest(BaseModel):
+    job_description: str = Field(min_length=1)
+    top_keywords: int = Field(default=40, ge=1, le=200)
+    top_bullets: int = Field(default=20, ge=0, le=200)
+
+
+class SectionScore(BaseModel):
+    section: str
+    score: float
+
+
+class BulletScore(BaseModel):
+    section: str
+    table_index: int
+    bullet_index: int
+    text: str
+    score: float
+
+
+class ScoreResponse(BaseModel):
+    resume_id: str
+    version: int
+    overall_score: float
+    keyword_coverage: float
+    matched_keywords: List[str]
+    missing_keywords: List[str]
+    sections: List[SectionScore]
+    bullets: List[BulletScore]
+
+
+class RankRequest(BaseModel):
+    job_description: str = Field(min_length=1)
+    top_k: int = Field(default=20, ge=1, le=500)
+    explain: bool = True
+
+
+class RankedSection(BaseModel):
+    section: str
+    score: float
+    matched_terms: List[str]
+
+
+class RankedResume(BaseModel):
+    resume_id: str
+    version: int
+    score: float
+    sections: List[RankedSection] = Field(default_factory=list)
+
+
+class RankResponse(BaseModel):
+    total_indexed: int
+    total_matched: int
+    took_ms: float
+    results: List[RankedResume]
+
+
+class BulletLibrary(BaseModel):
+    # saved candidate bullets per entry: {table_index: [bullet, ...]}
+    library: Dict[int, List[str]] = Field(default_factory=dict)
+
+
+class TailorRequest(BaseModel):
+    job_description: str = Field(min_length=1)
+    table_indices: Optional[List[int]] = None     # default: every entry of the section
+    candidates: Dict[int, List[str]] = Field(default_factory=dict)
+    use_library: bool = True
+    top_k: int = Field(default=4, ge=1, le=20)    # bullets kept per entry
+    max_chars: Optional[int] = Field(default=None, ge=1)  # per-entry length budget
+    min_score: float = 0.0
+    apply: bool = True                            # False = just report the selection
+    keep_one_blank_line_before_next: bool = True
+
+
+class TailoredBullet(BaseModel):
+    text: str
+    source: str  # current | library | request
+    score: float
+
+
+class TailoredEntry(BaseModel):
+    table_index: int
+    candidates: int
+    selected: List[TailoredBullet]
+
+
+class TailorResponse(BaseModel):
+    resume_id: str
+    section: str
+    version: int
+    applied: bool
+    entries: List[TailoredEntry]
+
+
+class DuplicateBullet(BaseModel):
+    source: str  # current | original | <other resume_id>
+    section: str
+    table_index: int
+    bullet_index: int
+    text: str
+
+
+class DuplicateCluster(BaseModel):
+    size: int
+    max_similarity: float
+    min_similarity: float
+    members: List[DuplicateBullet]
+
+
+class DuplicatesResponse(BaseModel):
+    resume_id: str
+    version: int
+    bullets_scanned: int
+    candidate_pairs: int
+    clusters: List[DuplicateCluster]
+
+
+class OutlineResponse(BaseModel):
+    resume_id: str
+    version: Optional[int] = None
+    header: List[Dict[str, Any]]      # [{pos, text}] above the first heading
+    sections: List[Dict[str, Any]]    # [{name, lines | entries}], pos = body element index
+    links: List[Dict[str, Any]]       # [{pos, text, target}]
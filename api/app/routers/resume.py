@@ -1,32 +1,58 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Request, Header
+from fastapi.responses import FileResponse, StreamingResponse
 from pathlib import Path
 import shutil
 
 from ..models import (
-    UploadResponse, SectionsResponse, PreviewResponse, PatchResponse,
+    UploadResponse, SectionsResponse, PreviewResponse, PatchResponse, ResumeMeta, ResumeListResponse,
     PatchHeaderRequest, PatchSummaryRequest, PatchEducationRequest,
-    PatchSkillsRequest, PatchBulletsRequest
+    PatchSkillsRequest, PatchBulletsRequest, ScoreRequest, ScoreResponse,
+    RankRequest, RankResponse, BulletLibrary, TailorRequest, TailorResponse,
+    DuplicatesResponse, PageFit, EditBulletRequest, InsertBulletRequest, MoveBulletRequest, BulletOpResponse,
+    OutlineResponse,
 )
 
-from ..services.storage import new_resume_id, resume_dir, save_upload, get_current_path
-from ..services.editor import (
-    analyze_resume, apply_header_patch, apply_summary_patch, apply_education_patch,
-    apply_skills_patch, apply_bullets_patch
-)
-from ..services.preview import preview_section_text
+from ..services.storage import new_resume_id, is_resume_id, resume_dir, save_upload, get_current_path
+from ..services import meta_index
+from ..services.lazy import lazy_import
+
+# imported on first use (numpy, python-docx and the editors stay out of cold starts)
+editor = lazy_import("..services.editor", __package__)
+hot_docs = lazy_import("..services.hot_docs", __package__)
+inverted_index = lazy_import("..services.inverted_index", __package__)
+preview = lazy_import("..services.preview", __package__)
+layout = lazy_import("..services.layout", __package__)
+outline = lazy_import("..services.outline", __package__)
+scoring = lazy_import("..services.scoring", __package__)
+dedupe = lazy_import("..services.dedupe", __package__)
+tailoring = lazy_import("..services.tailor", __package__)
+events = lazy_import("..services.events", __package__)
+export = lazy_import("..services.export", __package__)
+bulk = lazy_import("..services.bulk", __package__)
+upload_check = lazy_import("..services.upload_check", __package__)
+
+
+def _resume_id_path(request: Request):
+    # before any handler touches the file system: ids are UUIDs, never e.g. a shard dir name
+    resume_id = request.path_params.get("resume_id")
+    if resume_id is not None and not is_resume_id(resume_id):
+        raise HTTPException(status_code=404, detail="Resume not found")
 
 
-router = APIRouter(prefix="/resume", tags=["resume"])
+router = APIRouter(prefix="/resume", tags=["resume"], dependencies=[Depends(_resume_id_path)])
 
 
 @router.post("/upload", response_model=UploadResponse)
 async def upload_resume(file: UploadFile = File(...)):
     if not file.filename.lower().endswith(".docx"):
         raise HTTPException(status_code=400, detail="Only .docx supported")
+    try:
+        upload_check.check_docx(file.file)  # before anything parses it (zip bombs, huge bodies)
+    except upload_check.InvalidDocx as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
 
     rid = new_resume_id()
-    d = resume_dir(rid)
+    d = resume_dir(rid, create=True)
     upload_path = d / file.filename
 
     with upload_path.open("wb") as f:
@@ -34,7 +60,7 @@ async def upload_resume(file: UploadFile = File(...)):
 
     save_upload(rid, upload_path)
 
-    headers, tbl_count, _map = analyze_resume(rid)
+    headers, tbl_count, _map = editor.analyze_resume(rid)
 
     return UploadResponse(
         resume_id=rid,
@@ -43,55 +69,278 @@ async def upload_resume(file: UploadFile = File(...)):
     )
 
 
+@router.post("/bulk")
+async def bulk_upload(files: list[UploadFile] = File(...), dedupe_existing: bool = True):
+    """
+    Zip archives and/or .docx files; streams one NDJSON line per document
+    (services/bulk.py).
+    """
+    names = [Path(file.filename or "upload").name for file in files]
+    for name in names:
+        if not name.lower().endswith((".zip", ".docx")):
+            raise HTTPException(status_code=400, detail=f"{name}: only .zip and .docx supported")
+
+    # read straight from the request's spooled files as the stream goes (no copy up front);
+    # they stay open until the response has been sent
+    uploads = [(name, file.file) for name, file in zip(names, files)]
+
+    return StreamingResponse(bulk.ingest(uploads, dedupe_existing=dedupe_existing), media_type="application/x-ndjson")
+
+
+@router.get("", response_model=ResumeListResponse)
+def list_resumes(limit: int = 50, offset: int = 0):
+    total, items = meta_index.list_resumes(limit=min(limit, 500), offset=offset)
+    return ResumeListResponse(total=total, items=[ResumeMeta(**m) for m in items])
+
+
+@router.get("/search", response_model=ResumeListResponse)
+def search_resumes(section: str | None = None, q: str | None = None, limit: int = 50):
+    items = meta_index.search(section=section, q=q, limit=min(limit, 500))
+    return ResumeListResponse(total=len(items), items=[ResumeMeta(**m) for m in items])
+
+
+@router.get("/export")
+def export_resumes():
+    """
+    Every resume's structured data, one NDJSON record per line
+    (services/export.py; the nightly dump uses its command line).
+    """
+    return StreamingResponse(export.stream_ndjson(), media_type="application/x-ndjson")
+
+
+@router.post("/rank", response_model=RankResponse)
+def rank_resumes(payload: RankRequest):
+    return RankResponse(**inverted_index.rank(payload.job_description, top_k=payload.top_k, explain=payload.explain))
+
+
+def _get_meta(resume_id: str, with_entries: bool = False) -> dict:
+    if not is_resume_id(resume_id):  # compare_with ids come from the query
+        raise HTTPException(status_code=404, detail="Resume not found")
+    meta = meta_index.get(resume_id, with_entries=with_entries)
+    if meta is None:
+        # not indexed yet (e.g. uploaded before the index existed)
+        if not get_current_path(resume_id).exists():
+            raise HTTPException(status_code=404, detail="Resume not found")
+        editor.index_resume(resume_id)
+        meta = meta_index.get(resume_id, with_entries=with_entries)
+    return meta
+
+
 @router.get("/{resume_id}/sections", response_model=SectionsResponse)
 def get_sections(resume_id: str):
-    headers, _, mapping = analyze_resume(resume_id)
-    return SectionsResponse(resume_id=resume_id, detected_sections=headers, section_tables=mapping)
+    meta = _get_meta(resume_id)
+    return SectionsResponse(
+        resume_id=resume_id,
+        detected_sections=meta["detected_sections"],
+        section_tables=meta["section_tables"],
+        version=meta["version"],
+    )
+
+
+@router.get("/{resume_id}/meta", response_model=ResumeMeta)
+def get_meta(resume_id: str):
+    return ResumeMeta(**_get_meta(resume_id, with_entries=True))
 
 
 @router.get("/{resume_id}/preview/{section}", response_model=PreviewResponse)
 def get_preview(resume_id: str, section: str, table_index: int | None = None):
-    cur = str(get_current_path(resume_id))
-    text = preview_section_text(cur, section.upper(), table_index=table_index)
-    return PreviewResponse(resume_id=resume_id, section=section.upper(), preview_text=text, meta={"table_index": table_index})
+    section = section.upper()
+    # same text either way: all three go through section_reader's preview functions
+    known = outline.cached_outline(resume_id)
+    if known is not None:
+        text = known.preview(section, table_index)
+    elif hot_docs.is_dirty(resume_id):
+        text = outline.get_outline(resume_id).preview(section, table_index)  # unsaved write-behind edits
+    else:
+        # no outline yet: read just this section instead of parsing the whole file
+        cur = get_current_path(resume_id)
+        if not cur.exists():
+            raise HTTPException(status_code=404, detail="Resume not found")
+        text = preview.preview_section_text(str(cur), section, table_index=table_index)
+    return PreviewResponse(resume_id=resume_id, section=section, preview_text=text, meta={"table_index": table_index})
+
+
+@router.get("/{resume_id}/outline", response_model=OutlineResponse)
+def get_resume_outline(resume_id: str):
+    _get_meta(resume_id)
+    return OutlineResponse(resume_id=resume_id, **outline.get_outline(resume_id).to_dict())
+
+
+@router.get("/{resume_id}/events")
+def resume_events(resume_id: str, request: Request, last_event_id: str | None = Header(default=None)):
+    _get_meta(resume_id)
+    # SSE: outline snapshot, then the changed sections of every new version
+    return StreamingResponse(
+        events.stream(resume_id, request.is_disconnected, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/{resume_id}/score", response_model=ScoreResponse)
+def score(resume_id: str, payload: ScoreRequest):
+    _get_meta(resume_id)  # 404 for unknown ids
+    res = scoring.score_resume(resume_id, payload.job_description, payload.top_keywords, payload.top_bullets)
+    return ScoreResponse(**res)
+
+
+@router.get("/{resume_id}/layout", response_model=PageFit)
+def get_layout(resume_id: str):
+    _get_meta(resume_id)
+    return PageFit(**layout.page_fit(resume_id))
+
+
+def _patch_response(resume_id: str, section: str, message: str, meta: dict,
+                    table_index: int | None = None) -> PatchResponse:
+    text = None
+    if meta.get("dry_run"):
+        cur = str(get_current_path(resume_id))
+        text = preview.preview_section_text(cur, section, table_index=table_index, doc=meta["doc"])
+        message = "Dry run: nothing saved."
+    return PatchResponse(resume_id=resume_id, section=section, message=message,
+                         changed=meta["changed"], version=meta["version"], page_fit=meta["layout"],
+                         dry_run=meta.get("dry_run", False), preview=text)
 
 
 @router.patch("/{resume_id}/header", response_model=PatchResponse)
-def patch_header(resume_id: str, payload: PatchHeaderRequest):
-    apply_header_patch(resume_id, payload)
-    return PatchResponse(resume_id=resume_id, section="HEADER", message="Header updated.")
+def patch_header(resume_id: str, payload: PatchHeaderRequest, dry_run: bool = False):
+    meta = editor.apply_header_patch(resume_id, payload, dry_run=dry_run)
+    return _patch_response(resume_id, "HEADER", "Header updated.", meta)
 
 
 @router.patch("/{resume_id}/summary", response_model=PatchResponse)
-def patch_summary(resume_id: str, payload: PatchSummaryRequest):
-    apply_summary_patch(resume_id, payload)
-    return PatchResponse(resume_id=resume_id, section="SUMMARY", message="Summary updated.")
+def patch_summary(resume_id: str, payload: PatchSummaryRequest, dry_run: bool = False):
+    meta = editor.apply_summary_patch(resume_id, payload, dry_run=dry_run)
+    return _patch_response(resume_id, "SUMMARY", "Summary updated.", meta)
 
 
 @router.patch("/{resume_id}/education", response_model=PatchResponse)
-def patch_education(resume_id: str, payload: PatchEducationRequest):
-    apply_education_patch(resume_id, payload)
-    return PatchResponse(resume_id=resume_id, section="EDUCATION", message="Education updated.")
+def patch_education(resume_id: str, payload: PatchEducationRequest, dry_run: bool = False):
+    meta = editor.apply_education_patch(resume_id, payload, dry_run=dry_run)
+    return _patch_response(resume_id, "EDUCATION", "Education updated.", meta)
 
 
 @router.patch("/{resume_id}/skills", response_model=PatchResponse)
-def patch_skills(resume_id: str, payload: PatchSkillsRequest):
-    apply_skills_patch(resume_id, payload)
-    return PatchResponse(resume_id=resume_id, section="TECHNICAL SKILLS", message="Skills updated.")
+def patch_skills(resume_id: str, payload: PatchSkillsRequest, dry_run: bool = False):
+    meta = editor.apply_skills_patch(resume_id, payload, dry_run=dry_run)
+    return _patch_response(resume_id, "TECHNICAL SKILLS", "Skills updated.", meta)
 
 
 @router.patch("/{resume_id}/{section}/bullets", response_model=PatchResponse)
-def patch_bullets(resume_id: str, section: str, payload: PatchBulletsRequest):
+def patch_bullets(resume_id: str, section: str, payload: PatchBulletsRequest, dry_run: bool = False):
+    sec = section.upper()
+    if sec not in ("EXPERIENCE", "PROJECTS"):
+        raise HTTPException(status_code=400, detail="section must be EXPERIENCE or PROJECTS")
+
+    meta = editor.apply_bullets_patch(resume_id, sec, payload, dry_run=dry_run)
+    return _patch_response(resume_id, sec, f"{sec} bullets updated.", meta, table_index=payload.table_index)
+
+
+def _bullet_op_response(resume_id: str, section: str, table_index: int, op) -> BulletOpResponse:
+    sec = section.upper()
+    if sec not in ("EXPERIENCE", "PROJECTS"):
+        raise HTTPException(status_code=400, detail="section must be EXPERIENCE or PROJECTS")
+    _get_meta(resume_id)
+
+    try:
+        meta = op(sec)
+    except editor.VersionConflict as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "current_version": e.current})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return BulletOpResponse(
+        resume_id=resume_id, section=sec, table_index=table_index,
+        version=meta["version"], changed=meta["changed"], bullets=meta["bullets"], page_fit=meta["layout"],
+        dry_run=meta.get("dry_run", False),
+    )
+
+
+@router.patch("/{resume_id}/{section}/bullets/{table_index}/{bullet_index}", response_model=BulletOpResponse)
+def patch_one_bullet(resume_id: str, section: str, table_index: int, bullet_index: int, payload: EditBulletRequest,
+                     dry_run: bool = False):
+    return _bullet_op_response(resume_id, section, table_index, lambda sec: editor.edit_bullet(
+        resume_id, sec, table_index, bullet_index, payload.text, expected_version=payload.expected_version, dry_run=dry_run,
+    ))
+
+
+@router.post("/{resume_id}/{section}/bullets/{table_index}", response_model=BulletOpResponse)
+def post_one_bullet(resume_id: str, section: str, table_index: int, payload: InsertBulletRequest,
+                    dry_run: bool = False):
+    return _bullet_op_response(resume_id, section, table_index, lambda sec: editor.insert_bullet(
+        resume_id, sec, table_index, payload.index, payload.text, expected_version=payload.expected_version, dry_run=dry_run,
+    ))
+
+
+@router.delete("/{resume_id}/{section}/bullets/{table_index}/{bullet_index}", response_model=BulletOpResponse)
+def delete_one_bullet(resume_id: str, section: str, table_index: int, bullet_index: int,
+                      expected_version: int | None = None, dry_run: bool = False):
+    return _bullet_op_response(resume_id, section, table_index, lambda sec: editor.delete_bullet(
+        resume_id, sec, table_index, bullet_index, expected_version=expected_version, dry_run=dry_run,
+    ))
+
+
+@router.post("/{resume_id}/{section}/bullets/{table_index}/{bullet_index}/move", response_model=BulletOpResponse)
+def move_one_bullet(resume_id: str, section: str, table_index: int, bullet_index: int, payload: MoveBulletRequest,
+                    dry_run: bool = False):
+    return _bullet_op_response(resume_id, section, table_index, lambda sec: editor.move_bullet(
+        resume_id, sec, table_index, bullet_index, payload.to_index, expected_version=payload.expected_version, dry_run=dry_run,
+    ))
+
+
+@router.get("/{resume_id}/duplicates", response_model=DuplicatesResponse)
+def get_duplicates(
+    resume_id: str,
+    threshold: float = Query(0.6, ge=0.1, le=1.0),
+    include_original: bool = False,
+    compare_with: list[str] = Query(default_factory=list),
+):
+    for rid in [resume_id, *compare_with]:
+        _get_meta(rid)
+    return DuplicatesResponse(**dedupe.find_duplicates(
+        resume_id, threshold=threshold, include_original=include_original, compare_with=compare_with,
+    ))
+
+
+@router.get("/{resume_id}/bullet-library", response_model=BulletLibrary)
+def get_bullet_library(resume_id: str):
+    _get_meta(resume_id)
+    return BulletLibrary(library=tailoring.get_library(resume_id))
+
+
+@router.put("/{resume_id}/bullet-library", response_model=BulletLibrary)
+def put_bullet_library(resume_id: str, payload: BulletLibrary):
+    _get_meta(resume_id)
+    tailoring.save_library(resume_id, payload.library)
+    return BulletLibrary(library=tailoring.get_library(resume_id))
+
+
+@router.post("/{resume_id}/{section}/tailor", response_model=TailorResponse)
+def tailor(resume_id: str, section: str, payload: TailorRequest):
     sec = section.upper()
     if sec not in ("EXPERIENCE", "PROJECTS"):
         raise HTTPException(status_code=400, detail="section must be EXPERIENCE or PROJECTS")
+    _get_meta(resume_id)
 
-    apply_bullets_patch(resume_id, sec, payload)
-    return PatchResponse(resume_id=resume_id, section=sec, message=f"{sec} bullets updated.")
+    try:
+        res = tailoring.tailor_bullets(
+            resume_id, sec, payload.job_description,
+            table_indices=payload.table_indices,
+            candidates=payload.candidates,
+            use_library=payload.use_library,
+            top_k=payload.top_k,
+            max_chars=payload.max_chars,
+            min_score=payload.min_score,
+            apply=payload.apply,
+            keep_one_blank_line_before_next=payload.keep_one_blank_line_before_next,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TailorResponse(**res)
 
 
 @router.get("/{resume_id}/download")
 def download_resume(resume_id: str):
+    hot_docs.flush(resume_id)
     cur = get_current_path(resume_id)
     if not cur.exists():
         raise HTTPException(status_code=404, detail="Resume not found")
@@ -0,0 +1,319 @@
+"""
+Storage backends for resume documents.
+
+Every backend stores opaque blobs addressed by (resume_id, name), e.g.
+("3f2c...", "current.docx"), and supports batched reads/writes:
+
+- ShardedFSBackend : ROOT/ab/cd/<resume_id>/<name>, ab/cd from sha1(resume_id)
+- SQLiteBlobBackend: one SQLite file, one row per blob
+- S3Backend        : any S3-compatible store (AWS, MinIO, moto server ...)
+
+The editors work on file paths, so storage.py keeps a local sharded tree:
+for ShardedFSBackend it *is* the store, for the blob backends it is a
+read-through cache that the reaper may evict freely.
+"""
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+def shard_of(resume_id: str) -> tuple[str, str]:
+    h = hashlib.sha1(resume_id.encode("utf-8")).hexdigest()
+    return h[:2], h[2:4]
+
+
+class StorageBackend:
+    """
+    Interface. stat() returns (size, mtime) or None; mtime is what
+    storage.py compares against its local copy.
+    """
+    name = "base"
+
+    def get(self, resume_id: str, name: str) -> bytes | None:
+        raise NotImplementedError
+
+    def put(self, resume_id: str, name: str, data: bytes) -> float:
+        """Store data, return the stored mtime."""
+        raise NotImplementedError
+
+    def stat(self, resume_id: str, name: str):
+        raise NotImplementedError
+
+    def delete(self, resume_id: str):
+        raise NotImplementedError
+
+    def iter_ids(self):
+        raise NotImplementedError
+
+    # batched defaults; backends override when they can do better
+    def get_many(self, keys: list[tuple[str, str]]) -> dict:
+        return {k: self.get(*k) for k in keys}
+
+    def put_many(self, items: dict) -> dict:
+        return {k: self.put(k[0], k[1], data) for k, data in items.items()}
+
+    def exists(self, resume_id: str, name: str = "current.docx") -> bool:
+        return self.stat(resume_id, name) is not None
+
+
+# --------------------------
+# Local filesystem (sharded)
+# --------------------------
+class ShardedFSBackend(StorageBackend):
+    name = "local"
+
+    def __init__(self, root: Path, legacy_root: Path | None = None):
+        self.root = Path(root)
+        # flat <legacy_root>/<resume_id> layout from before sharding
+        self.legacy_root = Path(legacy_root) if legacy_root else None
+
+    def dir_for(self, resume_id: str, create: bool = False) -> Path:
+        a, b = shard_of(resume_id)
+        d = self.root / a / b / resume_id
+        if create:
+            d.mkdir(parents=True, exist_ok=True)
+        elif self.legacy_root is not None and not d.exists():
+            self._adopt_legacy(resume_id, d)
+        return d
+
+    def _adopt_legacy(self, resume_id: str, d: Path):
+        # shard dirs are 2 hex chars; resume ids never are (as in migrate_legacy)
+        if len(resume_id) == 2:
+            return
+        old = self.legacy_root / resume_id
+        if old == d or not old.is_dir():
+            return
+        d.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            old.rename(d)
+        except OSError:
+            pass
+
+    def path_for(self, resume_id: str, name: str) -> Path:
+        return self.dir_for(resume_id) / name
+
+    def get(self, resume_id, name):
+        try:
+            return self.path_for(resume_id, name).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, resume_id, name, data):
+        p = self.dir_for(resume_id, create=True) / name
+        tmp = p.with_name(p.name + ".part")
+        tmp.write_bytes(data)
+        os.replace(tmp, p)
+        return p.stat().st_mtime
+
+    def stat(self, resume_id, name):
+        try:
+            st = self.path_for(resume_id, name).stat()
+        except FileNotFoundError:
+            return None
+        return st.st_size, st.st_mtime
+
+    def delete(self, resume_id):
+        shutil.rmtree(self.dir_for(resume_id), ignore_errors=True)
+
+    def iter_dirs(self):
+        """Lazily walks ROOT/ab/cd/<resume_id>, skipping hidden entries."""
+        if not self.root.exists():
+            return
+        for lvl1 in _scan_dirs(self.root):
+            for lvl2 in _scan_dirs(lvl1):
+                yield from _scan_dirs(lvl2)
+
+    def iter_ids(self):
+        for d in self.iter_dirs():
+            yield d.name
+
+    def migrate_legacy(self) -> int:
+        """Move every flat legacy dir into its shard. Returns how many moved."""
+        if self.legacy_root is None:
+            return 0
+        moved = 0
+        for d in list(_scan_dirs(self.legacy_root)):
+            # shard dirs are 2 hex chars; resume ids never are
+            if len(d.name) == 2:
+                continue
+            a, b = shard_of(d.name)
+            dest = self.root / a / b / d.name
+            if dest.exists():
+                continue
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            d.rename(dest)
+            moved += 1
+        return moved
+
+
+def _scan_dirs(root: Path):
+    with os.scandir(root) as it:
+        for entry in it:
+            if not entry.name.startswith(".") and entry.is_dir(follow_symlinks=False):
+                yield Path(entry.path)
+
+
+# --------------------------
+# SQLite blobs
+# --------------------------
+class SQLiteBlobBackend(StorageBackend):
+    name = "sqlite"
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as c:
+            c.execute(
+                "CREATE TABLE IF NOT EXISTS blobs ("
+                " resume_id TEXT NOT NULL, name TEXT NOT NULL,"
+                " data BLOB NOT NULL, size INTEGER NOT NULL, mtime REAL NOT NULL,"
+                " PRIMARY KEY (resume_id, name))"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread; WAL lets readers run alongside a writer
+        c = getattr(self._local, "conn", None)
+        if c is None:
+            c = sqlite3.connect(self.db_path, timeout=30)
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = c
+        return c
+
+    def get(self, resume_id, name):
+        row = self._conn().execute(
+            "SELECT data FROM blobs WHERE resume_id=? AND name=?", (resume_id, name)
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def get_many(self, keys):
+        out = {k: None for k in keys}
+        c = self._conn()
+        # chunked IN-lists keep us under SQLITE_MAX_VARIABLE_NUMBER
+        by_name = {}
+        for rid, name in keys:
+            by_name.setdefault(name, []).append(rid)
+        for name, rids in by_name.items():
+            for i in range(0, len(rids), 500):
+                chunk = rids[i:i + 500]
+                q = "SELECT resume_id, data FROM blobs WHERE name=? AND resume_id IN (%s)" % ",".join("?" * len(chunk))
+                for rid, data in c.execute(q, [name, *chunk]):
+                    out[(rid, name)] = bytes(data)
+        return out
+
+    def put(self, resume_id, name, data):
+        return self.put_many({(resume_id, name): data})[(resume_id, name)]
+
+    def put_many(self, items):
+        now = time.time()
+        with self._conn() as c:  # one transaction for the whole batch
+            c.executemany(
+                "INSERT OR REPLACE INTO blobs (resume_id, name, data, size, mtime) VALUES (?, ?, ?, ?, ?)",
+                [(rid, name, sqlite3.Binary(data), len(data), now) for (rid, name), data in items.items()],
+            )
+        return {k: now for k in items}
+
+    def stat(self, resume_id, name):
+        row = self._conn().execute(
+            "SELECT size, mtime FROM blobs WHERE resume_id=? AND name=?", (resume_id, name)
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def delete(self, resume_id):
+        with self._conn() as c:
+            c.execute("DELETE FROM blobs WHERE resume_id=?", (resume_id,))
+
+    def iter_ids(self):
+        cur = self._conn().execute("SELECT DISTINCT resume_id FROM blobs")
+        for (rid,) in cur:
+            yield rid
+
+
+# --------------------------
+# S3-compatible
+# --------------------------
+class S3Backend(StorageBackend):
+    """
+    Objects live at <prefix><ab>/<cd>/<resume_id>/<name> (hash prefixes spread
+    load across partitions). Point endpoint_url at MinIO / moto server to run
+    against a local stand-in; any boto3-compatible client can be injected.
+    """
+    name = "s3"
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: str | None = None, client=None, max_workers: int = 16):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.max_workers = max_workers
+        if client is None:
+            import boto3  # optional dependency, only needed for this backend
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.client = client
+
+    def _key(self, resume_id: str, name: str) -> str:
+        a, b = shard_of(resume_id)
+        return f"{self.prefix}{a}/{b}/{resume_id}/{name}"
+
+    def _is_missing(self, e: Exception) -> bool:
+        code = str(getattr(e, "response", {}).get("Error", {}).get("Code", ""))
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def get(self, resume_id, name):
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self._key(resume_id, name))
+        except Exception as e:
+            if self._is_missing(e):
+                return None
+            raise
+        return obj["Body"].read()
+
+    def put(self, resume_id, name, data):
+        self.client.put_object(Bucket=self.bucket, Key=self._key(resume_id, name), Body=data)
+        st = self.stat(resume_id, name)
+        return st[1] if st else time.time()
+
+    def get_many(self, keys):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as ex:
+            return dict(zip(keys, ex.map(lambda k: self.get(*k), keys)))
+
+    def put_many(self, items):
+        keys = list(items)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as ex:
+            return dict(zip(keys, ex.map(lambda k: self.put(k[0], k[1], items[k]), keys)))
+
+    def stat(self, resume_id, name):
+        try:
+            h = self.client.head_object(Bucket=self.bucket, Key=self._key(resume_id, name))
+        except Exception as e:
+            if self._is_missing(e):
+                return None
+            raise
+        return h["ContentLength"], h["LastModified"].timestamp()
+
+    def _iter_keys(self, prefix: str):
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                yield obj["Key"]
+
+    def delete(self, resume_id):
+        a, b = shard_of(resume_id)
+        keys = list(self._iter_keys(f"{self.prefix}{a}/{b}/{resume_id}/"))
+        for i in range(0, len(keys), 1000):  # DeleteObjects limit
+            self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": k} for k in keys[i:i + 1000]], "Quiet": True},
+            )
+
+    def iter_ids(self):
+        seen = set()
+        for key in self._iter_keys(self.prefix):
+            parts = key[len(self.prefix):].split("/")
+            if len(parts) == 4 and parts[2] not in seen:
+                seen.add(parts[2])
+                yield parts[2]
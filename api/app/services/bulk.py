@@ -0,0 +1,243 @@
+"""
+Bulk ingestion: POST /resume/bulk takes zip archives (and/or plain .docx
+files) and streams back one NDJSON line per document as soon as it is done.
+
+Archive entries are read one at a time, so only BULK_MAX_IN_FLIGHT
+documents are held in memory however large the archive is. Each entry
+goes through the upload checks (services/upload_check.py), then is
+hashed: a copy of a document earlier in the same upload, or of a
+stored resume's current version (dedupe_existing), is reported as a
+duplicate instead of stored again. The rest are parsed in a pool of
+BULK_WORKERS processes, which send back the serialized outline
+(services/outline.py); this process only writes the files and records the
+outline in the indexes, without parsing anything itself.
+
+Lines, in completion order:
+    {"name", "status": "stored", "resume_id", "version", "detected_sections", "tables_found"}
+    {"name", "status": "duplicate", "resume_id", "duplicate_of"}   (the name of the first copy, or null)
+    {"name", "status": "error", "error"}
+and a last {"status": "done", "stored", "duplicates", "errors"}.
+"""
+import asyncio
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import PurePosixPath
+from typing import BinaryIO
+
+from starlette.concurrency import run_in_threadpool
+
+from ..config import MAX_UPLOAD_MB, BULK_WORKERS, BULK_MAX_IN_FLIGHT
+from ..services import meta_index
+from ..services.storage import new_resume_id, save_upload_bytes
+from ..services.upload_check import InvalidDocx, check_docx
+
+_MAX_BYTES = MAX_UPLOAD_MB * 1024 * 1024
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# --------------------------
+# Worker processes
+# --------------------------
+
+def _analyze(data: bytes) -> bytes:
+    """
+    Runs in a pool process: the serialized outline of one document.
+    """
+    from docx import Document
+    from ..services.outline import build_outline, dumps
+
+    return dumps(build_outline(Document(io.BytesIO(data))))
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that runs threads (and the event loop) isn't safe
+            _pool = ProcessPoolExecutor(max_workers=BULK_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+# --------------------------
+# Reading uploads
+# --------------------------
+
+def _skipped(name: str) -> bool:
+    # folders, macOS resource forks, dotfiles (~$lock files of open documents)
+    path = PurePosixPath(name)
+    return name.endswith("/") or "__MACOSX" in path.parts or path.name.startswith((".", "~$"))
+
+
+def _checked(name: str, data: bytes) -> tuple:
+    # turned away here, before a pool process parses it (services/upload_check.py)
+    try:
+        check_docx(io.BytesIO(data))
+    except InvalidDocx as e:
+        return name, None, str(e)
+    return name, data, None
+
+
+def _size(f: BinaryIO) -> int:
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    f.seek(0)
+    return size
+
+
+def _entries(uploads: list[tuple[str, BinaryIO]]):
+    """
+    Yields (name, bytes, None) per document, or (name, None, error).
+    uploads: (filename, file) of each uploaded file, .zip or .docx; a file
+    is only read once the stream gets to it.
+    """
+    for filename, f in uploads:
+        lower = filename.lower()
+        if lower.endswith(".docx"):
+            if _size(f) > _MAX_BYTES:
+                yield filename, None, f"larger than {MAX_UPLOAD_MB} MB"
+            else:
+                yield _checked(filename, f.read())
+        elif lower.endswith(".zip"):
+            try:
+                archive = zipfile.ZipFile(f)
+            except zipfile.BadZipFile:
+                yield filename, None, "not a zip archive"
+                continue
+            with archive:
+                for info in archive.infolist():
+                    if _skipped(info.filename):
+                        continue
+                    name = f"{filename}/{info.filename}"
+                    if not info.filename.lower().endswith(".docx"):
+                        yield name, None, "only .docx supported"
+                    elif info.file_size > _MAX_BYTES:
+                        yield name, None, f"larger than {MAX_UPLOAD_MB} MB"
+                    else:
+                        try:
+                            data = archive.read(info)
+                        except (zipfile.BadZipFile, zlib.error, NotImplementedError, RuntimeError) as e:
+                            yield name, None, f"unreadable entry: {e}"
+                        else:
+                            yield _checked(name, data)
+        else:
+            yield filename, None, "only .docx and .zip supported"
+
+
+def _store(data: bytes, content_hash: str, blob: bytes) -> dict:
+    from ..services.editor import index_resume
+    from ..services.outline import loads
+
+    rid = new_resume_id()
+    save_upload_bytes(rid, data)
+    # loads() is None if the pool runs another Python; index_resume parses then
+    meta = index_resume(rid, outline=loads(blob), content_hash=content_hash)
+    meta["resume_id"] = rid
+    return meta
+
+
+# --------------------------
+# Streaming
+# --------------------------
+
+def _line(data: dict) -> str:
+    return json.dumps(data, separators=(",", ":")) + "\n"
+
+
+async def ingest(uploads: list[tuple[str, BinaryIO]], dedupe_existing: bool = True):
+    """
+    NDJSON body for POST /resume/bulk. The files are read (in the thread
+    pool) as the stream goes; the caller keeps them open until it ends.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    slots = asyncio.Semaphore(BULK_MAX_IN_FLIGHT)
+    results: asyncio.Queue = asyncio.Queue()
+    firsts: dict = {}  # content hash -> (name, future resume_id or None) of its first copy
+    counts = {"stored": 0, "duplicate": 0, "error": 0}
+
+    async def one(name: str, data: bytes):
+        first = None
+        try:
+            content_hash = hashlib.sha256(data).hexdigest()
+            if content_hash in firsts:
+                first_name, rid = firsts[content_hash]
+                rid = await rid
+                line = {"name": name, "status": "duplicate", "resume_id": rid, "duplicate_of": first_name}
+                if rid is None:  # the first copy failed; so does this one
+                    line = {"name": name, "status": "error", "error": f"same content as {first_name}, which failed"}
+            else:
+                first = loop.create_future()
+                firsts[content_hash] = (name, first)
+                rid = await run_in_threadpool(meta_index.find_by_content_hash, content_hash) if dedupe_existing else None
+                if rid is not None:
+                    line = {"name": name, "status": "duplicate", "resume_id": rid, "duplicate_of": None}
+                else:
+                    blob = await asyncio.wrap_future(pool.submit(_analyze, data))
+                    meta = await run_in_threadpool(_store, data, content_hash, blob)
+                    rid = meta["resume_id"]
+                    line = {
+                        "name": name, "status": "stored", "resume_id": rid, "version": meta["version"],
+                        "detected_sections": meta["detected_sections"], "tables_found": meta["tables_found"],
+                    }
+                first.set_result(rid)
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):  # a worker died (e.g. OOM): start afresh next time
+                shutdown_pool()
+            line = {"name": name, "status": "error", "error": str(e) or type(e).__name__}
+            if first is not None and not first.done():
+                first.set_result(None)
+        finally:
+            slots.release()
+        await results.put(line)
+
+    async def feed():
+        tasks = []
+        entries = _entries(uploads)
+        try:
+            while True:
+                await slots.acquire()  # read ahead no further than the pool can use
+                entry = await run_in_threadpool(next, entries, None)
+                if entry is None:
+                    break
+                name, data, error = entry
+                if error is not None:
+                    slots.release()
+                    await results.put({"name": name, "status": "error", "error": error})
+                else:
+                    tasks.append(asyncio.create_task(one(name, data)))
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+        except Exception as e:  # e.g. an archive that breaks halfway through
+            await asyncio.gather(*tasks)
+            await results.put({"name": None, "status": "error", "error": str(e) or type(e).__name__})
+        await results.put(None)
+
+    feeder = asyncio.create_task(feed())
+    try:
+        while (line := await results.get()) is not None:
+            counts[line["status"]] += 1
+            yield _line(line)
+        yield _line({"status": "done", "stored": counts["stored"], "duplicates": counts["duplicate"], "errors": counts["error"]})
+    finally:
+        feeder.cancel()
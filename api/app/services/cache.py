@@ -0,0 +1,41 @@
+from collections import OrderedDict
+import threading
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU map. Keys usually include the resume version, so
+    stale entries simply stop being asked for and age out.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def discard_where(self, pred):
+        with self._lock:
+            for k in [k for k in self._data if pred(k)]:
+                del self._data[k]
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,165 @@
+"""
+Near-duplicate bullet detection (character shingles + MinHash + LSH).
+
+Bullets are the ones get_bullets_after_table finds under every table entry
+(taken from the per-version TermIndex units, so no extra parse), optionally
+joined by the bullets of original.docx and of other resumes (variants).
+Each bullet becomes a MinHash signature; LSH banding proposes candidate
+pairs, which are confirmed with the exact shingle Jaccard and merged into
+clusters. Results are cached per (resume, version, options).
+"""
+import re
+import zlib
+
+import numpy as np
+
+from ..services.cache import LRUCache
+from ..services.scoring import get_term_index
+from ..services.storage import get_doc_path
+from ..services.editor import extract_resume
+from ..services.terms import resume_units
+
+SHINGLE = 5
+NUM_PERM = 128
+BANDS = 32          # 32 bands x 4 rows: candidates from ~0.4 Jaccard up
+ROWS = NUM_PERM // BANDS
+PRIME = (1 << 32) - 5    # largest prime below 2^32
+
+_rng = np.random.default_rng(20240601)  # fixed: signatures must be stable across processes
+_A = _rng.integers(1, PRIME, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, PRIME, size=NUM_PERM, dtype=np.uint64)
+
+_NORM_RE = re.compile(r"[^a-z0-9+#]+")
+
+_result_cache = LRUCache(maxsize=256)
+_original_cache = LRUCache(maxsize=256)  # original.docx never changes after upload
+
+
+def _shingles(text: str) -> set[int]:
+    t = _NORM_RE.sub(" ", text.lower()).strip()
+    if len(t) <= SHINGLE:
+        return {zlib.crc32(t.encode("utf-8"))} if t else set()
+    return {zlib.crc32(t[i:i + SHINGLE].encode("utf-8")) for i in range(len(t) - SHINGLE + 1)}
+
+
+def _signature(sh: set[int]) -> np.ndarray:
+    h = np.fromiter(sh, dtype=np.uint64, count=len(sh))
+    # (a*x + b) mod p for all permutations at once; a, b < p < 2^32 and x < 2^32
+    # (crc32), so a*x + b < 2^64: no uint64 wrap-around
+    return ((_A[:, None] * h[None, :] + _B[:, None]) % PRIME).min(axis=1)
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if (a or b) else 0.0
+
+
+def _bullets_of(units: list[tuple], source: str) -> list[dict]:
+    return [
+        {"source": source, "section": sec, "table_index": ti, "bullet_index": bi, "text": text}
+        for sec, ti, bi, text in units
+        if ti is not None and bi >= 0
+    ]
+
+
+def _same_slot(a: dict, b: dict) -> bool:
+    """
+    One bullet position in current.docx and original.docx: that's the same
+    bullet in two versions, not a duplicate.
+    """
+    return {a["source"], b["source"]} == {"current", "original"} and (
+        (a["section"], a["table_index"], a["bullet_index"]) == (b["section"], b["table_index"], b["bullet_index"])
+    )
+
+
+def _original_bullets(resume_id: str) -> list[dict]:
+    b = _original_cache.get(resume_id)
+    if b is None:
+        path = get_doc_path(resume_id, "original.docx")
+        b = _bullets_of(resume_units(extract_resume(str(path))), "original") if path.exists() else []
+        _original_cache.put(resume_id, b)
+    return b
+
+
+def find_duplicates(
+    resume_id: str,
+    threshold: float = 0.6,
+    include_original: bool = False,
+    compare_with: list[str] | None = None,
+) -> dict:
+    version, idx = get_term_index(resume_id)
+    others = []
+    for other in compare_with or []:
+        v, oidx = get_term_index(other)
+        others.append((other, v, oidx))
+
+    key = (resume_id, version, threshold, include_original, tuple((o, v) for o, v, _ in others))
+    cached = _result_cache.get(key)
+    if cached is not None:
+        return cached
+
+    bullets = _bullets_of(idx.units, "current")
+    if include_original:
+        bullets += _original_bullets(resume_id)
+    for other, _, oidx in others:
+        bullets += _bullets_of(oidx.units, other)
+
+    shingles = [_shingles(b["text"]) for b in bullets]
+    keep = [i for i, sh in enumerate(shingles) if sh]
+    sigs = np.stack([_signature(shingles[i]) for i in keep]) if keep else np.zeros((0, NUM_PERM), dtype=np.uint64)
+
+    # LSH: bullets sharing any band bucket become candidate pairs
+    candidates = set()
+    for band in range(BANDS):
+        buckets = {}
+        for row, i in enumerate(keep):
+            buckets.setdefault(sigs[row, band * ROWS:(band + 1) * ROWS].tobytes(), []).append(i)
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    candidates.add((members[x], members[y]))
+
+    parent = list(range(len(bullets)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    pair_sim = {}
+    for i, j in candidates:
+        a, b = bullets[i], bullets[j]
+        if _same_slot(a, b):
+            continue
+        sim = _jaccard(shingles[i], shingles[j])
+        if sim >= threshold:
+            pair_sim[(i, j)] = sim
+            parent[find(i)] = find(j)
+
+    groups = {}
+    for i, j in pair_sim:
+        groups.setdefault(find(i), set()).update((i, j))
+
+    clusters = []
+    for members in groups.values():
+        if not any(bullets[m]["source"] == "current" for m in members):
+            continue
+        sims = [s for (i, j), s in pair_sim.items() if i in members]
+        members = sorted(members)
+        clusters.append({
+            "size": len(members),
+            "max_similarity": round(max(sims), 4),
+            "min_similarity": round(min(sims), 4),
+            "members": [bullets[m] for m in members],
+        })
+    clusters.sort(key=lambda c: (-c["max_similarity"], -c["size"]))
+
+    res = {
+        "resume_id": resume_id,
+        "version": version,
+        "bullets_scanned": len(bullets),
+        "candidate_pairs": len(candidates),
+        "clusters": clusters,
+    }
+    _result_cache.put(key, res)
+    return res
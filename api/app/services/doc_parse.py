@@ -5,7 +5,10 @@ SECTION_REGEX = re.compile(r"^[A-Z][A-Z\s&]{2,}$")  # SUMMARY, EDUCATION, TECHNI
 
 
 def detect_headers(doc_path: str) -> list[str]:
-    doc = Document(doc_path)
+    return detect_headers_doc(Document(doc_path))
+
+
+def detect_headers_doc(doc) -> list[str]:
     headers = []
     for p in doc.paragraphs:
         txt = (p.text or "").strip()
@@ -23,7 +26,10 @@ def scan_tables_text_date(doc_path: str) -> list[int]:
     Returns table indices that look like 2 columns: left=text, right=date.
     You already validated these in your scan script.
     """
-    doc = Document(doc_path)
+    return scan_tables_doc(Document(doc_path))
+
+
+def scan_tables_doc(doc) -> list[int]:
     good = []
     for ti, tbl in enumerate(doc.tables):
         if len(tbl.rows) < 1:
@@ -1,6 +1,10 @@
+from contextlib import contextmanager
 from pathlib import Path
+import hashlib
 import sys
-from pathlib import Path
+
+from docx import Document
+from lxml import etree
 
 # Add repo root to sys.path so we can import existing modules at repo root
 REPO_ROOT = Path(__file__).resolve().parents[3]   # api/app/services -> api/app -> api -> repo
@@ -8,8 +12,15 @@ if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
 
-from ..services.storage import get_current_path, overwrite_current
-from ..services.doc_parse import detect_headers, scan_tables_text_date, section_table_map
+from ..services.storage import get_current_path, overwrite_current, scratch_file
+from ..services.doc_parse import detect_headers_doc, scan_tables_doc, section_table_map
+from ..services import meta_index, inverted_index, hot_docs
+from ..services.meta_index import VersionConflict  # noqa: F401  (raised by edits; the router catches editor.VersionConflict)
+from ..services.hot_docs import resume_lock
+from ..services.layout import estimate_layout, remember_layout, page_fit
+from ..services.lazy import lazy_import
+
+offload = lazy_import("..services.offload", __package__)  # imports this module
 
 # reuse your existing modules from repo root
 from header_edit_class import HeaderEditor
@@ -19,17 +30,275 @@ from skills_edit import SkillsEditor
 from experience_edit import ExperienceEditor
 
 
-def analyze_resume(resume_id: str):
-    cur = str(get_current_path(resume_id))
-    headers = detect_headers(cur)
-    tables = scan_tables_text_date(cur)
+def extract_resume(doc_path: str, doc=None) -> dict:
+    """
+    Section text as the editors see it, from one parse:
+    {section: {"lines": [...]}} for paragraph sections (SUMMARY, TECHNICAL SKILLS ...)
+    {section: {"entries": [{table_index, left, right, bullets}]}} for table sections.
+    """
+    if doc is None:
+        doc = Document(doc_path)
+
+    headers = detect_headers_doc(doc)
+    tables = scan_tables_doc(doc)
     mapping = section_table_map(headers, tables)
-    return headers, len(tables), mapping
 
+    exp = ExperienceEditor(doc_path, doc=doc)
+    ranges = SummaryEditor(doc_path, doc=doc)  # same header-to-header ranges as the editors
+    paras = doc.paragraphs
+
+    sections = {}
+    for sec in headers:
+        if sec in mapping:
+            entries = []
+            for ti in mapping[sec]:
+                h = exp.get_table_header(ti)
+                bullets = [] if sec == "EDUCATION" else exp.list_bullet_texts(ti)
+                entries.append({"table_index": ti, "left": h["left"], "right": h["right"], "bullets": bullets})
+            sections[sec] = {"entries": entries}
+        else:
+            try:
+                start, end = ranges._find_section_range(sec)
+            except ValueError:
+                continue
+            lines = [(p.text or "").strip() for p in paras[start:end]]
+            sections[sec] = {"lines": [t for t in lines if t]}
+
+    return {
+        "detected_sections": headers,
+        "section_tables": mapping,
+        "tables_found": len(tables),
+        "sections": sections,
+    }
+
+
+def describe_resume(doc_path: str | None, doc=None, extracted: dict | None = None,
+                    content_hash: str | None = None) -> dict:
+    """
+    Everything the metadata index stores about one document, from one parse
+    (none if the parsed doc or its extract_resume output is passed in).
+    content_hash: skips hashing the file ("" for edits not written yet).
+    doc_path is only read when one of them is missing.
+    """
+    if content_hash is None:
+        content_hash = hashlib.sha256(Path(doc_path).read_bytes()).hexdigest()
+    ex = extracted if extracted is not None else extract_resume(doc_path, doc=doc)
+
+    entries = {
+        sec: [
+            {"table_index": e["table_index"], "left": e["left"], "right": e["right"], "bullet_count": len(e["bullets"])}
+            for e in body["entries"]
+        ]
+        for sec, body in ex["sections"].items()
+        if "entries" in body
+    }
+
+    return {
+        "content_hash": content_hash,
+        "detected_sections": ex["detected_sections"],
+        "section_tables": ex["section_tables"],
+        "tables_found": ex["tables_found"],
+        "entries": entries,
+    }
+
+
+def index_resume(resume_id: str, doc=None, pending: bool = False, outline=None, content_hash: str | None = None,
+                 expected_version: int | None = None, write=None) -> dict:
+    """
+    Re-read current.docx into the metadata and ranking indexes. Returns the
+    stored metadata. doc: the parsed document that was just saved as
+    current.docx, if at hand. pending: doc is a hot (write-behind) document
+    not written yet; its content_hash is filled in by the flush. outline /
+    content_hash: already computed elsewhere (bulk uploads parse in worker
+    processes), so current.docx is neither parsed nor hashed here. The
+    version's outline is published on the way. expected_version / write:
+    as for meta_index.record (an edit's base version, and the save of the
+    document it describes).
+    """
+    from ..services.outline import build_outline, publish  # outline imports this module
+
+    # current.docx is only opened (an access, see storage.touch) when doc / outline or content_hash is missing
+    if outline is None:
+        if doc is None:
+            doc = Document(str(get_current_path(resume_id)))
+        outline = build_outline(doc)
+    ex = outline.extracted()
+    if pending:
+        content_hash = ""
+    elif content_hash is None:
+        content_hash = hashlib.sha256(get_current_path(resume_id).read_bytes()).hexdigest()
+    meta = describe_resume(None, extracted=ex, content_hash=content_hash)
+    meta["version"] = meta_index.record(resume_id, meta, expected_version=expected_version, write=write)
+    inverted_index.update(resume_id, meta["version"], ex)
+    outline.version = meta["version"]
+    publish(resume_id, outline)  # other workers read it instead of re-parsing
+    return meta
+
+
+def analyze_resume(resume_id: str):
+    meta = meta_index.get(resume_id)
+    if meta is None:
+        meta = index_resume(resume_id)
+    return meta["detected_sections"], meta["tables_found"], meta["section_tables"]
+
+
+def _fingerprint(doc) -> bytes:
+    """
+    Digest of everything an edit can change: document.xml (text and
+    attributes) and the document part's relationships (hyperlink targets).
+    """
+    h = hashlib.sha1(etree.tostring(doc.element))
+    for rid, rel in sorted(doc.part.rels.items()):
+        h.update(f"|{rid} {rel.reltype} {rel.target_ref}".encode("utf-8"))
+    return h.digest()
+
+
+class _Edit:
+    __slots__ = ("doc", "version", "fingerprint", "dry_run", "committed")
+
+    def __init__(self, doc, version: int | None, dry_run: bool = False):
+        self.doc = doc
+        self.version = version  # stored version doc was read at (None: not indexed)
+        self.fingerprint = _fingerprint(doc)
+        self.dry_run = dry_run
+        self.committed = False
 
-def apply_header_patch(resume_id: str, payload):
-    cur = get_current_path(resume_id)
-    editor = HeaderEditor(str(cur))
+
+def _unchanged(resume_id: str, doc=None) -> dict:
+    """
+    Result of an edit that changed nothing: the stored metadata (indexed
+    first if the resume never was, e.g. uploaded before the index existed)
+    and the current page fit. doc: the current document, if at hand.
+    """
+    meta = meta_index.get(resume_id)
+    if meta is None:
+        meta = index_resume(resume_id, doc=doc)
+    meta["changed"] = False
+    meta["layout"] = page_fit(resume_id)
+    return meta
+
+
+def _changed(resume_id: str, meta: dict, layout: dict) -> dict:
+    meta["changed"] = True
+    meta["layout"] = layout
+    remember_layout(resume_id, meta["version"], layout)
+    return meta
+
+
+def _published(resume_id: str, tmp, layout: dict, expected_version: int | None, doc=None, outline=None,
+               content_hash: str | None = None) -> dict:
+    """
+    Result of an edit of expected_version saved to tmp: tmp becomes
+    current.docx, is indexed (from doc, or outline / content_hash, as for
+    index_resume) and its layout remembered; VersionConflict, with
+    current.docx untouched, if another worker committed meanwhile. Shared
+    with offload.run_edit.
+    """
+    if content_hash is None:
+        content_hash = hashlib.sha256(Path(tmp).read_bytes()).hexdigest()
+    meta = index_resume(resume_id, doc=doc, outline=outline, content_hash=content_hash,
+                        expected_version=expected_version, write=lambda: overwrite_current(resume_id, tmp))
+    if doc is not None:
+        hot_docs.remember_parsed(resume_id, meta["version"], doc)
+    return _changed(resume_id, meta, layout)
+
+
+def _commit(resume_id: str, editor, edit: _Edit) -> dict:
+    """
+    Save an editor's document as the new current.docx and re-index it.
+    Returns the new metadata (incl. version, "changed" and the page-fit
+    "layout"). With write-behind the editor's document is the hot one: it
+    is only marked dirty here and written by hot_docs later. An edit that
+    left the XML as it was writes nothing and keeps the version.
+    A dry run writes nothing either; its result also carries the edited
+    clone as "doc" (for previews).
+    """
+    if edit.dry_run:
+        return {
+            "resume_id": resume_id,
+            "version": meta_index.get_version(resume_id),
+            "changed": _fingerprint(editor.doc) != edit.fingerprint,
+            "layout": estimate_layout(editor.doc),
+            "dry_run": True,
+            "doc": editor.doc,
+        }
+
+    if _fingerprint(editor.doc) == edit.fingerprint:
+        return _unchanged(resume_id, doc=editor.doc)
+
+    if hot_docs.enabled():
+        meta = index_resume(resume_id, doc=editor.doc, pending=True, expected_version=edit.version)
+        hot_docs.mark_dirty(resume_id, meta["version"])
+        edit.committed = True
+        return _changed(resume_id, meta, estimate_layout(editor.doc))
+
+    with scratch_file(resume_id) as tmp:
+        editor.save(str(tmp))
+        return _published(resume_id, tmp, estimate_layout(editor.doc), edit.version, doc=editor.doc)
+
+
+@contextmanager
+def _editing(resume_id: str, dry_run: bool = False):
+    """
+    with _editing(rid) as edit: one edit of a resume, serialized with other
+    edits of it. edit.doc is the document to hand to the editor (the hot
+    one under write-behind, edited in place and rolled back if the edit
+    raises before it is committed); pass edit to _commit.
+    dry_run: edit.doc is a throwaway clone (hot_docs.snapshot) instead.
+    """
+    if dry_run:
+        yield _Edit(hot_docs.snapshot(resume_id), meta_index.get_version(resume_id), dry_run=True)
+        return
+    with resume_lock(resume_id):  # this process; other workers are caught by the version check on commit
+        version = meta_index.get_version(resume_id)  # before the document: never newer than what is read
+        doc = hot_docs.checkout(resume_id)
+        if doc is None:
+            yield _Edit(Document(str(get_current_path(resume_id))), version)
+            return
+        undo = hot_docs.undo_point(doc)
+        edit = _Edit(doc, version)
+        try:
+            yield edit
+        except BaseException:
+            if not edit.committed:  # the shared hot document must not keep half an edit
+                undo.restore()
+            raise
+
+
+# --------------------------
+# Edits
+# --------------------------
+# Each edit is a top-level function (doc_path, doc, *args) -> (editor, extra):
+# it changes doc through an editor and returns it, plus fields to add to the
+# result. Being plain functions, they can also run in a worker process
+# (services/offload.py).
+
+def _apply(resume_id: str, edit_fn, args: tuple, dry_run: bool = False, expected_version: int | None = None) -> dict:
+    """
+    Run one edit of a resume and commit it, optionally only if the stored
+    version is still expected_version.
+    """
+    if not dry_run and offload.enabled() and not hot_docs.enabled():
+        with resume_lock(resume_id):
+            version = meta_index.get_version(resume_id)
+            _check_version(expected_version, version)
+            return offload.run_edit(resume_id, edit_fn, args, version)
+
+    with _editing(resume_id, dry_run=dry_run) as edit:
+        _check_version(expected_version, edit.version)
+        editor, extra = edit_fn(str(get_current_path(resume_id)), edit.doc, *args)
+        meta = _commit(resume_id, editor, edit)
+    meta.update(extra)
+    return meta
+
+
+def _check_version(expected_version: int | None, current: int | None):
+    if expected_version is not None and current != expected_version:
+        raise VersionConflict(expected_version, current)
+
+
+def _header_edit(doc_path: str, doc, payload):
+    editor = HeaderEditor(doc_path, doc=doc)
     existing = editor.get_current()
 
     editor.update(
@@ -39,48 +308,32 @@ def apply_header_patch(resume_id: str, payload):
         payload.linkedin_url or existing["linkedin_url"],
         payload.github_url or existing["github_url"],
     )
-
-    tmp = cur.parent / "tmp.docx"
-    editor.save(str(tmp))
-    overwrite_current(resume_id, tmp)
+    return editor, {}
 
 
-def apply_summary_patch(resume_id: str, payload):
-    cur = get_current_path(resume_id)
-    editor = SummaryEditor(str(cur))
+def _summary_edit(doc_path: str, doc, payload):
+    editor = SummaryEditor(doc_path, doc=doc)
     editor.update(payload.summary)
+    return editor, {}
 
-    tmp = cur.parent / "tmp.docx"
-    editor.save(str(tmp))
-    overwrite_current(resume_id, tmp)
 
-
-def apply_education_patch(resume_id: str, payload):
-    cur = get_current_path(resume_id)
-    editor = EducationTableEditor(str(cur), table_index=0, row_index=0)
+def _education_edit(doc_path: str, doc, payload):
+    editor = EducationTableEditor(doc_path, table_index=0, row_index=0, doc=doc)
     existing = editor.get_current()
 
     editor.update(payload.left or existing["left"], payload.right or existing["right"])
-
-    tmp = cur.parent / "tmp.docx"
-    editor.save(str(tmp))
-    overwrite_current(resume_id, tmp)
+    return editor, {}
 
 
-def apply_skills_patch(resume_id: str, payload):
-    cur = get_current_path(resume_id)
-    editor = SkillsEditor(str(cur))
+def _skills_edit(doc_path: str, doc, payload):
+    editor = SkillsEditor(doc_path, doc=doc)
     text = "\n".join(payload.lines).strip()
     editor.replace_whole_section(text)
-
-    tmp = cur.parent / "tmp.docx"
-    editor.save(str(tmp))
-    overwrite_current(resume_id, tmp)
+    return editor, {}
 
 
-def apply_bullets_patch(resume_id: str, section: str, payload):
-    cur = get_current_path(resume_id)
-    editor = ExperienceEditor(str(cur))
+def _bullets_edit(doc_path: str, doc, payload):
+    editor = ExperienceEditor(doc_path, doc=doc)
 
     if payload.update_header:
         if payload.header_left and payload.header_right:
@@ -93,7 +346,116 @@ def apply_bullets_patch(resume_id: str, section: str, payload):
             next_table_override=None,  # UI will scope by providing table_index from section map
             keep_one_blank_line_before_next=payload.keep_one_blank_line_before_next
         )
+    return editor, {}
+
+
+def _bullet_selection_edit(doc_path: str, doc, section: str, selections: dict, keep_one_blank_line_before_next: bool):
+    editor = ExperienceEditor(doc_path, doc=doc)
+
+    # the section's tables in this document (what analyze_resume reports for it)
+    order = section_table_map(detect_headers_doc(doc), scan_tables_doc(doc)).get(section, [])
+
+    for ti, bullets in selections.items():
+        pos = order.index(ti) if ti in order else -1
+        next_ti = order[pos + 1] if 0 <= pos < len(order) - 1 else None
+        editor.replace_all_bullets_scoped(
+            ti,
+            bullets,
+            next_table_override=next_ti,
+            keep_one_blank_line_before_next=keep_one_blank_line_before_next
+        )
+    return editor, {}
+
+
+def apply_header_patch(resume_id: str, payload, dry_run: bool = False):
+    return _apply(resume_id, _header_edit, (payload,), dry_run=dry_run)
+
+
+def apply_summary_patch(resume_id: str, payload, dry_run: bool = False):
+    return _apply(resume_id, _summary_edit, (payload,), dry_run=dry_run)
+
+
+def apply_education_patch(resume_id: str, payload, dry_run: bool = False):
+    return _apply(resume_id, _education_edit, (payload,), dry_run=dry_run)
+
+
+def apply_skills_patch(resume_id: str, payload, dry_run: bool = False):
+    return _apply(resume_id, _skills_edit, (payload,), dry_run=dry_run)
+
+
+def apply_bullets_patch(resume_id: str, section: str, payload, dry_run: bool = False):
+    return _apply(resume_id, _bullets_edit, (payload,), dry_run=dry_run)
+
+
+def apply_bullet_selection(resume_id: str, section: str, selections: dict, keep_one_blank_line_before_next: bool = True,
+                           dry_run: bool = False) -> dict:
+    """
+    Replace the bullets of several entries of one section in a single save.
+    selections: {table_index: [bullet, ...]}. Each entry is scoped to the next
+    table of the same section, like edit.py does for the CLI.
+    """
+    return _apply(resume_id, _bullet_selection_edit, (section, selections, keep_one_blank_line_before_next),
+                  dry_run=dry_run)
+
+
+# single-bullet operations: op(editor, *args) -> the entry's bullet paragraphs afterwards
+
+def _bullet_op_edit(doc_path: str, doc, op, args: tuple):
+    editor = ExperienceEditor(doc_path, doc=doc)
+    block = op(editor, *args)
+    return editor, {"bullets": [(p.text or "").strip() for p in block]}
+
+
+def _bullet_op(resume_id: str, section: str, table_index: int, expected_version: int | None, op, args: tuple,
+               dry_run: bool = False) -> dict:
+    """
+    Run one single-bullet operation on an entry of section and commit it,
+    optionally only if the stored version is still expected_version.
+    Returns the new metadata plus "bullets".
+    """
+    _, _, mapping = analyze_resume(resume_id)
+    if table_index not in mapping.get(section, []):
+        raise ValueError(f"table_index {table_index} not in {section} (tables {mapping.get(section, [])}).")
+
+    return _apply(resume_id, _bullet_op_edit, (op, args), dry_run=dry_run, expected_version=expected_version)
+
+
+def _edit_bullet_op(editor, table_index: int, bullet_index: int, text: str):
+    editor.edit_bullet(table_index, bullet_index, text)
+    return editor.get_bullets_after_table(table_index)
+
+
+def _insert_bullet_op(editor, table_index: int, bullet_index: int | None, text: str):
+    return editor.insert_bullet(table_index, bullet_index, text)
+
+
+def _delete_bullet_op(editor, table_index: int, bullet_index: int):
+    return editor.delete_bullet(table_index, bullet_index)
+
+
+def _move_bullet_op(editor, table_index: int, from_index: int, to_index: int):
+    return editor.move_bullet(table_index, from_index, to_index)
+
+
+def edit_bullet(resume_id: str, section: str, table_index: int, bullet_index: int, text: str,
+                expected_version: int | None = None, dry_run: bool = False) -> dict:
+    return _bullet_op(resume_id, section, table_index, expected_version,
+                      _edit_bullet_op, (table_index, bullet_index, text), dry_run=dry_run)
+
+
+def insert_bullet(resume_id: str, section: str, table_index: int, bullet_index: int | None, text: str,
+                  expected_version: int | None = None, dry_run: bool = False) -> dict:
+    return _bullet_op(resume_id, section, table_index, expected_version,
+                      _insert_bullet_op, (table_index, bullet_index, text), dry_run=dry_run)
+
+
+def delete_bullet(resume_id: str, section: str, table_index: int, bullet_index: int,
+                  expected_version: int | None = None, dry_run: bool = False) -> dict:
+    return _bullet_op(resume_id, section, table_index, expected_version,
+                      _delete_bullet_op, (table_index, bullet_index), dry_run=dry_run)
+
 
-    tmp = cur.parent / "tmp.docx"
-    editor.save(str(tmp))
-    overwrite_current(resume_id, tmp)
+def move_bullet(resume_id: str, section: str, table_index: int, from_index: int, to_index: int,
+                expected_version: int | None = None, dry_run: bool = False) -> dict:
+    return _bullet_op(resume_id, section, table_index, expected_version,
+                      _move_bullet_op, (table_index, from_index, to_index), dry_run=dry_run)
@@ -0,0 +1,116 @@
+"""
+Server-sent events: section updates pushed to GET /resume/{id}/events.
+
+A stream sends the resume's outline once ("snapshot"), then one "update"
+per new version with only the sections that changed (outline data and
+preview text), so the frontend can stop re-polling /preview and
+/sections after every edit. Event ids are versions: a client reconnecting
+with the current version as Last-Event-ID skips the snapshot, any other
+id gets a fresh one.
+
+Commits in this process wake the streams right away (outline.publish ->
+notify); versions committed by other workers are picked up by polling the
+metadata index every EVENTS_POLL_SECONDS, and their outline comes from
+the shared outline store, so nothing is re-parsed either way.
+"""
+import asyncio
+import json
+import threading
+
+from starlette.concurrency import run_in_threadpool
+
+from ..config import EVENTS_POLL_SECONDS, EVENTS_KEEPALIVE_SECONDS
+from ..services import meta_index
+from ..services.lazy import lazy_import
+
+outline = lazy_import("..services.outline", __package__)  # imports this module
+
+_subscribers: dict = {}   # resume_id -> set of _Subscription
+_guard = threading.Lock()
+
+
+class _Subscription:
+    __slots__ = ("loop", "wakeup")
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.wakeup = asyncio.Event()
+
+    def notify(self):
+        try:
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+        except RuntimeError:  # loop closed: the stream is gone
+            pass
+
+    async def wait(self, timeout: float):
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.wakeup.clear()
+
+
+def notify(resume_id: str):
+    """
+    A new version of resume_id was committed (any thread).
+    """
+    with _guard:
+        subs = list(_subscribers.get(resume_id, ()))
+    for sub in subs:
+        sub.notify()
+
+
+def _subscribe(resume_id: str) -> _Subscription:
+    sub = _Subscription(asyncio.get_running_loop())
+    with _guard:
+        _subscribers.setdefault(resume_id, set()).add(sub)
+    return sub
+
+
+def _unsubscribe(resume_id: str, sub: _Subscription):
+    with _guard:
+        subs = _subscribers.get(resume_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del _subscribers[resume_id]
+
+
+def _event(kind: str, data: dict, event_id=None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {kind}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def stream(resume_id: str, is_disconnected, last_event_id: str | None = None):
+    """
+    SSE body for one client. is_disconnected: the request's coroutine of
+    that name; checked on every wake-up so closed streams end.
+    """
+    sub = _subscribe(resume_id)
+    try:
+        sent = await run_in_threadpool(outline.get_outline, resume_id)
+        if last_event_id != str(sent.version):  # else the client is up to date
+            yield _event("snapshot", {"resume_id": resume_id, **sent.changes_since(None)}, sent.version)
+
+        idle = 0.0
+        while not await is_disconnected():
+            await sub.wait(EVENTS_POLL_SECONDS)
+            version = await run_in_threadpool(meta_index.get_version, resume_id)
+            if version is None:  # deleted
+                yield _event("deleted", {"resume_id": resume_id})
+                return
+            if version == sent.version:
+                idle += EVENTS_POLL_SECONDS
+                if idle >= EVENTS_KEEPALIVE_SECONDS:
+                    idle = 0.0
+                    yield ": keep-alive\n\n"
+                continue
+
+            current = await run_in_threadpool(outline.get_outline, resume_id)
+            if current.version == sent.version:
+                continue
+            idle = 0.0
+            yield _event("update", {"resume_id": resume_id, **current.changes_since(sent)}, current.version)
+            sent = current
+    finally:
+        _unsubscribe(resume_id, sub)
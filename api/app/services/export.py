@@ -0,0 +1,250 @@
+"""
+Export of every resume's structured data (header, sections, entries and
+bullets, links) for analytics.
+
+One record per resume, built from its outline (services/outline.py), so
+resumes another worker has already outlined are not parsed again:
+
+    {"resume_id", "version", "header": [line], "links": [{"text", "target"}],
+     "sections": [{"name", "lines": [line]} | {"name", "entries": [{"table_index", "left", "right", "bullets": [text]}]}]}
+
+GET /resume/export streams the records as NDJSON. The nightly dump runs
+from the command line and writes to a directory:
+
+    cd api && python -m app.services.export OUT_DIR [--format ndjson|parquet] [--workers N] [--batch-size N]
+
+The stored resume ids are first streamed to OUT_DIR/_ids.txt. Batch n
+(lines n*batch_size ...) is then exported by a pool of worker processes
+to part-<n>.<ext>, written under a temporary name and renamed when
+complete, so memory stays bounded by workers x batch_size records.
+_manifest.json is the checkpoint: it records the settings and each part
+as it completes, and the totals once the run finishes ("complete": true).
+An interrupted run started again with the same arguments skips the parts
+already recorded; --restart begins a fresh snapshot. Parquet needs pyarrow.
+"""
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from pathlib import Path
+
+from starlette.concurrency import run_in_threadpool
+
+from ..services.storage import list_resume_ids, get_backend
+from ..services.lazy import lazy_import
+
+outline = lazy_import("..services.outline", __package__)
+
+FORMATS = {"ndjson": "ndjson", "parquet": "parquet"}  # format -> part file extension
+IDS_FILE = "_ids.txt"
+MANIFEST = "_manifest.json"
+
+
+# --------------------------
+# Records
+# --------------------------
+
+def record(resume_id: str) -> dict | None:
+    """
+    Export record of one resume; None if it is gone (deleted while the
+    export runs).
+    """
+    # a batch read: not an access to the resume, nothing fetched into the local tree
+    if not get_backend().exists(resume_id):
+        return None
+    o = outline.get_outline(resume_id, batch=True)
+    sections = []
+    for s in o.sections:
+        if s.entries is not None:
+            sections.append({"name": s.name, "entries": [
+                {"table_index": e.table_index, "left": e.left, "right": e.right, "bullets": [t for _, t in e.bullets]}
+                for e in s.entries
+            ]})
+        else:
+            sections.append({"name": s.name, "lines": [t for _, t in s.lines]})
+    return {
+        "resume_id": resume_id,
+        "version": o.version,
+        "header": [t for _, t in o.header],
+        "links": [{"text": t, "target": u} for _, t, u in o.links],
+        "sections": sections,
+    }
+
+
+def records(resume_ids) -> tuple[list, int]:
+    """
+    (records, failures) for a batch of ids. A resume that can't be read is
+    counted, not fatal: one corrupt upload shouldn't stop a nightly dump.
+    """
+    out, failed = [], 0
+    for rid in resume_ids:
+        try:
+            rec = record(rid)
+        except Exception:
+            failed += 1
+            continue
+        if rec is not None:
+            out.append(rec)
+    return out, failed
+
+
+def iter_batches(resume_ids, batch_size: int):
+    it = iter(resume_ids)
+    while batch := list(islice(it, batch_size)):
+        yield batch
+
+
+def _line(rec: dict) -> str:
+    return json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+async def stream_ndjson(batch_size: int = 100):
+    """
+    NDJSON body for GET /resume/export: storage is walked batch by batch,
+    so only one batch of records is held at a time.
+    """
+    batches = iter_batches(list_resume_ids(), batch_size)
+    while (batch := await run_in_threadpool(next, batches, None)) is not None:
+        recs, _ = await run_in_threadpool(records, batch)
+        for rec in recs:
+            yield _line(rec)
+
+
+# --------------------------
+# Part files
+# --------------------------
+
+def _arrow_schema(pa):
+    entry = pa.struct([
+        ("table_index", pa.int32()), ("left", pa.string()), ("right", pa.string()),
+        ("bullets", pa.list_(pa.string())),
+    ])
+    section = pa.struct([("name", pa.string()), ("lines", pa.list_(pa.string())), ("entries", pa.list_(entry))])
+    return pa.schema([
+        ("resume_id", pa.string()),
+        ("version", pa.int64()),
+        ("header", pa.list_(pa.string())),
+        ("links", pa.list_(pa.struct([("text", pa.string()), ("target", pa.string())]))),
+        ("sections", pa.list_(section)),
+    ])
+
+
+def _write_part(path: Path, recs: list, fmt: str):
+    tmp = path.with_name(path.name + ".part")
+    if fmt == "parquet":
+        import pyarrow as pa  # optional dependency, only needed for this format
+        import pyarrow.parquet as pq
+
+        pq.write_table(pa.Table.from_pylist(recs, schema=_arrow_schema(pa)), tmp)
+    else:
+        with tmp.open("w", encoding="utf-8") as f:
+            f.writelines(_line(rec) for rec in recs)
+    os.replace(tmp, path)
+
+
+def _export_batch(out_dir: str, n: int, resume_ids: list, fmt: str) -> tuple[int, int, int]:
+    """
+    Runs in a pool process: writes part n. Returns (n, exported, failed).
+    """
+    recs, failed = records(resume_ids)
+    _write_part(Path(out_dir) / f"part-{n:06d}.{FORMATS[fmt]}", recs, fmt)
+    return n, len(recs), failed
+
+
+# --------------------------
+# Directory export
+# --------------------------
+
+def _snapshot_ids(out_dir: Path) -> Path:
+    path = out_dir / IDS_FILE
+    if not path.exists():
+        tmp = path.with_name(path.name + ".part")
+        with tmp.open("w", encoding="utf-8") as f:
+            for rid in list_resume_ids():
+                f.write(rid + "\n")
+        os.replace(tmp, path)
+    return path
+
+
+def export_dir(out_dir: Path, fmt: str = "ndjson", workers: int | None = None, batch_size: int = 500,
+               restart: bool = False, progress=None) -> dict:
+    """
+    Export every stored resume to out_dir (see the module docstring).
+    Returns the manifest. progress(part, exported, failed) is called as
+    parts complete.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == "parquet":
+        import pyarrow  # noqa: F401  fail before any work is done
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if restart:
+        for p in out_dir.iterdir():
+            if p.name.startswith((IDS_FILE, MANIFEST, "part-")):
+                p.unlink()
+    manifest_path = out_dir / MANIFEST
+    settings = {"format": fmt, "batch_size": batch_size}
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if {k: manifest.get(k) for k in settings} != settings:
+            raise ValueError(f"{out_dir} holds an export with {manifest.get('format')} / batch size "
+                             f"{manifest.get('batch_size')}; pass the same settings or restart")
+    else:
+        manifest = {**settings, "complete": False, "parts": {}}
+    ids_path = _snapshot_ids(out_dir)
+
+    def _checkpoint(done):
+        for fut in done:
+            n, exported, failed = fut.result()
+            manifest["parts"][f"part-{n:06d}.{FORMATS[fmt]}"] = {"exported": exported, "failed": failed}
+            _write_manifest(manifest_path, manifest)
+            if progress is not None:
+                progress(n, exported, failed)
+
+    workers = workers or os.cpu_count() or 1
+    with ids_path.open(encoding="utf-8") as f, ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        pending = set()
+        batches = iter_batches((line.strip() for line in f if line.strip()), batch_size)
+        for n, batch in enumerate(batches):
+            if f"part-{n:06d}.{FORMATS[fmt]}" in manifest["parts"]:  # done by an earlier run
+                continue
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                _checkpoint(done)
+            pending.add(pool.submit(_export_batch, str(out_dir), n, batch, fmt))
+        _checkpoint(pending)
+
+    manifest["complete"] = True
+    manifest["exported"] = sum(p["exported"] for p in manifest["parts"].values())
+    manifest["failed"] = sum(p["failed"] for p in manifest["parts"].values())
+    _write_manifest(manifest_path, manifest)
+    return manifest
+
+
+def _write_manifest(path: Path, manifest: dict):
+    tmp = path.with_name(path.name + ".part")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    ap = argparse.ArgumentParser(description="Export every resume's structured data as NDJSON or Parquet parts.")
+    ap.add_argument("out_dir", type=Path)
+    ap.add_argument("--format", choices=sorted(FORMATS), default="ndjson")
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    ap.add_argument("--batch-size", type=int, default=500, help="resumes per part file")
+    ap.add_argument("--restart", action="store_true", help="discard an earlier, unfinished run")
+    args = ap.parse_args()
+
+    def _progress(n, exported, failed):
+        print(f"part {n}: {exported} exported, {failed} failed", file=sys.stderr)
+
+    print(json.dumps(export_dir(args.out_dir, args.format, args.workers, args.batch_size, args.restart, _progress), indent=2))
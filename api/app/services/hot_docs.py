@@ -0,0 +1,392 @@
+"""
+Write-behind for rapid successive patches (RESUME_WRITE_BEHIND=1).
+
+The frontend PATCHes on every field blur. With write-behind on, the
+editors work on one parsed Document per resume kept here, and a commit only
+marks it dirty (the indexes are still updated right away, so sections /
+scores / versions move with every patch). The document is serialized to
+current.docx once the resume has been quiet for WRITE_BEHIND_QUIET_SECONDS
+or WRITE_BEHIND_MAX_DELAY_SECONDS after its first unsaved edit, whichever
+comes first, and always before a download and on shutdown.
+
+All access to a hot document goes through resume_lock(resume_id). An edit
+that fails halfway is rolled back (undo_point) so a later flush can't
+write it. Hot documents live in one process: with write-behind on, a
+second process on the same .work refuses to start (start_flusher), and a
+hot document whose resume another writer has moved to a newer version
+since is dropped instead of written over it.
+
+Independently of write-behind, the last committed parsed document of each
+resume is kept (keyed by version) so snapshot() can hand out a cheap clone
+of it for speculative edits (?dry_run=true) without re-parsing.
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+from copy import deepcopy
+import hashlib
+import logging
+import threading
+import time
+import weakref
+
+from docx import Document
+from docx.opc.rel import Relationships
+from docx.parts.document import DocumentPart
+
+from ..config import (
+    WORK_DIR, WRITE_BEHIND_ENABLED, WRITE_BEHIND_QUIET_SECONDS, WRITE_BEHIND_MAX_DELAY_SECONDS, HOT_DOCS_MAX,
+    PARSED_DOCS_MAX,
+)
+from ..services.cache import LRUCache
+from ..services.storage import get_current_path, overwrite_current, scratch_file
+from ..services import meta_index
+
+log = logging.getLogger(__name__)
+
+# only while someone holds (or waits for) a resume's lock does it exist:
+# nobody else can be serialized against one that was collected
+_locks: "weakref.WeakValueDictionary[str, threading.RLock]" = weakref.WeakValueDictionary()
+_locks_guard = threading.Lock()
+
+
+def resume_lock(resume_id: str):
+    """
+    Per-resume lock: serializes edits of one resume (and the version check
+    in front of them) within this process. Keep the returned lock for as
+    long as it is used.
+    """
+    with _locks_guard:
+        lock = _locks.get(resume_id)
+        if lock is None:
+            lock = _locks[resume_id] = threading.RLock()
+        return lock
+
+
+class _Hot:
+    __slots__ = ("doc", "version", "dirty_since", "changed_at")
+
+    def __init__(self, doc, version: int | None):
+        self.doc = doc
+        self.version = version    # the stored version doc stands for
+        self.dirty_since = None   # first unsaved change
+        self.changed_at = None    # latest unsaved change
+
+
+_hot: "OrderedDict[str, _Hot]" = OrderedDict()
+_guard = threading.Lock()
+
+
+def enabled() -> bool:
+    return WRITE_BEHIND_ENABLED
+
+
+def checkout(resume_id: str):
+    """
+    The hot Document to edit (parsed from current.docx on a miss), or None
+    when write-behind is off. Caller holds resume_lock(resume_id).
+    """
+    if not WRITE_BEHIND_ENABLED:
+        return None
+    version = meta_index.get_version(resume_id)
+    with _guard:
+        h = _hot.get(resume_id)
+        if h is not None:
+            _hot.move_to_end(resume_id)
+    if h is not None:
+        if h.version == version:
+            return h.doc
+        _drop_stale(resume_id, h, version)
+    h = _Hot(Document(str(get_current_path(resume_id))), version)
+    with _guard:
+        _hot[resume_id] = h
+    _evict()
+    return h.doc
+
+
+def _drop_stale(resume_id: str, h: _Hot, version: int | None):
+    # another process committed this resume since h was parsed (or last edited)
+    if h.dirty_since is not None:
+        log.error("write-behind: %s moved from version %s to %s elsewhere; dropping unsaved edits",
+                  resume_id, h.version, version)
+    with _guard:
+        if _hot.get(resume_id) is h:
+            del _hot[resume_id]
+
+
+class _Undo:
+    """
+    What a failed in-place edit of a hot document is rolled back to: the
+    body's XML and the main part's relationships (HeaderEditor retargets
+    hyperlinks in place).
+    """
+    __slots__ = ("doc", "body", "rels", "targets")
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.body = deepcopy(doc.element.body)
+        self.rels = dict(doc.part.rels)
+        self.targets = {rid: rel._target for rid, rel in self.rels.items()}
+
+    def restore(self):
+        self.doc.element.body[:] = list(self.body)
+        rels = self.doc.part.rels
+        for rid in set(rels) - set(self.rels):
+            del rels[rid]
+        for rid, rel in self.rels.items():
+            rel._target = self.targets[rid]
+            rels[rid] = rel
+
+
+def forget(resume_id: str):
+    """
+    Drop the hot and last committed documents of a deleted resume, unsaved
+    edits included. Caller holds resume_lock(resume_id).
+    """
+    with _guard:
+        _hot.pop(resume_id, None)
+    _parsed.pop(resume_id)
+
+
+def undo_point(doc) -> _Undo:
+    """
+    undo_point(doc).restore() puts a hot document back as it is now.
+    """
+    return _Undo(doc)
+
+
+def _evict():
+    """
+    Drop the least recently used clean documents above HOT_DOCS_MAX. Dirty
+    ones stay until the flusher has written them; documents being edited
+    (lock held elsewhere) are skipped rather than waited for.
+    """
+    with _guard:
+        excess = len(_hot) - HOT_DOCS_MAX
+        candidates = [rid for rid, h in _hot.items() if h.dirty_since is None]
+    for rid in candidates:
+        if excess <= 0:
+            break
+        lock = resume_lock(rid)
+        if not lock.acquire(blocking=False):
+            continue
+        try:
+            with _guard:
+                h = _hot.get(rid)
+                if h is not None and h.dirty_since is None:
+                    del _hot[rid]
+                    excess -= 1
+        finally:
+            lock.release()
+
+
+def peek(resume_id: str):
+    """
+    The hot Document if there is one (readers use it to see unsaved edits).
+    """
+    with _guard:
+        h = _hot.get(resume_id)
+    return h.doc if h is not None else None
+
+
+@contextmanager
+def reading(resume_id: str):
+    """
+    with reading(rid) as doc: the hot Document (None: read current.docx),
+    with edits of that resume held off meanwhile.
+    """
+    with resume_lock(resume_id):
+        yield peek(resume_id)
+
+
+def mark_dirty(resume_id: str, version: int):
+    """
+    The hot document was committed as version and isn't written yet.
+    """
+    now = time.monotonic()
+    with _guard:
+        h = _hot.get(resume_id)
+        if h is None:
+            return
+        h.version = version
+        if h.dirty_since is None:
+            h.dirty_since = now
+        h.changed_at = now
+
+
+def is_dirty(resume_id: str) -> bool:
+    with _guard:
+        h = _hot.get(resume_id)
+    return h is not None and h.dirty_since is not None
+
+
+def flush(resume_id: str) -> bool:
+    """
+    Write a dirty hot document to current.docx. Returns True if it wrote.
+    """
+    with resume_lock(resume_id):
+        with _guard:
+            h = _hot.get(resume_id)
+        if h is None or h.dirty_since is None:
+            return False
+        version = meta_index.get_version(resume_id)
+        if version != h.version:
+            _drop_stale(resume_id, h, version)
+            return False
+
+        try:
+            cur = get_current_path(resume_id)
+            with scratch_file(resume_id) as tmp:
+                h.doc.save(str(tmp))
+                overwrite_current(resume_id, tmp)
+        except FileNotFoundError:
+            # resume deleted meanwhile (reaper / DELETE): nothing to keep
+            with _guard:
+                _hot.pop(resume_id, None)
+            return False
+        h.dirty_since = h.changed_at = None
+        meta_index.set_content_hash(resume_id, hashlib.sha256(cur.read_bytes()).hexdigest())
+        return True
+
+
+def flush_due(now: float | None = None) -> int:
+    """
+    Flush every document that has been quiet long enough or waited too long.
+    """
+    now = time.monotonic() if now is None else now
+    with _guard:
+        due = [
+            rid for rid, h in _hot.items()
+            if h.dirty_since is not None and (
+                now - h.changed_at >= WRITE_BEHIND_QUIET_SECONDS
+                or now - h.dirty_since >= WRITE_BEHIND_MAX_DELAY_SECONDS
+            )
+        ]
+    return sum(flush(rid) for rid in due)
+
+
+def flush_all() -> int:
+    with _guard:
+        rids = list(_hot)
+    return sum(flush(rid) for rid in rids)
+
+
+# --------------------------
+# Snapshots for dry runs
+# --------------------------
+_parsed = LRUCache(maxsize=PARSED_DOCS_MAX)   # resume_id -> (version, Document) as last committed
+
+
+def clone_document(doc):
+    """
+    Copy of a parsed document that can be edited without touching the
+    original: document.xml is deep-copied and the main part's relationships
+    are copied (hyperlink targets are edited in place); styles, numbering,
+    media and the package are shared, read-only. About 0.1 ms against
+    10-20 ms for a parse. Not for saving: the package still points at the
+    original main part.
+    """
+    src = doc.part
+    part = DocumentPart(src.partname, src.content_type, deepcopy(src.element), src.package)
+    rels = Relationships(src.rels._baseURI)
+    for rid, rel in src.rels.items():
+        rels.add_relationship(rel.reltype, rel.target_ref if rel.is_external else rel.target_part, rid, rel.is_external)
+    part.__dict__["rels"] = rels  # Part.rels is a lazyproperty
+    return part.document
+
+
+def remember_parsed(resume_id: str, version: int, doc):
+    """
+    Keep the document just committed as version (it must not be edited
+    afterwards).
+    """
+    _parsed.put(resume_id, (version, doc))
+
+
+def committed(resume_id: str, version: int):
+    """
+    The parsed document last committed as version, if still kept. Read
+    only: clone it (snapshot) to edit.
+    """
+    cached = _parsed.get(resume_id)
+    return cached[1] if cached is not None and cached[0] == version else None
+
+
+def snapshot(resume_id: str):
+    """
+    Editable clone of the resume as it currently stands (hot document
+    included), from memory when possible.
+    """
+    with resume_lock(resume_id):
+        doc = peek(resume_id)
+        if doc is not None:
+            return clone_document(doc)
+        version = meta_index.get_version(resume_id)
+        cached = _parsed.get(resume_id)
+        if cached is None or cached[0] != version:
+            cached = (version, Document(str(get_current_path(resume_id))))
+            _parsed.put(resume_id, cached)
+        return clone_document(cached[1])
+
+
+# --------------------------
+# Background flusher
+# --------------------------
+_thread = None
+_stop = threading.Event()
+_single = None  # open lock file while this process runs write-behind
+
+
+def _claim_single_process():
+    """
+    Hold an exclusive lock on .work/write-behind.lock for as long as this
+    process runs write-behind: the unsaved edits of another worker would be
+    invisible here and overwritten by its flushes (and ours by its).
+    """
+    global _single
+    import fcntl
+
+    WORK_DIR.mkdir(parents=True, exist_ok=True)
+    path = WORK_DIR / "write-behind.lock"
+    f = open(path, "a+")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        raise RuntimeError(f"RESUME_WRITE_BEHIND=1 needs a single worker process; {path} is held by another") from None
+    _single = f
+
+
+def _loop():
+    tick = min(WRITE_BEHIND_QUIET_SECONDS, WRITE_BEHIND_MAX_DELAY_SECONDS) / 4
+    while not _stop.is_set():
+        try:
+            flush_due()
+        except Exception:
+            log.exception("write-behind flush failed")
+        _stop.wait(tick)
+
+
+def start_flusher():
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    if _single is None:
+        _claim_single_process()
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, name="write-behind", daemon=True)
+    _thread.start()
+
+
+def stop_flusher():
+    """
+    Stop the flusher and write out everything still pending.
+    """
+    global _thread, _single
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=5)
+    _thread = None
+    flush_all()
+    if _single is not None:
+        _single.close()  # releases the lock
+        _single = None
@@ -0,0 +1,237 @@
+"""
+Idempotency-Key support for the routes that create or change documents.
+
+Clients and the gateway retry on timeout; without this, every retried
+upload created another resume (and analysis) and every retried PATCH
+parsed and saved the document again. A request sent with an
+Idempotency-Key header now claims the key; a retry with the same key gets
+the stored response back (status, headers and body, plus
+"Idempotent-Replayed: true") without running the route. A duplicate
+arriving while the first call is still running waits for it, for up to
+IDEMPOTENCY_WAIT_SECONDS, then gets 409.
+
+Keys live in a SQLite file next to the indexes, so a retry landing on
+another worker is recognised too. A key belongs to one method, path and
+query string: reusing it for a different request is a 422. Only responses below 500 are
+kept; after an error or a crash the key is free again (a claim older than
+IDEMPOTENCY_LOCK_SECONDS counts as abandoned). Keys expire after
+IDEMPOTENCY_TTL_SECONDS, and the oldest are dropped beyond
+IDEMPOTENCY_MAX_KEYS.
+
+The request body is not part of the match: multipart retries usually come
+with a new boundary, so equal uploads don't have equal bytes.
+"""
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from ..config import (
+    IDEMPOTENCY_ENABLED, IDEMPOTENCY_PATH, IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_MAX_KEYS,
+    IDEMPOTENCY_WAIT_SECONDS, IDEMPOTENCY_LOCK_SECONDS,
+)
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = False
+
+MAX_KEY_LENGTH = 255
+TRIM_EVERY = 100  # completed keys between two TTL / size trims (per process)
+_completed = 0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key         TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,   -- method, path and query the key was first used with
+    state       TEXT NOT NULL,   -- 'pending' | 'done'
+    status      INTEGER,
+    headers     TEXT,            -- json [[name, value], ...]
+    body        BLOB,
+    created_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_idempotency_keys_created_at ON idempotency_keys (created_at);
+"""
+
+# POST /resume/upload, the bullet insert / move routes, and every PATCH or DELETE
+_POST_ROUTES = re.compile(r"^/resume/(upload|[^/]+/[^/]+/bullets/\d+(/\d+/move)?)/?$")
+
+
+def covers(method: str, path: str) -> bool:
+    return method in ("PATCH", "DELETE") or (method == "POST" and _POST_ROUTES.match(path) is not None)
+
+
+# --------------------------
+# Store
+# --------------------------
+
+def _conn() -> sqlite3.Connection:
+    global _initialized
+    c = getattr(_local, "conn", None)
+    if c is None:
+        IDEMPOTENCY_PATH.parent.mkdir(parents=True, exist_ok=True)
+        c = sqlite3.connect(IDEMPOTENCY_PATH, timeout=30)
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+        with _init_lock:
+            if not _initialized:
+                c.executescript(SCHEMA)
+                _initialized = True
+        _local.conn = c
+    return c
+
+
+class Stored:
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int, headers: list, body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+def claim(key: str, fingerprint: str) -> tuple[str, Stored | None]:
+    """
+    ("new", None): the caller runs the request and must complete() or
+    release() the key. ("done", response), ("pending", None) while another
+    call runs, or ("mismatch", None) for a key used with another request.
+    """
+    now = time.time()
+    c = _conn()
+    with c:
+        c.execute("DELETE FROM idempotency_keys WHERE key=? AND created_at<?", (key, now - IDEMPOTENCY_TTL_SECONDS))
+        c.execute(  # a claim whose owner died
+            "DELETE FROM idempotency_keys WHERE key=? AND state='pending' AND created_at<?",
+            (key, now - IDEMPOTENCY_LOCK_SECONDS),
+        )
+        inserted = c.execute(
+            "INSERT OR IGNORE INTO idempotency_keys (key, fingerprint, state, created_at) VALUES (?, ?, 'pending', ?)",
+            (key, fingerprint, now),
+        ).rowcount
+    if inserted:
+        return "new", None
+
+    row = c.execute(
+        "SELECT fingerprint, state, status, headers, body FROM idempotency_keys WHERE key=?", (key,)
+    ).fetchone()
+    if row is None:  # released in between
+        return claim(key, fingerprint)
+    fp, state, status, headers, body = row
+    if fp != fingerprint:
+        return "mismatch", None
+    if state != "done":
+        return "pending", None
+    return "done", Stored(status, [tuple(h) for h in json.loads(headers)], bytes(body))
+
+
+def complete(key: str, response: Stored):
+    global _completed
+    c = _conn()
+    with c:
+        c.execute(
+            "UPDATE idempotency_keys SET state='done', status=?, headers=?, body=? WHERE key=?",
+            (response.status, json.dumps(response.headers), sqlite3.Binary(response.body), key),
+        )
+    _completed += 1
+    if _completed % TRIM_EVERY == 0:
+        trim()
+
+
+def release(key: str):
+    with _conn() as c:
+        c.execute("DELETE FROM idempotency_keys WHERE key=? AND state='pending'", (key,))
+
+
+def trim():
+    """
+    Drop expired keys, then the oldest beyond IDEMPOTENCY_MAX_KEYS.
+    """
+    c = _conn()
+    with c:
+        c.execute("DELETE FROM idempotency_keys WHERE created_at<?", (time.time() - IDEMPOTENCY_TTL_SECONDS,))
+        c.execute(
+            "DELETE FROM idempotency_keys WHERE key IN ("
+            " SELECT key FROM idempotency_keys WHERE state='done' ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (IDEMPOTENCY_MAX_KEYS,),
+        )
+
+
+# --------------------------
+# Middleware
+# --------------------------
+
+def _json_response(status: int, detail: str) -> Stored:
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    return Stored(status, [("content-type", "application/json"), ("content-length", str(len(body)))], body)
+
+
+async def _send_stored(send, response: Stored, replayed: bool = False):
+    headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in response.headers]
+    if replayed:
+        headers.append((b"idempotent-replayed", b"true"))
+    await send({"type": "http.response.start", "status": response.status, "headers": headers})
+    await send({"type": "http.response.body", "body": response.body})
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware applying Idempotency-Key to the routes covers() picks.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not IDEMPOTENCY_ENABLED or not covers(scope["method"], scope["path"]):
+            return await self.app(scope, receive, send)
+        key = None
+        for name, value in scope["headers"]:
+            if name == b"idempotency-key":
+                key = value.decode("latin-1").strip()
+                break
+        if key is None:
+            return await self.app(scope, receive, send)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return await _send_stored(send, _json_response(400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"))
+
+        fingerprint = f"{scope['method']} {scope['path']}?{scope.get('query_string', b'').decode('latin-1')}"
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+        pause = 0.02
+        while True:
+            state, stored = await run_in_threadpool(claim, key, fingerprint)
+            if state == "new":
+                break
+            if state == "done":
+                return await _send_stored(send, stored, replayed=True)
+            if state == "mismatch":
+                return await _send_stored(send, _json_response(
+                    422, "Idempotency-Key was already used for a different request"))
+            if time.monotonic() >= deadline:
+                return await _send_stored(send, _json_response(
+                    409, "A request with this Idempotency-Key is still being processed"))
+            await asyncio.sleep(pause)
+            pause = min(pause * 2, 0.25)
+
+        captured = {"status": 500, "headers": [], "body": []}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                captured["status"] = message["status"]
+                captured["headers"] = [(k.decode("latin-1"), v.decode("latin-1")) for k, v in message.get("headers", [])]
+            elif message["type"] == "http.response.body":
+                captured["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        except BaseException:
+            release(key)  # not awaited: may be cancelled
+            raise
+        if captured["status"] >= 500:
+            await run_in_threadpool(release, key)
+        else:
+            response = Stored(captured["status"], captured["headers"], b"".join(captured["body"]))
+            await run_in_threadpool(complete, key, response)
@@ -0,0 +1,391 @@
+"""
+Inverted index over the section text of every stored resume, for ranking
+many resumes against one job description.
+
+Postings (term, resume, section, tf) live in SQLite and are rewritten for a
+resume on every upload/patch (editor.index_resume). Each process keeps the
+postings of recently queried terms as NumPy arrays and drops exactly the
+terms other writers touched (via the `changes` log), so a query is one
+BM25 accumulation over a few arrays instead of re-parsing any .docx.
+
+    python -m app.services.inverted_index rank --jd job.txt --top-k 20
+    python -m app.services.inverted_index rebuild
+"""
+import io
+import math
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from ..config import RANK_INDEX_PATH
+from ..services.cache import LRUCache
+from ..services.terms import tokenize, resume_units
+
+K1 = 1.2
+B = 0.75
+MAX_CHANGES_KEPT = 200_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id    INTEGER PRIMARY KEY AUTOINCREMENT,
+    resume_id TEXT NOT NULL UNIQUE,
+    version   INTEGER NOT NULL,
+    length    INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (
+    term_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    term    TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS sections (
+    section_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name       TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term_id    INTEGER NOT NULL,
+    doc_id     INTEGER NOT NULL,
+    section_id INTEGER NOT NULL,
+    tf         INTEGER NOT NULL,
+    PRIMARY KEY (term_id, doc_id, section_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_postings_doc ON postings (doc_id);
+-- term_id NULL means "docs table changed"
+CREATE TABLE IF NOT EXISTS changes (
+    seq     INTEGER PRIMARY KEY AUTOINCREMENT,
+    term_id INTEGER
+);
+"""
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def _conn() -> sqlite3.Connection:
+    global _initialized
+    c = getattr(_local, "conn", None)
+    if c is None:
+        RANK_INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+        c = sqlite3.connect(RANK_INDEX_PATH, timeout=30)
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+        with _init_lock:
+            if not _initialized:
+                c.executescript(SCHEMA)
+                _initialized = True
+        _local.conn = c
+    return c
+
+
+def _ids_for(c, table: str, id_col: str, key_col: str, keys) -> dict:
+    keys = list(keys)
+    c.executemany(f"INSERT OR IGNORE INTO {table} ({key_col}) VALUES (?)", [(k,) for k in keys])
+    out = {}
+    for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        q = f"SELECT {key_col}, {id_col} FROM {table} WHERE {key_col} IN ({','.join('?' * len(chunk))})"
+        out.update(c.execute(q, chunk))
+    return out
+
+
+# --------------------------
+# Writes
+# --------------------------
+def update(resume_id: str, version: int, extracted: dict):
+    """
+    Replace one resume's postings with the terms of `extracted`
+    (editor.extract_resume output). No-op if this version is already indexed.
+    """
+    counts = Counter()
+    for sec, _, _, text in resume_units(extracted):
+        for t in tokenize(text):
+            counts[(t, sec)] += 1
+
+    c = _conn()
+    with c:
+        row = c.execute("SELECT doc_id, version FROM docs WHERE resume_id=?", (resume_id,)).fetchone()
+        if row and row[1] == version:
+            return
+        if row:
+            doc_id = row[0]
+        else:
+            doc_id = c.execute(
+                "INSERT INTO docs (resume_id, version, length) VALUES (?, ?, 0)", (resume_id, version)
+            ).lastrowid
+
+        old_terms = [r[0] for r in c.execute("SELECT DISTINCT term_id FROM postings WHERE doc_id=?", (doc_id,))]
+        c.execute("DELETE FROM postings WHERE doc_id=?", (doc_id,))
+
+        term_ids = _ids_for(c, "terms", "term_id", "term", {t for t, _ in counts})
+        sec_ids = _ids_for(c, "sections", "section_id", "name", {s for _, s in counts})
+        c.executemany(
+            "INSERT INTO postings (term_id, doc_id, section_id, tf) VALUES (?, ?, ?, ?)",
+            [(term_ids[t], doc_id, sec_ids[s], n) for (t, s), n in counts.items()],
+        )
+        length = sum(n for (t, _), n in counts.items() if " " not in t)  # unigram count
+        c.execute("UPDATE docs SET version=?, length=? WHERE doc_id=?", (version, length, doc_id))
+
+        touched = set(old_terms) | set(term_ids.values())
+        c.executemany("INSERT INTO changes (term_id) VALUES (?)", [(t,) for t in touched] + [(None,)])
+        _prune_changes(c)
+
+
+def remove(resume_id: str):
+    c = _conn()
+    with c:
+        row = c.execute("SELECT doc_id FROM docs WHERE resume_id=?", (resume_id,)).fetchone()
+        if row is None:
+            return
+        old_terms = [r[0] for r in c.execute("SELECT DISTINCT term_id FROM postings WHERE doc_id=?", (row[0],))]
+        c.execute("DELETE FROM postings WHERE doc_id=?", (row[0],))
+        c.execute("DELETE FROM docs WHERE doc_id=?", (row[0],))
+        c.executemany("INSERT INTO changes (term_id) VALUES (?)", [(t,) for t in old_terms] + [(None,)])
+        _prune_changes(c)
+
+
+def _prune_changes(c):
+    oldest, last = c.execute("SELECT MIN(seq), MAX(seq) FROM changes").fetchone()
+    if last - oldest > MAX_CHANGES_KEPT + 10_000:  # prune in chunks, not on every write
+        c.execute("DELETE FROM changes WHERE seq <= ?", (last - MAX_CHANGES_KEPT,))
+
+
+# --------------------------
+# Per-process read side
+# --------------------------
+class _Postings:
+    """All postings of one term as arrays (doc-level and section-level)."""
+    __slots__ = ("docs", "tf", "sec_docs", "sec_ids", "sec_tf")
+
+    def __init__(self, rows):
+        if rows:
+            arr = np.array(rows, dtype=np.int64)
+            self.sec_docs = arr[:, 0]
+            self.sec_ids = arr[:, 1]
+            self.sec_tf = arr[:, 2].astype(np.float32)
+        else:
+            self.sec_docs = self.sec_ids = np.zeros(0, dtype=np.int64)
+            self.sec_tf = np.zeros(0, dtype=np.float32)
+        self.docs, inv = np.unique(self.sec_docs, return_inverse=True)
+        self.tf = np.bincount(inv, weights=self.sec_tf, minlength=len(self.docs)).astype(np.float32)
+
+
+class _Docs:
+    """
+    The docs table as one query sees it. Replaced whole, never changed, so
+    a query keeps a consistent view while another thread syncs.
+    """
+    __slots__ = ("dl", "live", "resume_of", "sections", "avgdl")
+
+    def __init__(self, rows=(), sections=None):
+        max_id = max((r[0] for r in rows), default=0)
+        self.dl = np.zeros(max_id + 1, dtype=np.float32)  # doc length by doc_id
+        self.live = np.zeros(max_id + 1, dtype=bool)
+        self.resume_of = {}                                # doc_id -> (resume_id, version)
+        for doc_id, rid, version, length in rows:
+            self.dl[doc_id] = length
+            self.live[doc_id] = True
+            self.resume_of[doc_id] = (rid, version)
+        self.sections = sections or {}                     # section_id -> name
+        self.avgdl = (float(self.dl[self.live].mean()) if self.resume_of else 0.0) or 1.0
+
+    def known(self, doc_ids: np.ndarray) -> np.ndarray:
+        """
+        Mask of the doc_ids in this view. Postings read after it was taken
+        may hold docs written (or removed) since.
+        """
+        mask = doc_ids < len(self.live)
+        mask[mask] = self.live[doc_ids[mask]]
+        return mask
+
+
+class _Reader:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.seq = -1
+        self.postings = LRUCache(maxsize=50_000)  # term_id -> _Postings
+        self.docs = _Docs()
+
+    def sync(self, c) -> _Docs:
+        """
+        Drop cached postings of terms other writers touched since last time.
+        Returns the docs view for one query.
+        """
+        with self.lock:
+            oldest, last = c.execute("SELECT MIN(seq), COALESCE(MAX(seq), 0) FROM changes").fetchone()
+            if self.seq < 0 or (oldest is not None and oldest > self.seq + 1):
+                # first use, or the log was pruned past us: start over
+                self.postings = LRUCache(maxsize=self.postings.maxsize)
+                self._reload_docs(c)
+                self.seq = last
+                return self.docs
+            if last == self.seq:
+                return self.docs
+            docs_changed = False
+            for (term_id,) in c.execute(
+                "SELECT term_id FROM changes WHERE seq > ? AND seq <= ?", (self.seq, last)
+            ):
+                if term_id is None:
+                    docs_changed = True
+                else:
+                    self.postings.pop(term_id)
+            if docs_changed:
+                self._reload_docs(c)
+            self.seq = last
+            return self.docs
+
+    def _reload_docs(self, c):
+        rows = c.execute("SELECT doc_id, resume_id, version, length FROM docs").fetchall()
+        self.docs = _Docs(rows, dict(c.execute("SELECT section_id, name FROM sections")))
+
+    def postings_for(self, c, term_id: int) -> _Postings:
+        p = self.postings.get(term_id)
+        if p is None:
+            rows = c.execute(
+                "SELECT doc_id, section_id, tf FROM postings WHERE term_id=?", (term_id,)
+            ).fetchall()
+            p = _Postings(rows)
+            self.postings.put(term_id, p)
+        return p
+
+
+_reader = _Reader()
+
+
+def rank(job_description: str, top_k: int = 20, explain: bool = True) -> dict:
+    """
+    BM25 of every indexed resume against the JD; returns the top_k with
+    per-section scores and matched terms.
+    """
+    t0 = time.perf_counter()
+    c = _conn()
+    docs = _reader.sync(c)
+
+    q_counts = Counter(tokenize(job_description))
+    terms = {}
+    keys = list(q_counts)
+    for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        terms.update(c.execute(
+            f"SELECT term, term_id FROM terms WHERE term IN ({','.join('?' * len(chunk))})", chunk
+        ))
+
+    n_docs = len(docs.resume_of)
+    scores = np.zeros(len(docs.dl), dtype=np.float32)
+    used = []  # (term, postings, query weight * idf)
+    for term, term_id in terms.items():
+        p = _reader.postings_for(c, term_id)
+        known = docs.known(p.docs)
+        doc_ids, tf = p.docs[known], p.tf[known]
+        if not len(doc_ids):
+            continue
+        df = len(doc_ids)
+        idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+        w = (1.0 + math.log(q_counts[term])) * idf
+        norm = K1 * (1.0 - B + B * docs.dl[doc_ids] / docs.avgdl)
+        scores[doc_ids] += w * tf * (K1 + 1.0) / (tf + norm)  # docs are unique per term
+        used.append((term, p, w))
+
+    hits = int(np.count_nonzero(scores))
+    k = min(top_k, hits)
+    if k:
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+    else:
+        top = np.zeros(0, dtype=np.int64)
+
+    results = []
+    explanations = _explain(docs, top, used) if explain else {}
+    for doc_id in top.tolist():
+        rid, version = docs.resume_of[doc_id]
+        results.append({
+            "resume_id": rid,
+            "version": version,
+            "score": round(float(scores[doc_id]), 4),
+            "sections": explanations.get(doc_id, []),
+        })
+
+    return {
+        "total_indexed": n_docs,
+        "total_matched": hits,
+        "took_ms": round((time.perf_counter() - t0) * 1000, 2),
+        "results": results,
+    }
+
+
+def _explain(docs: _Docs, top: np.ndarray, used: list) -> dict:
+    """
+    Per-section breakdown for the top docs only: the same BM25 term weight,
+    computed on the section's tf (doc length normalisation kept).
+    """
+    per_doc = {}
+    if not len(top):
+        return per_doc
+    for term, p, w in used:
+        mask = np.isin(p.sec_docs, top)  # top holds known docs only
+        if not mask.any():
+            continue
+        doc_ids, secs, tf = p.sec_docs[mask], p.sec_ids[mask], p.sec_tf[mask]
+        norm = K1 * (1.0 - B + B * docs.dl[doc_ids] / docs.avgdl)
+        contrib = w * tf * (K1 + 1.0) / (tf + norm)
+        for d, s, v in zip(doc_ids.tolist(), secs.tolist(), contrib.tolist()):
+            sec = per_doc.setdefault(d, {}).setdefault(s, {"score": 0.0, "matched_terms": []})
+            sec["score"] += v
+            sec["matched_terms"].append(term)
+
+    out = {}
+    for d, secs in per_doc.items():
+        rows = [
+            {"section": docs.sections.get(s, str(s)), "score": round(v["score"], 4), "matched_terms": v["matched_terms"]}
+            for s, v in secs.items()
+        ]
+        out[d] = sorted(rows, key=lambda x: -x["score"])
+    return out
+
+
+def rebuild() -> int:
+    """
+    (Re)index every stored resume that isn't at its current version yet.
+    Up-to-date resumes are skipped without being read; returns how many
+    were (re)indexed.
+    """
+    from docx import Document
+
+    # editor / outline import this module to keep it updated on writes
+    from ..services.outline import build_outline
+    from ..services.storage import list_resume_ids, read_current
+    from ..services import meta_index
+
+    indexed = dict(_conn().execute("SELECT resume_id, version FROM docs"))
+    n = 0
+    for rid in list_resume_ids():
+        version = meta_index.get_version(rid) or 0
+        if indexed.get(rid) == version:
+            continue  # up to date: don't read or parse it
+        data = read_current(rid)  # not an access to the resume (the reaper's last access)
+        if data is None:
+            continue
+        update(rid, version, build_outline(Document(io.BytesIO(data))).extracted())
+        n += 1
+    return n
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import sys
+
+    ap = argparse.ArgumentParser(description="Rank stored resumes against a job description.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    rk = sub.add_parser("rank")
+    rk.add_argument("--jd", required=True, help="job description file ('-' for stdin)")
+    rk.add_argument("--top-k", type=int, default=20)
+    sub.add_parser("rebuild")
+    args = ap.parse_args()
+
+    if args.cmd == "rebuild":
+        print(f"indexed {rebuild()} resumes")
+    else:
+        jd = sys.stdin.read() if args.jd == "-" else open(args.jd, encoding="utf-8").read()
+        print(json.dumps(rank(jd, top_k=args.top_k), indent=2))
@@ -0,0 +1,472 @@
+"""
+Approximate page layout of a resume ("does it still fit on one page?").
+
+Not a renderer: it reads page size / margins from sectPr, paragraph spacing,
+indents and run font sizes (direct formatting > style chain > docDefaults)
+straight from the XML and wraps text greedily with per-font glyph width
+tables (the core-14 AFM widths, scaled for metric look-alikes). Good to a
+line or two on typical resumes and a few ms per document, so it runs after
+every patch.
+"""
+from functools import lru_cache
+import time
+
+from docx import Document
+from docx.oxml.ns import qn as _qn
+from lxml import etree
+
+from ..config import LAYOUT_TARGET_PAGES
+from ..services.cache import LRUCache
+from ..services.doc_parse import SECTION_REGEX
+from ..services.storage import get_current_path
+from ..services import meta_index, hot_docs
+
+# --------------------------
+# Font metrics
+# --------------------------
+# advance widths (1/1000 em) for chars 32..126
+_HELVETICA = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_TIMES = (
+    250, 333, 408, 500, 500, 833, 778, 180, 333, 333, 500, 564, 250, 333, 250, 278,
+    500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 278, 278, 564, 564, 564, 444,
+    921, 722, 667, 667, 722, 611, 556, 722, 722, 333, 389, 722, 611, 889, 722, 722,
+    556, 722, 667, 556, 611, 722, 722, 944, 722, 722, 611, 333, 278, 333, 469, 500,
+    333, 444, 500, 444, 500, 444, 333, 500, 500, 278, 278, 500, 278, 778, 500, 500,
+    500, 500, 333, 389, 278, 500, 500, 722, 500, 500, 444, 480, 200, 480, 541,
+)
+
+# font name -> (base table, width scale, single line height in em)
+_FONTS = {
+    "arial": (_HELVETICA, 1.0, 1.15),
+    "helvetica": (_HELVETICA, 1.0, 1.15),
+    "calibri": (_HELVETICA, 0.89, 1.22),
+    "carlito": (_HELVETICA, 0.89, 1.22),
+    "verdana": (_HELVETICA, 1.15, 1.22),
+    "tahoma": (_HELVETICA, 0.98, 1.21),
+    "segoe ui": (_HELVETICA, 0.98, 1.33),
+    "aptos": (_HELVETICA, 0.93, 1.2),
+    "times new roman": (_TIMES, 1.0, 1.15),
+    "times": (_TIMES, 1.0, 1.15),
+    "cambria": (_TIMES, 1.06, 1.17),
+    "georgia": (_TIMES, 1.1, 1.14),
+    "garamond": (_TIMES, 0.94, 1.12),
+    "book antiqua": (_TIMES, 1.04, 1.17),
+}
+
+# theme font slots (rFonts asciiTheme) -> Office default theme fonts
+_THEME_FONTS = {"minorHAnsi": "Calibri", "majorHAnsi": "Cambria", "minorAscii": "Calibri", "majorAscii": "Cambria"}
+
+qn = lru_cache(maxsize=None)(_qn)  # Clark names are looked up per run in the hot loop
+
+BOLD_FACTOR = 1.05
+TAB_PT = 36.0
+
+
+@lru_cache(maxsize=64)
+def font_metrics(font: str) -> tuple[dict, float, float]:
+    """
+    ({char: width in pt at 1pt size}, default width, line height factor) for a
+    font name; unknown fonts fall back to the closest family.
+    """
+    name = (font or "").lower()
+    base, scale, line = _FONTS.get(name) or (
+        _FONTS["times new roman"] if ("serif" in name and "sans" not in name) or "roman" in name else _FONTS["calibri"]
+    )
+    widths = {chr(32 + i): w * scale / 1000 for i, w in enumerate(base)}
+    widths["•"] = 350 * scale / 1000  # bullet
+    widths["–"] = 556 * scale / 1000
+    widths["—"] = 1000 * scale / 1000
+    avg = sum(base[65:91]) / 26 * scale / 1000  # a-z
+    return widths, avg, line
+
+
+# --------------------------
+# Property resolution
+# --------------------------
+def _twips(el, attr, default=None):
+    if el is None:
+        return default
+    v = el.get(qn(attr))
+    if v is None:
+        return default
+    try:
+        return int(float(v))
+    except ValueError:
+        return default
+
+
+def _on(el) -> bool:
+    return el is not None and el.get(qn("w:val")) not in ("0", "false", "off")
+
+
+class _Styles:
+    """
+    Resolved paragraph / run defaults per styleId (basedOn chains followed
+    once, memoised for the document).
+    """
+
+    def __init__(self, doc):
+        try:
+            root = doc.styles.element
+        except Exception:
+            root = None
+        self.by_id = {}
+        self.default_para = None
+        self.ppr_default = self.rpr_default = None
+        if root is None:
+            return
+        dd = root.find(qn("w:docDefaults"))
+        if dd is not None:
+            self.ppr_default = dd.find(qn("w:pPrDefault") + "/" + qn("w:pPr"))
+            self.rpr_default = dd.find(qn("w:rPrDefault") + "/" + qn("w:rPr"))
+        for s in root.iterchildren(qn("w:style")):
+            sid = s.get(qn("w:styleId"))
+            self.by_id[sid] = s
+            if s.get(qn("w:type")) == "paragraph" and s.get(qn("w:default")) in ("1", "true"):
+                self.default_para = sid
+        self._chains = {}
+        self.formats = {}
+
+    def chain(self, sid):
+        """
+        pPr / rPr elements for a style, nearest first, docDefaults last.
+        """
+        sid = sid or self.default_para
+        if sid in self._chains:
+            return self._chains[sid]
+        pprs, rprs, seen = [], [], set()
+        cur = sid
+        while cur and cur not in seen and cur in self.by_id:
+            seen.add(cur)
+            s = self.by_id[cur]
+            pprs.append(s.find(qn("w:pPr")))
+            rprs.append(s.find(qn("w:rPr")))
+            based = s.find(qn("w:basedOn"))
+            cur = based.get(qn("w:val")) if based is not None else None
+        pprs.append(self.ppr_default)
+        rprs.append(self.rpr_default)
+        res = ([p for p in pprs if p is not None], [r for r in rprs if r is not None])
+        self._chains[sid] = res
+        return res
+
+
+def _first(chain, tag):
+    for el in chain:
+        c = el.find(qn(tag))
+        if c is not None:
+            return c
+    return None
+
+
+def _prop(chain, tag, attr, default=None):
+    """
+    Nearest value of one attribute: a direct w:spacing that only sets "after"
+    still inherits "line" from the style.
+    """
+    for el in chain:
+        c = el.find(qn(tag))
+        if c is not None and c.get(qn(attr)) is not None:
+            return _twips(c, attr, default)
+    return default
+
+
+def _font_of(rpr_chain) -> str:
+    for rpr in rpr_chain:
+        f = rpr.find(qn("w:rFonts"))
+        if f is None:
+            continue
+        name = f.get(qn("w:ascii")) or f.get(qn("w:hAnsi"))
+        if name:
+            return name
+        theme = f.get(qn("w:asciiTheme")) or f.get(qn("w:hAnsiTheme"))
+        if theme:
+            return _THEME_FONTS.get(theme, "Calibri")
+    return "Times New Roman"  # Word's default when nothing is specified
+
+
+def _size_of(rpr_chain) -> float:
+    sz = _first(rpr_chain, "w:sz")
+    return _twips(sz, "w:val", 20) / 2  # half-points
+
+
+class _Para:
+    __slots__ = ("before", "after", "lines", "line_h", "style", "contextual", "page_break_before")
+
+
+def _para_format(styles: _Styles, ppr) -> tuple:
+    """
+    Resolved paragraph properties, memoised per (style, direct pPr): most
+    paragraphs of a resume share a handful of formats.
+    """
+    ps = ppr.find(qn("w:pStyle")) if ppr is not None else None
+    sid = ps.get(qn("w:val")) if ps is not None else None
+    key = (sid, etree.tostring(ppr) if ppr is not None else None)
+    fmt = styles.formats.get(key)
+    if fmt is not None:
+        return fmt
+
+    ppr_chain, rpr_chain = styles.chain(sid)
+    if ppr is not None:
+        ppr_chain = [ppr] + ppr_chain
+
+    num = _first(ppr_chain, "w:numPr")
+    ind = _first(ppr_chain, "w:ind")
+    left = _prop(ppr_chain, "w:ind", "w:left", _prop(ppr_chain, "w:ind", "w:start", 0)) / 20
+    right = _prop(ppr_chain, "w:ind", "w:right", _prop(ppr_chain, "w:ind", "w:end", 0)) / 20
+    first = (_prop(ppr_chain, "w:ind", "w:firstLine", 0) - _prop(ppr_chain, "w:ind", "w:hanging", 0)) / 20
+    if num is not None and ind is None:
+        left, first = 36.0, -18.0  # numbering level default: 0.5" with 0.25" hanging
+
+    line = _prop(ppr_chain, "w:spacing", "w:line", 240)
+    rule = next(
+        (sp.get(qn("w:lineRule")) for sp in (el.find(qn("w:spacing")) for el in ppr_chain)
+         if sp is not None and sp.get(qn("w:line")) is not None),
+        None,
+    )
+    fmt = (
+        sid, rpr_chain, left, right, first, line, rule,
+        _prop(ppr_chain, "w:spacing", "w:before", 0) / 20,
+        _prop(ppr_chain, "w:spacing", "w:after", 0) / 20,
+        _on(_first(ppr_chain, "w:contextualSpacing")),
+        _on(_first(ppr_chain, "w:pageBreakBefore")),
+        _font_of(rpr_chain), _size_of(rpr_chain), _on(_first(rpr_chain, "w:b")),
+    )
+    styles.formats[key] = fmt
+    return fmt
+
+
+def _measure_paragraph(p, styles: _Styles, width_pt: float) -> _Para:
+    (sid, rpr_chain, left, right, first, line, rule, before, after, contextual, break_before,
+     para_font, para_size, para_bold) = _para_format(styles, p.find(qn("w:pPr")))
+
+    # words as widths: [(word_width, space_width_after)], explicit breaks as None
+    words, cur_w, max_size, fonts = [], 0.0, 0.0, set()
+    pending_space = 0.0
+    for r in p.iter(qn("w:r")):
+        rpr = r.find(qn("w:rPr"))
+        if rpr is not None:
+            chain = [rpr] + rpr_chain
+            font, size, bold = _font_of(chain), _size_of(chain), _on(_first(chain, "w:b"))
+        else:
+            font, size, bold = para_font, para_size, para_bold
+        widths, avg, _ = font_metrics(font)
+        scale = size * (BOLD_FACTOR if bold else 1.0)
+        fonts.add(font)
+        max_size = max(max_size, size)
+
+        for child in r:
+            tag = child.tag
+            if tag == qn("w:t"):
+                for ch in child.text or "":
+                    if ch == " ":
+                        if cur_w:
+                            words.append((cur_w, pending_space))
+                            cur_w, pending_space = 0.0, 0.0
+                        pending_space += widths[" "] * scale
+                    else:
+                        cur_w += widths.get(ch, avg) * scale
+            elif tag == qn("w:tab"):
+                if cur_w:
+                    words.append((cur_w, pending_space))
+                    cur_w, pending_space = 0.0, 0.0
+                pending_space += TAB_PT
+            elif tag in (qn("w:br"), qn("w:cr")):
+                if cur_w:
+                    words.append((cur_w, pending_space))
+                    cur_w, pending_space = 0.0, 0.0
+                words.append(None)
+    if cur_w:
+        words.append((cur_w, pending_space))
+
+    # greedy line fill
+    avail = max(width_pt - left - right, 36.0)
+    lines, x, first_line = 1, first, True
+    for w in words:
+        if w is None:
+            lines, x, first_line = lines + 1, 0.0, False
+            continue
+        word_w, space = w
+        if x > (first if first_line else 0.0) and x + space + word_w > avail:
+            lines, x, first_line = lines + 1, 0.0, False
+            space = 0.0
+        x += space + word_w
+        if x > avail:  # a single word wider than the line
+            extra = int(x // avail)
+            lines += extra
+            x -= extra * avail
+            first_line = False
+
+    size = max_size or para_size
+    line_factor = max((font_metrics(f)[2] for f in fonts), default=font_metrics(para_font)[2])
+    natural = size * line_factor
+    if rule == "exact":
+        line_h = line / 20
+    elif rule == "atLeast":
+        line_h = max(line / 20, natural)
+    else:
+        line_h = natural * line / 240
+
+    out = _Para()
+    out.before = before
+    out.after = after
+    out.lines = lines
+    out.line_h = line_h
+    out.style = sid
+    out.contextual = contextual
+    out.page_break_before = break_before or any(
+        br.get(qn("w:type")) == "page" for br in p.iter(qn("w:br"))
+    )
+    return out
+
+
+def _paragraph_height(m: _Para) -> float:
+    return m.before + m.lines * m.line_h + m.after
+
+
+def _table_height(tbl, styles: _Styles, width_pt: float) -> float:
+    cols = [_twips(c, "w:w", 0) / 20 for g in tbl.iterchildren(qn("w:tblGrid")) for c in g.iterchildren(qn("w:gridCol"))]
+    mar = tbl.find(qn("w:tblPr") + "/" + qn("w:tblCellMar"))
+    pad = (_twips(mar.find(qn("w:left")) if mar is not None else None, "w:w", 108)
+           + _twips(mar.find(qn("w:right")) if mar is not None else None, "w:w", 108)) / 20
+
+    total = 0.0
+    for tr in tbl.iterchildren(qn("w:tr")):
+        tcs = list(tr.iterchildren(qn("w:tc")))
+        row_h, col = 0.0, 0
+        for tc in tcs:
+            span = _twips(tc.find(qn("w:tcPr") + "/" + qn("w:gridSpan")), "w:val", 1)
+            if cols and col + span <= len(cols):
+                cell_w = sum(cols[col:col + span])
+            else:
+                cell_w = width_pt / max(len(tcs), 1)
+            col += span
+            cell_h, prev = 0.0, None
+            for child in tc:
+                if child.tag == qn("w:p"):
+                    m = _measure_paragraph(child, styles, cell_w - pad)
+                    cell_h += _paragraph_height(m)
+                    if prev is not None and m.contextual and prev.contextual and m.style == prev.style:
+                        cell_h -= prev.after + m.before  # contextual spacing: none between them
+                    prev = m
+                elif child.tag == qn("w:tbl"):
+                    cell_h += _table_height(child, styles, cell_w - pad)
+            row_h = max(row_h, cell_h)
+        trh = tr.find(qn("w:trPr") + "/" + qn("w:trHeight"))
+        if trh is not None:
+            h = _twips(trh, "w:val", 0) / 20
+            row_h = h if trh.get(qn("w:hRule")) == "exact" else max(row_h, h)
+        total += row_h
+    return total
+
+
+# --------------------------
+# Page flow
+# --------------------------
+def estimate_layout(doc, target_pages: int = LAYOUT_TARGET_PAGES) -> dict:
+    """
+    Page count and per-section placement of a parsed document.
+    Sections are the SECTION_REGEX headers detect_headers_doc finds; text
+    before the first one is reported as "HEADER".
+    """
+    t0 = time.perf_counter()
+    body = doc.element.body
+    sect = body.find(qn("w:sectPr"))
+    pg = sect.find(qn("w:pgSz")) if sect is not None else None
+    mar = sect.find(qn("w:pgMar")) if sect is not None else None
+    page_w = _twips(pg, "w:w", 12240) / 20
+    page_h = _twips(pg, "w:h", 15840) / 20
+    text_w = page_w - (_twips(mar, "w:left", 1440) + _twips(mar, "w:right", 1440)) / 20
+    body_h = page_h - (_twips(mar, "w:top", 1440) + _twips(mar, "w:bottom", 1440)) / 20
+
+    styles = _Styles(doc)
+    page, y = 1, 0.0
+    section = "HEADER"
+    sections = {}
+    prev = None
+
+    def place(sec, height):
+        nonlocal page, y
+        s = sections.setdefault(sec, {"section": sec, "start_page": page, "end_page": page, "height_pt": 0.0, "overflow_pt": 0.0})
+        if y + height > body_h and y > 0:
+            page, y = page + 1, 0.0
+        y += height
+        s["end_page"] = page
+        s["height_pt"] += height
+        if page > target_pages:
+            s["overflow_pt"] += height
+
+    for child in body.iterchildren():
+        tag = child.tag
+        if tag == qn("w:p"):
+            text = "".join(t.text or "" for t in child.iter(qn("w:t"))).strip()
+            if text and SECTION_REGEX.match(text):
+                section = text
+            m = _measure_paragraph(child, styles, text_w)
+            if m.page_break_before and y > 0:
+                page, y = page + 1, 0.0
+            before, after = m.before, m.after
+            if prev is not None and m.contextual and prev.contextual and m.style == prev.style:
+                before = 0.0
+                y = max(y - prev.after, 0.0)  # contextual spacing: no gap between same-style paragraphs
+            if y == 0:
+                before = 0.0  # space before is dropped at the top of a page
+            place(section, before + m.line_h)
+            for _ in range(m.lines - 1):
+                place(section, m.line_h)
+            if y + after > body_h:
+                y = body_h  # trailing space after collapses at the page bottom
+            else:
+                y += after
+                sections[section]["height_pt"] += after
+            prev = m
+        elif tag == qn("w:tbl"):
+            place(section, _table_height(child, styles, text_w))
+            prev = None
+
+    used = y
+    overflow = sum(s["overflow_pt"] for s in sections.values())
+    for s in sections.values():
+        s["height_pt"] = round(s["height_pt"], 1)
+        s["overflow_pt"] = round(s["overflow_pt"], 1)
+
+    return {
+        "pages": page,
+        "target_pages": target_pages,
+        "fits": page <= target_pages,
+        "page_width_pt": round(page_w, 1),
+        "page_height_pt": round(page_h, 1),
+        "body_height_pt": round(body_h, 1),
+        "last_page_used_pt": round(used, 1),
+        "free_pt": round(body_h - used, 1) if page <= target_pages else 0.0,
+        "overflow_pt": round(overflow, 1),
+        "sections": list(sections.values()),
+        "took_ms": round((time.perf_counter() - t0) * 1000, 2),
+    }
+
+
+_layout_cache = LRUCache(maxsize=512)
+
+
+def remember_layout(resume_id: str, version: int, layout: dict):
+    _layout_cache.put((resume_id, version), layout)
+
+
+def page_fit(resume_id: str) -> dict:
+    """
+    Layout estimate of current.docx, cached per (resume_id, version).
+    """
+    version = meta_index.get_version(resume_id)
+    key = (resume_id, version)
+    res = _layout_cache.get(key)
+    if res is None:
+        with hot_docs.reading(resume_id) as doc:
+            res = estimate_layout(doc if doc is not None else Document(str(get_current_path(resume_id))))
+        _layout_cache.put(key, res)
+    return res
@@ -0,0 +1,59 @@
+"""
+Service modules imported on first use.
+
+Importing the app used to pull in numpy, python-docx and the root editor
+modules before anything could be served. Routes now hold LazyModule
+handles instead; the real import happens on the first request that needs
+the module, or all at once in main's warmup hook (RESUME_WARMUP=1).
+"""
+import importlib
+import importlib.util
+import sys
+
+_handles: list = []
+
+
+class LazyModule:
+    """
+    Stand-in for a module, imported on first attribute access. The import
+    lock makes concurrent first uses safe.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def is_loaded(self) -> bool:
+        # also true when something imported the module directly
+        return self._module is not None or self._name in sys.modules
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}{'' if self.is_loaded else ' (not loaded)'}>"
+
+
+def lazy_import(name: str, package: str | None = None) -> LazyModule:
+    """
+    lazy_import("..services.editor", __package__): a handle on the module,
+    imported when first used.
+    """
+    handle = LazyModule(importlib.util.resolve_name(name, package) if name.startswith(".") else name)
+    _handles.append(handle)
+    return handle
+
+
+def load_all() -> int:
+    """
+    Import every module handed out so far (warmup). Returns how many.
+    """
+    for handle in _handles:
+        handle.load()
+    return len(_handles)
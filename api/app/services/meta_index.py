@@ -0,0 +1,232 @@
+"""
+Persistent SQLite index of per-resume metadata.
+
+One row per resume (version, content hash, detected sections, section->table
+map, per-entry headers and bullet counts), rewritten in a single
+transaction on every write. /sections, listings and search read from here,
+so a cold process never has to open current.docx to answer them.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+from ..config import META_INDEX_PATH
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = False
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    resume_id      TEXT PRIMARY KEY,
+    version        INTEGER NOT NULL,
+    content_hash   TEXT NOT NULL,
+    sections       TEXT NOT NULL,   -- json list
+    section_tables TEXT NOT NULL,   -- json {section: [table_index]}
+    tables_found   INTEGER NOT NULL,
+    created_at     REAL NOT NULL,
+    updated_at     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resume_sections (
+    resume_id TEXT NOT NULL,
+    section   TEXT NOT NULL,
+    PRIMARY KEY (resume_id, section)
+);
+CREATE INDEX IF NOT EXISTS ix_resume_sections_section ON resume_sections (section);
+CREATE INDEX IF NOT EXISTS ix_resumes_content_hash ON resumes (content_hash);
+CREATE TABLE IF NOT EXISTS resume_entries (
+    resume_id    TEXT NOT NULL,
+    section      TEXT NOT NULL,
+    table_index  INTEGER NOT NULL,
+    header_left  TEXT NOT NULL,
+    header_right TEXT NOT NULL,
+    bullet_count INTEGER NOT NULL,
+    PRIMARY KEY (resume_id, table_index)
+);
+"""
+
+
+def _conn() -> sqlite3.Connection:
+    global _initialized
+    c = getattr(_local, "conn", None)
+    if c is None:
+        META_INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+        c = sqlite3.connect(META_INDEX_PATH, timeout=30)
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+        with _init_lock:
+            if not _initialized:
+                c.executescript(SCHEMA)
+                _initialized = True
+        _local.conn = c
+    return c
+
+
+class VersionConflict(Exception):
+    """
+    The resume is no longer at the version an edit started from (the
+    client's expected_version, or another worker committed meanwhile).
+    """
+
+    def __init__(self, expected: int, current: int | None):
+        super().__init__(f"Resume is at version {current}, not {expected}.")
+        self.expected = expected
+        self.current = current
+
+
+def record(resume_id: str, meta: dict, expected_version: int | None = None, write=None) -> int:
+    """
+    Upsert one resume's metadata, bumping its version. Returns the new version.
+    meta keys: content_hash, detected_sections, section_tables, tables_found,
+    entries ({section: [{table_index, left, right, bullet_count}]}).
+    expected_version: the version the change was made to; VersionConflict
+    if the stored one differs (compare-and-swap, across workers). write():
+    called once the version is claimed and before it is visible (e.g. the
+    move of the new current.docx), so no worker sees one without the other.
+    """
+    now = time.time()
+    c = _conn()
+    with c:  # one transaction: version bump + all child rows
+        c.execute("BEGIN IMMEDIATE")  # the write lock now: nobody bumps the version between check and update
+        row = c.execute("SELECT version, created_at FROM resumes WHERE resume_id=?", (resume_id,)).fetchone()
+        if expected_version is not None and row is not None and row[0] != expected_version:
+            raise VersionConflict(expected_version, row[0])
+        version = (row[0] + 1) if row else 1
+        created = row[1] if row else now
+        if write is not None:
+            write()
+
+        c.execute(
+            "INSERT OR REPLACE INTO resumes"
+            " (resume_id, version, content_hash, sections, section_tables, tables_found, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                resume_id, version, meta["content_hash"],
+                json.dumps(meta["detected_sections"]), json.dumps(meta["section_tables"]),
+                meta["tables_found"], created, now,
+            ),
+        )
+        c.execute("DELETE FROM resume_sections WHERE resume_id=?", (resume_id,))
+        c.executemany(
+            "INSERT OR IGNORE INTO resume_sections (resume_id, section) VALUES (?, ?)",
+            [(resume_id, s) for s in meta["detected_sections"]],
+        )
+        c.execute("DELETE FROM resume_entries WHERE resume_id=?", (resume_id,))
+        c.executemany(
+            "INSERT OR REPLACE INTO resume_entries"
+            " (resume_id, section, table_index, header_left, header_right, bullet_count)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (resume_id, sec, e["table_index"], e["left"], e["right"], e["bullet_count"])
+                for sec, entries in meta["entries"].items()
+                for e in entries
+            ],
+        )
+    return version
+
+
+def _row_to_meta(row) -> dict:
+    rid, version, content_hash, sections, section_tables, tables_found, created, updated = row
+    return {
+        "resume_id": rid,
+        "version": version,
+        "content_hash": content_hash,
+        "detected_sections": json.loads(sections),
+        "section_tables": json.loads(section_tables),
+        "tables_found": tables_found,
+        "created_at": created,
+        "updated_at": updated,
+    }
+
+
+_COLUMNS = "resume_id, version, content_hash, sections, section_tables, tables_found, created_at, updated_at"
+
+
+def get(resume_id: str, with_entries: bool = False) -> dict | None:
+    c = _conn()
+    row = c.execute(f"SELECT {_COLUMNS} FROM resumes WHERE resume_id=?", (resume_id,)).fetchone()
+    if row is None:
+        return None
+    meta = _row_to_meta(row)
+    if with_entries:
+        meta["entries"] = _entries_for(c, resume_id)
+    return meta
+
+
+def get_version(resume_id: str) -> int | None:
+    row = _conn().execute("SELECT version FROM resumes WHERE resume_id=?", (resume_id,)).fetchone()
+    return row[0] if row else None
+
+
+def _entries_for(c, resume_id: str) -> dict:
+    out = {}
+    for sec, ti, left, right, n in c.execute(
+        "SELECT section, table_index, header_left, header_right, bullet_count"
+        " FROM resume_entries WHERE resume_id=? ORDER BY table_index",
+        (resume_id,),
+    ):
+        out.setdefault(sec, []).append({"table_index": ti, "left": left, "right": right, "bullet_count": n})
+    return out
+
+
+def list_resumes(limit: int = 50, offset: int = 0) -> tuple[int, list[dict]]:
+    c = _conn()
+    total = c.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+    rows = c.execute(
+        f"SELECT {_COLUMNS} FROM resumes ORDER BY updated_at DESC LIMIT ? OFFSET ?", (limit, offset)
+    ).fetchall()
+    return total, [_row_to_meta(r) for r in rows]
+
+
+def search(section: str | None = None, q: str | None = None, limit: int = 50) -> list[dict]:
+    """
+    section: resumes that have this section header.
+    q: case-insensitive substring of any entry header (company / project / date).
+    """
+    where, args = [], []
+    if section:
+        where.append("r.resume_id IN (SELECT resume_id FROM resume_sections WHERE section=?)")
+        args.append(section.upper())
+    if q:
+        where.append(
+            "r.resume_id IN (SELECT resume_id FROM resume_entries"
+            " WHERE header_left LIKE ? ESCAPE '\\' OR header_right LIKE ? ESCAPE '\\')"
+        )
+        pat = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        args += [pat, pat]
+
+    sql = f"SELECT {', '.join('r.' + col for col in _COLUMNS.split(', '))} FROM resumes r"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY r.updated_at DESC LIMIT ?"
+    args.append(limit)
+    return [_row_to_meta(r) for r in _conn().execute(sql, args)]
+
+
+def find_by_content_hash(content_hash: str) -> str | None:
+    """
+    A resume whose current version has exactly this content, if any.
+    """
+    row = _conn().execute(
+        "SELECT resume_id FROM resumes WHERE content_hash=? ORDER BY created_at LIMIT 1", (content_hash,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def set_content_hash(resume_id: str, content_hash: str):
+    """
+    Fill in the hash of a version that was indexed before it was written
+    (write-behind, services/hot_docs.py); the version stays as it is.
+    """
+    c = _conn()
+    with c:
+        c.execute("UPDATE resumes SET content_hash=? WHERE resume_id=?", (content_hash, resume_id))
+
+
+def forget(resume_id: str):
+    c = _conn()
+    with c:
+        c.execute("DELETE FROM resumes WHERE resume_id=?", (resume_id,))
+        c.execute("DELETE FROM resume_sections WHERE resume_id=?", (resume_id,))
+        c.execute("DELETE FROM resume_entries WHERE resume_id=?", (resume_id,))
@@ -0,0 +1,132 @@
+"""
+Edits in worker processes (RESUME_OFFLOAD=1).
+
+Parsing a .docx, editing it and saving it are CPU-bound and hold the GIL
+for most of the time, so a few large resumes being saved at once stalled
+every other request in the threadpool that runs the sync routes. In this
+mode editor._apply hands the whole unit to a pool of OFFLOAD_WORKERS
+processes, started with python-docx and the editors imported and the
+blank template parsed once (start() at app startup). Each one:
+
+    parses current.docx, runs the edit function, and if anything changed
+    saves it to a scratch copy next to it and builds the new outline and layout
+
+and the API process, which keeps the resume lock meanwhile, only
+publishes the copy as current.docx and records the outline in the indexes
+(no parse on this side). Documents never cross the process boundary: both
+sides reach them on the local disk (current.docx is always synced into
+the local tree), so what is pickled is the edit's arguments and a result
+of a few KB.
+
+Dry runs and write-behind edit documents held in this process and stay
+here.
+"""
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from docx import Document
+
+from ..config import OFFLOAD_ENABLED, OFFLOAD_WORKERS
+from ..services.editor import _fingerprint, _published, _unchanged
+from ..services.layout import estimate_layout
+from ..services.outline import build_outline, dumps, loads
+from ..services.storage import get_current_path, scratch_file
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return OFFLOAD_ENABLED
+
+
+# --------------------------
+# Worker processes
+# --------------------------
+
+def _warm():
+    Document()  # python-docx's first parse loads the default template
+
+
+def _pid() -> int:
+    return os.getpid()
+
+
+def _edit(cur: str, tmp: str, edit_fn, args: tuple) -> dict:
+    """
+    Runs in a pool process: one edit of the document at cur, saved to tmp.
+    """
+    doc = Document(cur)
+    before = _fingerprint(doc)
+    editor, extra = edit_fn(cur, doc, *args)
+    if _fingerprint(editor.doc) == before:
+        return {"changed": False, "extra": extra}
+
+    editor.save(tmp)
+    with open(tmp, "rb") as f:
+        content_hash = hashlib.sha256(f.read()).hexdigest()
+    return {
+        "changed": True,
+        "extra": extra,
+        "content_hash": content_hash,
+        "outline": dumps(build_outline(editor.doc)),
+        "layout": estimate_layout(editor.doc),
+    }
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=OFFLOAD_WORKERS, mp_context=multiprocessing.get_context("spawn"), initializer=_warm,
+            )
+        return _pool
+
+
+def start() -> int:
+    """
+    Start and warm every worker now instead of on the first edits.
+    Returns how many processes answered.
+    """
+    pool = _get_pool()
+    return len({f.result() for f in [pool.submit(_pid) for _ in range(OFFLOAD_WORKERS)]})
+
+
+def shutdown(wait: bool = True):
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait)
+            _pool = None
+
+
+# --------------------------
+# Commit
+# --------------------------
+
+def run_edit(resume_id: str, edit_fn, args: tuple, version: int | None) -> dict:
+    """
+    editor._apply in a worker: same result as running edit_fn here and
+    committing it (editor._commit). The caller holds the resume lock and
+    read the stored version before calling.
+    """
+    cur = get_current_path(resume_id)
+    with scratch_file(resume_id) as tmp:
+        try:
+            res = _get_pool().submit(_edit, str(cur), str(tmp), edit_fn, args).result()
+        except BrokenProcessPool:  # a worker died (e.g. OOM): start afresh next time
+            shutdown(wait=False)
+            raise
+
+        if not res["changed"]:
+            meta = _unchanged(resume_id)
+        else:
+            meta = _published(resume_id, tmp, res["layout"], version,
+                              outline=loads(res["outline"]), content_hash=res["content_hash"])
+    meta.update(res["extra"])
+    return meta
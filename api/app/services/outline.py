@@ -0,0 +1,439 @@
+"""
+Compact, read-only outline of one resume version.
+
+A parsed python-docx Document costs a full lxml tree plus wrapper objects
+per resume; the read paths (preview, scoring, JSON export) only need the
+section text. An Outline keeps just that: sections, table entry headers,
+bullet / line text and hyperlink targets, as __slots__ records and tuples
+of interned strings, each with its position among the body's top-level
+elements (pos) so a caller can go back to the XML when it has to.
+
+Outlines are built from the same walk the editors do (extract_resume) and
+cached per (resume_id, version), in this process and, serialized, in
+outline_store for the other workers; building one reuses the hot or last
+committed parsed document when there is one.
+"""
+import hashlib
+import io
+import marshal
+import sys
+import time
+import zlib
+
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import qn
+
+from ..services.cache import LRUCache
+from ..services.storage import get_current_path, read_current
+from ..services.doc_parse import detect_headers_doc, scan_tables_doc, section_table_map
+from ..services.section_reader import (
+    entry_parts, entry_text, header_text, invalid_entry, paragraph_texts, section_text,
+)
+from ..services.editor import index_resume
+from ..services import meta_index, hot_docs, outline_store, events
+from ..config import OUTLINE_CACHE_MAX
+
+from experience_edit import ExperienceEditor
+from summary_section_edit import SummaryEditor
+from style_index import style_index
+
+_intern = sys.intern
+_TBL = qn("w:tbl")
+
+
+class Entry:
+    """
+    One table entry: header cells and its bullets as ((pos, text), ...).
+    """
+    __slots__ = ("table_index", "pos", "left", "right", "bullets")
+
+    def __init__(self, table_index, pos, left, right, bullets):
+        self.table_index = table_index
+        self.pos = pos
+        self.left = left
+        self.right = right
+        self.bullets = bullets
+
+
+class Section:
+    """
+    A section heading and either its lines ((pos, text), ...) or its
+    table entries (Entry, ...); the other one is None.
+    """
+    __slots__ = ("name", "lines", "entries")
+
+    def __init__(self, name, lines=None, entries=None):
+        self.name = name
+        self.lines = lines
+        self.entries = entries
+
+
+class Outline:
+    __slots__ = ("version", "header", "sections", "section_tables", "tables_found", "links", "paragraphs", "tables")
+
+    def __init__(self, version, header, sections, section_tables, tables_found, links, paragraphs, tables):
+        self.version = version
+        self.header = header                  # ((pos, text), ...) above the first heading
+        self.sections = sections              # (Section, ...) in document order
+        self.section_tables = section_tables  # {section: [table_index, ...]}
+        self.tables_found = tables_found
+        self.links = links                    # ((pos, text, target), ...) external hyperlinks
+        # what preview_section_text reads: the non-empty top-level paragraph
+        # texts, and (left, right, bullets) of every table by table_index
+        self.paragraphs = paragraphs
+        self.tables = tables
+
+    def section(self, name: str):
+        for s in self.sections:
+            if s.name == name:
+                return s
+        return None
+
+    def extracted(self) -> dict:
+        """
+        The same dict editor.extract_resume returns for this version.
+        """
+        sections = {}
+        for s in self.sections:
+            if s.entries is not None:
+                sections[s.name] = {"entries": [
+                    {"table_index": e.table_index, "left": e.left, "right": e.right,
+                     "bullets": [t for _, t in e.bullets]}
+                    for e in s.entries
+                ]}
+            else:
+                sections[s.name] = {"lines": [t for _, t in s.lines]}
+        return {
+            "detected_sections": [s.name for s in self.sections],
+            "section_tables": {k: list(v) for k, v in self.section_tables.items()},
+            "tables_found": self.tables_found,
+            "sections": sections,
+        }
+
+    def preview(self, section: str, table_index: int | None = None) -> str:
+        """
+        preview.preview_section_text, from the outline: the same section_reader
+        functions over the paragraph and table texts kept here.
+        """
+        if section in ("EXPERIENCE", "PROJECTS") and table_index is not None:
+            if table_index < 0 or table_index >= len(self.tables):
+                return invalid_entry(table_index)
+            return entry_text(*self.tables[table_index])
+        if section == "HEADER":
+            return header_text(self.paragraphs)
+        return section_text(self.paragraphs, section)
+
+    def _entry(self, table_index: int):
+        for s in self.sections:
+            for e in s.entries or ():
+                if e.table_index == table_index:
+                    return e
+        return None
+
+    def to_dict(self) -> dict:
+        """
+        JSON export: the outline with positions.
+        """
+        return {
+            "version": self.version,
+            "header": [{"pos": p, "text": t} for p, t in self.header],
+            "sections": [self._section_dict(s) for s in self.sections],
+            "links": [{"pos": p, "text": t, "target": u} for p, t, u in self.links],
+        }
+
+    def _section_dict(self, s: Section) -> dict:
+        d = {"name": s.name}
+        if s.entries is not None:
+            d["entries"] = [
+                {"table_index": e.table_index, "pos": e.pos, "left": e.left, "right": e.right,
+                 "bullets": [{"pos": p, "text": t} for p, t in e.bullets]}
+                for e in s.entries
+            ]
+        else:
+            d["lines"] = [{"pos": p, "text": t} for p, t in s.lines]
+        return d
+
+    def changes_since(self, prev) -> dict:
+        """
+        What an events client needs after prev (None: everything): the
+        sections whose content changed, each with its outline data and
+        preview text(s), the names of removed sections, and header / links
+        when they changed.
+        """
+        old = {s.name: prev._section_dict(s) for s in prev.sections} if prev is not None else {}
+        sections = []
+        for s in self.sections:
+            d = self._section_dict(s)
+            if old.pop(s.name, None) == d:
+                continue
+            d["preview"] = self.preview(s.name)
+            if s.name in ("EXPERIENCE", "PROJECTS"):
+                for e in d["entries"]:
+                    e["preview"] = self.preview(s.name, e["table_index"])
+            sections.append(d)
+
+        out = {"version": self.version, "sections": sections, "removed": list(old)}
+        if prev is None or prev.header != self.header:
+            out["header"] = {"lines": [{"pos": p, "text": t} for p, t in self.header], "preview": self.preview("HEADER")}
+        if prev is None or prev.links != self.links:
+            out["links"] = [{"pos": p, "text": t, "target": u} for p, t, u in self.links]
+        return out
+
+
+# --------------------------
+# Building
+# --------------------------
+def _header_lines(paras, positions) -> tuple:
+    # as preview.py: the first lines up to the first short all-caps line
+    lines = []
+    for p in paras:
+        txt = (p.text or "").strip()
+        if not txt:
+            continue
+        if lines and txt.isupper() and len(txt) < 40:
+            break
+        lines.append((positions[p._p], _intern(txt)))
+        if len(lines) >= 10:
+            break
+    return tuple(lines)
+
+
+def _tables(doc, body) -> tuple:
+    """
+    section_reader.entry_parts() of every table, by table_index.
+    """
+    styles = style_index(doc)
+    out = []
+    for pos, child in enumerate(body):
+        if child.tag == _TBL:
+            left, right, bullets = entry_parts(child, body[pos + 1:], lambda: styles)
+            out.append((_intern(left), _intern(right), tuple(_intern(b) for b in bullets)))
+    return tuple(out)
+
+
+def _links(doc, body) -> tuple:
+    targets = {
+        rid: rel.target_ref for rid, rel in doc.part.rels.items()
+        if rel.is_external and rel.reltype == RT.HYPERLINK
+    }
+    links = []
+    for pos, child in enumerate(body):
+        for h in child.iter(qn("w:hyperlink")):
+            target = targets.get(h.get(qn("r:id")))
+            if target is not None:
+                text = "".join(t.text or "" for t in h.iter(qn("w:t"))).strip()
+                links.append((pos, _intern(text), _intern(target)))
+    return tuple(links)
+
+
+def build_outline(doc, version: int | None = None) -> Outline:
+    """
+    Outline of a parsed document, walking it the way extract_resume does.
+    """
+    body = list(doc.element.body)
+    positions = {child: i for i, child in enumerate(body)}
+    headers = detect_headers_doc(doc)
+    tables = scan_tables_doc(doc)
+    mapping = section_table_map(headers, tables)
+
+    exp = ExperienceEditor("", doc=doc)
+    ranges = SummaryEditor("", doc=doc)
+    paras = doc.paragraphs
+
+    sections = []
+    for sec in headers:
+        name = _intern(sec)
+        if sec in mapping:
+            entries = []
+            for ti in mapping[sec]:
+                h = exp.get_table_header(ti)
+                bullets = () if sec == "EDUCATION" else tuple(
+                    (positions[p._p], _intern((p.text or "").strip())) for p in exp.get_bullets_after_table(ti)
+                )
+                entries.append(Entry(ti, positions[doc.tables[ti]._tbl], _intern(h["left"]), _intern(h["right"]), bullets))
+            sections.append(Section(name, entries=tuple(entries)))
+        else:
+            try:
+                start, end = ranges._find_section_range(sec)
+            except ValueError:
+                continue
+            lines = []
+            for p in paras[start:end]:
+                txt = (p.text or "").strip()
+                if txt:
+                    lines.append((positions[p._p], _intern(txt)))
+            sections.append(Section(name, lines=tuple(lines)))
+
+    return Outline(
+        version,
+        _header_lines(paras, positions),
+        tuple(sections),
+        {_intern(k): tuple(v) for k, v in mapping.items()},
+        len(tables),
+        _links(doc, body),
+        tuple(_intern(t) for t in paragraph_texts(body)),
+        _tables(doc, body),
+    )
+
+
+# --------------------------
+# Serialization (outline_store)
+# --------------------------
+_FORMAT = 2
+
+
+def dumps(outline: Outline) -> bytes:
+    """
+    Nested tuples of ints and (interned) strings, marshalled and deflated:
+    a few KB per resume, loaded in well under a millisecond.
+    """
+    sections = tuple(
+        (s.name, s.lines, None if s.entries is None else tuple(
+            (e.table_index, e.pos, e.left, e.right, e.bullets) for e in s.entries
+        ))
+        for s in outline.sections
+    )
+    return zlib.compress(marshal.dumps((
+        _FORMAT, outline.version, outline.header, sections,
+        tuple(outline.section_tables.items()), outline.tables_found, outline.links,
+        outline.paragraphs, outline.tables,
+    )))
+
+
+def loads(data: bytes) -> Outline | None:
+    """
+    The Outline dumps() wrote, or None for data this process can't read
+    (other format or Python version).
+    """
+    try:
+        fields = marshal.loads(zlib.decompress(data))
+        if fields[0] != _FORMAT:
+            return None
+        _, version, header, sections, section_tables, tables_found, links, paragraphs, tables = fields
+    except (ValueError, EOFError, TypeError, IndexError, KeyError, zlib.error):
+        return None
+    return Outline(
+        version,
+        header,
+        tuple(
+            Section(name, lines=lines, entries=None if entries is None else tuple(Entry(*e) for e in entries))
+            for name, lines, entries in sections
+        ),
+        dict(section_tables),
+        tables_found,
+        links,
+        paragraphs,
+        tables,
+    )
+
+
+# --------------------------
+# Per-version cache
+# --------------------------
+_outlines = LRUCache(maxsize=OUTLINE_CACHE_MAX)   # (resume_id, version) -> Outline
+
+
+def _remember(resume_id: str, outline: Outline):
+    _outlines.put((resume_id, outline.version), outline)
+    # older versions only: a late reader of an old version must not evict the newest
+    _outlines.discard_where(lambda k: k[0] == resume_id and k[1] < outline.version)
+
+
+def publish(resume_id: str, outline: Outline):
+    """
+    Make a freshly committed version's outline visible to this and every
+    other worker (editor.index_resume).
+    """
+    _remember(resume_id, outline)
+    outline_store.put(resume_id, outline.version, dumps(outline))
+    events.notify(resume_id)
+
+
+def forget(resume_id: str):
+    # resume deleted (storage.forget_resume)
+    _outlines.discard_where(lambda k: k[0] == resume_id)
+    outline_store.forget(resume_id)
+
+
+def _stored(resume_id: str, version: int) -> Outline | None:
+    outline = _outlines.get((resume_id, version))
+    if outline is not None:
+        return outline
+
+    data = outline_store.get(resume_id, version)
+    outline = loads(data) if data is not None else None
+    if outline is not None and outline.version == version:
+        _remember(resume_id, outline)
+        return outline
+    return None
+
+
+def cached_outline(resume_id: str) -> Outline | None:
+    """
+    The current version's outline if this process or the shared store has
+    it; None rather than parsing anything.
+    """
+    version = meta_index.get_version(resume_id)
+    return _stored(resume_id, version) if version is not None else None
+
+
+def _read_current(resume_id: str, batch: bool) -> bytes:
+    # batch jobs: storage.read_current, not an access (the reaper's last access) nor a local copy
+    data = read_current(resume_id) if batch else get_current_path(resume_id).read_bytes()
+    if data is None:
+        raise FileNotFoundError(f"{resume_id}: no current.docx")
+    return data
+
+
+def _read_version(resume_id: str, batch: bool):
+    """
+    (version, doc) of current.docx, or (None, doc) if no version can be
+    vouched for: another worker's commit writes the file just before its
+    version shows, so the bytes are checked against the stored content_hash.
+    """
+    for attempt in range(3):
+        meta = meta_index.get(resume_id)
+        data = _read_current(resume_id, batch)
+        if meta is not None and meta["content_hash"] in ("", hashlib.sha256(data).hexdigest()):
+            return meta["version"], Document(io.BytesIO(data))  # "": written by a hot flush
+        time.sleep(0.01 * (attempt + 1))
+    return None, Document(io.BytesIO(data))
+
+
+def get_outline(resume_id: str, batch: bool = False) -> Outline:
+    """
+    Outline of the resume's current version (unsaved write-behind edits
+    included): this process's cache, then the shared store, and only then
+    a parse of current.docx when no parsed copy is at hand. batch: for batch
+    jobs (export), whose reads are no access to the resume (the reaper's
+    last access) and leave the local tree alone.
+    """
+    version = meta_index.get_version(resume_id)
+    if version is None:
+        if batch:
+            data = _read_current(resume_id, batch)
+            version = index_resume(resume_id, doc=Document(io.BytesIO(data)),
+                                   content_hash=hashlib.sha256(data).hexdigest())["version"]
+        else:
+            version = index_resume(resume_id)["version"]
+
+    outline = _stored(resume_id, version)
+    if outline is not None:
+        return outline
+
+    with hot_docs.reading(resume_id) as doc:
+        # the version again, now that edits in this process are held off: as
+        # committed() is, the document is read for the version it is stamped with
+        version = meta_index.get_version(resume_id)
+        outline = _stored(resume_id, version)
+        if outline is not None:
+            return outline
+        if doc is None:
+            doc = hot_docs.committed(resume_id, version)
+        if doc is None:
+            version, doc = _read_version(resume_id, batch)
+        outline = build_outline(doc, version)
+    if version is not None:
+        publish(resume_id, outline)
+    return outline
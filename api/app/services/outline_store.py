@@ -0,0 +1,102 @@
+"""
+Outlines shared by every worker process (SQLite file next to the indexes).
+
+Each uvicorn worker has its own in-memory outline cache, so a PATCH served
+by one worker used to leave the others to re-parse current.docx on the next
+read. Workers now also write each outline they build here, serialized
+(outline.dumps), keyed by (resume_id, version); the others load it instead
+of parsing. Only the newest version of a resume is kept, and the least
+recently used rows are dropped once the file holds more than
+OUTLINE_SHARED_MAX_BYTES of outlines.
+"""
+import sqlite3
+import threading
+import time
+
+from ..config import OUTLINE_SHARED_ENABLED, OUTLINE_SHARED_PATH, OUTLINE_SHARED_MAX_BYTES
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = False
+
+TOUCH_AFTER_SECONDS = 60  # refresh used_at at most this often per row (reads stay read-only)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outlines (
+    resume_id TEXT NOT NULL,
+    version   INTEGER NOT NULL,
+    data      BLOB NOT NULL,
+    size      INTEGER NOT NULL,
+    used_at   REAL NOT NULL,
+    PRIMARY KEY (resume_id, version)
+);
+CREATE INDEX IF NOT EXISTS ix_outlines_used_at ON outlines (used_at);
+"""
+
+
+def _conn() -> sqlite3.Connection:
+    global _initialized
+    c = getattr(_local, "conn", None)
+    if c is None:
+        OUTLINE_SHARED_PATH.parent.mkdir(parents=True, exist_ok=True)
+        c = sqlite3.connect(OUTLINE_SHARED_PATH, timeout=30)
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+        with _init_lock:
+            if not _initialized:
+                c.executescript(SCHEMA)
+                _initialized = True
+        _local.conn = c
+    return c
+
+
+def get(resume_id: str, version: int) -> bytes | None:
+    if not OUTLINE_SHARED_ENABLED:
+        return None
+    c = _conn()
+    row = c.execute(
+        "SELECT data, used_at FROM outlines WHERE resume_id=? AND version=?", (resume_id, version)
+    ).fetchone()
+    if row is None:
+        return None
+    now = time.time()
+    if now - row[1] > TOUCH_AFTER_SECONDS:
+        with c:
+            c.execute("UPDATE outlines SET used_at=? WHERE resume_id=? AND version=?", (now, resume_id, version))
+    return bytes(row[0])
+
+
+def put(resume_id: str, version: int, data: bytes):
+    """
+    Store one serialized outline, replacing older versions of the resume,
+    and trim the table back under the size cap.
+    """
+    if not OUTLINE_SHARED_ENABLED:
+        return
+    c = _conn()
+    with c:
+        c.execute("DELETE FROM outlines WHERE resume_id=? AND version<?", (resume_id, version))
+        c.execute(
+            "INSERT OR REPLACE INTO outlines (resume_id, version, data, size, used_at) VALUES (?, ?, ?, ?, ?)",
+            (resume_id, version, sqlite3.Binary(data), len(data), time.time()),
+        )
+        total = c.execute("SELECT COALESCE(SUM(size), 0) FROM outlines").fetchone()[0]
+        if total > OUTLINE_SHARED_MAX_BYTES:
+            _trim(c, total - int(OUTLINE_SHARED_MAX_BYTES * 0.9))
+
+
+def _trim(c: sqlite3.Connection, excess: int):
+    # oldest first until excess bytes are gone
+    victims = []
+    for rid, version, size in c.execute("SELECT resume_id, version, size FROM outlines ORDER BY used_at"):
+        if excess <= 0:
+            break
+        victims.append((rid, version))
+        excess -= size
+    c.executemany("DELETE FROM outlines WHERE resume_id=? AND version=?", victims)
+
+
+def forget(resume_id: str):
+    if OUTLINE_SHARED_ENABLED:
+        with _conn() as c:
+            c.execute("DELETE FROM outlines WHERE resume_id=?", (resume_id,))
@@ -0,0 +1,278 @@
+"""
+Garbage collection for WORK_DIR.
+
+Every upload leaves a UUID directory behind (plus the uploaded copy and
+scratch copies from patches) and nothing ever removed them. The reaper walks the
+local sharded tree (storage.local_tree()) in small batches, so a pass never holds a lock over the
+whole tree:
+
+- directories not accessed for WORK_TTL_SECONDS are deleted as they are seen
+- at the end of a pass, if the surviving total exceeds WORK_MAX_BYTES the
+  least recently accessed directories are evicted until it fits
+- stray files (anything but original.docx / current.docx / the bullet library) older than
+  STRAY_FILE_GRACE_SECONDS are removed
+
+A directory is deleted under its resume lock, and only if nothing accessed
+it while the reaper waited for that; when the local tree is the store of
+record its index rows and this process's cached documents and outlines go
+with it (storage.forget_resume, as for storage.delete_resume).
+
+With dry_run=True nothing is deleted; the report lists what would be.
+
+    python -m app.services.reaper --dry-run
+"""
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from ..config import (
+    WORK_TTL_SECONDS, WORK_MAX_BYTES, STRAY_FILE_GRACE_SECONDS,
+    REAPER_INTERVAL_SECONDS, REAPER_BATCH_SIZE,
+)
+from ..services.backends import ShardedFSBackend
+from ..services.storage import local_tree, get_backend, forget_resume, BULLET_LIBRARY
+from ..services.lazy import lazy_import
+
+hot_docs = lazy_import("..services.hot_docs", __package__)  # python-docx: only once something is deleted
+
+KEEP_FILES = {"original.docx", "current.docx", BULLET_LIBRARY}
+TRASH_PREFIX = ".trash-"
+
+
+def _new_report(dry_run: bool) -> dict:
+    return {
+        "dry_run": dry_run,
+        "started_at": time.time(),
+        "finished_at": None,
+        "scanned": 0,
+        "expired": [],
+        "evicted": [],
+        "stray_files": [],
+        "bytes_total": 0,   # everything seen during the pass
+        "bytes_freed": 0,
+    }
+
+
+def _dir_usage(d: Path, now: float):
+    """
+    Returns (bytes, stray_files) for one resume dir without recursing further
+    (resume dirs are flat).
+    """
+    total = 0
+    stray = []
+    with os.scandir(d) as it:
+        for entry in it:
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            total += st.st_size
+            if entry.name not in KEEP_FILES and now - st.st_mtime > STRAY_FILE_GRACE_SECONDS:
+                stray.append((Path(entry.path), st.st_size))
+    return total, stray
+
+
+def _last_access(d: Path) -> float | None:
+    try:
+        return d.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def _remove_tree(d: Path, root: Path):
+    """
+    Rename first (atomic, readers immediately see "not found"), then delete
+    the renamed tree at leisure.
+    """
+    trash = root / f"{TRASH_PREFIX}{d.name}-{time.time_ns()}"
+    try:
+        d.rename(trash)
+    except FileNotFoundError:
+        return
+    shutil.rmtree(trash, ignore_errors=True)
+
+
+class Reaper:
+    def __init__(
+        self,
+        tree: ShardedFSBackend | None = None,
+        ttl_seconds: int = WORK_TTL_SECONDS,
+        max_bytes: int = WORK_MAX_BYTES,
+        batch_size: int = REAPER_BATCH_SIZE,
+        dry_run: bool = False,
+    ):
+        self.tree = tree or local_tree()
+        self.root = self.tree.root
+        # local tree is the store of record -> reaping deletes the resume itself
+        self.authoritative = self.tree is get_backend()
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+
+        self._scan = None   # directory generator of the pass in progress
+        self._seen = {}     # path -> (last_access, bytes) of survivors in this pass
+        self.report = _new_report(dry_run)
+        self.last_report = None
+
+    # --------------------------
+    # Incremental pass
+    # --------------------------
+    def step(self) -> bool:
+        """
+        Examine up to batch_size resume dirs. Returns True when this step
+        finished a full pass (self.last_report then holds its report).
+        """
+        if self._scan is None:
+            self._begin_pass()
+
+        now = time.time()
+        for _ in range(self.batch_size):
+            d = next(self._scan, None)
+            if d is None:
+                self._finish_pass()
+                return True
+            self._visit(d, now)
+        return False
+
+    def run_pass(self) -> dict:
+        while not self.step():
+            pass
+        return self.last_report
+
+    def _begin_pass(self):
+        self._scan = self.tree.iter_dirs()
+        self._seen = {}
+        self.report = _new_report(self.dry_run)
+        if not self.dry_run:
+            self._purge_trash()
+            # flat pre-sharding dirs would otherwise never be seen
+            self.tree.migrate_legacy()
+
+    def _purge_trash(self):
+        # leftovers from a process that died between rename and rmtree
+        if not self.root.exists():
+            return
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if entry.name.startswith(TRASH_PREFIX):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+
+    def _visit(self, d: Path, now: float):
+        atime = _last_access(d)
+        if atime is None:
+            return
+        try:
+            size, stray = _dir_usage(d, now)
+        except FileNotFoundError:
+            return
+
+        r = self.report
+        r["scanned"] += 1
+        r["bytes_total"] += size
+
+        if now - atime > self.ttl_seconds:
+            if self.dry_run or self._delete(d, atime):
+                r["expired"].append(d.name)
+                r["bytes_freed"] += size
+            return
+
+        for path, fsize in stray:
+            r["stray_files"].append(str(path))
+            r["bytes_freed"] += fsize
+            size -= fsize
+            if not self.dry_run:
+                path.unlink(missing_ok=True)
+        if stray and not self.dry_run:
+            # unlinking bumps the dir mtime; that isn't an access
+            os.utime(d, (atime, atime))
+
+        self._seen[d] = (atime, size)
+
+    def _finish_pass(self):
+        self._enforce_quota()
+        self._scan = None
+        self._seen = {}
+        self.report["finished_at"] = time.time()
+        self.report["bytes_after"] = self.report["bytes_total"] - self.report["bytes_freed"]
+        self.last_report = self.report
+
+    def _enforce_quota(self):
+        total = sum(size for _, size in self._seen.values())
+        if total <= self.max_bytes:
+            return
+
+        # least recently accessed first
+        for d, (atime, size) in sorted(self._seen.items(), key=lambda kv: kv[1][0]):
+            if total <= self.max_bytes:
+                break
+            if self.dry_run or self._delete(d, atime):
+                self.report["evicted"].append(d.name)
+                self.report["bytes_freed"] += size
+                total -= size
+
+    def _delete(self, d: Path, atime: float) -> bool:
+        """
+        Delete d unless it was accessed since atime; same teardown as
+        storage.delete_resume when the tree is the store of record.
+        """
+        with hot_docs.resume_lock(d.name):
+            # touched since we looked at it -> not expired / LRU anymore
+            if _last_access(d) != atime:
+                return False
+            _remove_tree(d, self.root)
+            if self.authoritative:
+                forget_resume(d.name)
+        return True
+
+
+# --------------------------
+# Background thread
+# --------------------------
+_thread = None
+_stop = threading.Event()
+
+
+def _loop(reaper: Reaper):
+    while not _stop.is_set():
+        try:
+            done = reaper.step()
+        except Exception:
+            # a dir vanishing under us mid-scan etc.; restart the pass later
+            reaper._scan = None
+            done = True
+        # short pause between batches keeps the walk incremental
+        _stop.wait(REAPER_INTERVAL_SECONDS if done else 0.05)
+
+
+def start_background_reaper(reaper: Reaper | None = None):
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, args=(reaper or Reaper(),), name="work-reaper", daemon=True)
+    _thread.start()
+
+
+def stop_background_reaper():
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=5)
+    _thread = None
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    ap = argparse.ArgumentParser(description="Reap expired / over-quota resume dirs in WORK_DIR.")
+    ap.add_argument("--dry-run", action="store_true", help="report only, delete nothing")
+    ap.add_argument("--ttl-seconds", type=int, default=WORK_TTL_SECONDS)
+    ap.add_argument("--max-bytes", type=int, default=WORK_MAX_BYTES)
+    args = ap.parse_args()
+
+    rep = Reaper(ttl_seconds=args.ttl_seconds, max_bytes=args.max_bytes, dry_run=args.dry_run).run_pass()
+    print(json.dumps(rep, indent=2))
@@ -0,0 +1,198 @@
+"""
+ATS-style keyword scoring of a resume against a job description.
+
+The resume side is a TermIndex built once per (resume_id, version) from the
+same section text the editors read (the resume's outline): one row per
+bullet / section line, plus per-section and whole-document rows. Scoring a
+job description is then a handful of NumPy ops over those matrices
+(sublinear TF, TF-IDF weights, cosine), so it runs in milliseconds.
+"""
+import hashlib
+import math
+from collections import Counter
+
+import numpy as np
+
+from ..services.cache import LRUCache
+from ..services.outline import get_outline
+from ..services.terms import tokenize, resume_units
+from ..services import meta_index
+
+_index_cache = LRUCache(maxsize=256)     # (resume_id, version) -> TermIndex
+_result_cache = LRUCache(maxsize=1024)   # (resume_id, version, jd digest, knobs) -> result dict
+
+
+def _sublinear(m: np.ndarray) -> np.ndarray:
+    out = np.zeros_like(m)
+    nz = m > 0
+    out[nz] = 1.0 + np.log(m[nz])
+    return out
+
+
+class TermIndex:
+    """
+    Term-frequency matrices for one resume version.
+    units x vocab (bullets/lines), sections x vocab, and the whole document.
+    """
+
+    def __init__(self, units: list[tuple]):
+        self.units = units
+        self.vocab = {}
+        counts = []
+        for _, _, _, text in units:
+            c = Counter(tokenize(text))
+            for t in c:
+                if t not in self.vocab:
+                    self.vocab[t] = len(self.vocab)
+            counts.append(c)
+
+        tf = np.zeros((len(units), max(len(self.vocab), 1)), dtype=np.float32)
+        for row, c in enumerate(counts):
+            if c:
+                cols = [self.vocab[t] for t in c]
+                tf[row, cols] = list(c.values())
+
+        self.sections = list(dict.fromkeys(u[0] for u in units))
+        sec_ids = np.array([self.sections.index(u[0]) for u in units], dtype=np.intp)
+        sec_tf = np.zeros((len(self.sections), tf.shape[1]), dtype=np.float32)
+        if len(units):
+            np.add.at(sec_tf, sec_ids, tf)
+
+        self.df = (tf > 0).sum(axis=0).astype(np.float32)
+        self.unit_w = _sublinear(tf)
+        self.section_w = _sublinear(sec_tf)
+        self.doc_w = _sublinear(tf.sum(axis=0, keepdims=True))
+
+    def score(self, job_description: str, top_keywords: int = 40, top_bullets: int = 20) -> dict:
+        q_counts = Counter(tokenize(job_description))
+        n_docs = len(self.units) + 1  # the JD counts as a document for IDF
+
+        q = np.zeros(self.unit_w.shape[1], dtype=np.float32)
+        oov = {}
+        for t, c in q_counts.items():
+            col = self.vocab.get(t)
+            if col is None:
+                oov[t] = c
+            else:
+                q[col] = c
+
+        df = self.df + (q > 0)
+        idf = np.log((n_docs + 1) / (df + 1)) + 1.0
+        oov_idf = math.log((n_docs + 1) / 2) + 1.0
+
+        qw = _sublinear(q) * idf
+        oov_w = {t: (1.0 + math.log(c)) * oov_idf for t, c in oov.items()}
+        q_norm = math.sqrt(float(qw @ qw) + sum(w * w for w in oov_w.values()))
+
+        def cosine(m: np.ndarray) -> np.ndarray:
+            w = m * idf
+            den = np.linalg.norm(w, axis=1) * q_norm
+            num = w @ qw
+            return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+        overall = float(cosine(self.doc_w)[0]) if q_norm else 0.0
+        sec_scores = cosine(self.section_w) if q_norm else np.zeros(len(self.sections))
+        unit_scores = cosine(self.unit_w) if q_norm else np.zeros(len(self.units))
+
+        # JD keywords ranked by their TF-IDF weight in the JD
+        weights = {t: float(qw[self.vocab[t]]) for t in q_counts if t in self.vocab}
+        weights.update(oov_w)
+        keywords = sorted(weights, key=lambda t: (-weights[t], t))[:top_keywords]
+        matched = [t for t in keywords if t in self.vocab]
+        missing = [t for t in keywords if t not in self.vocab]
+        total_w = sum(weights[t] for t in keywords)
+        coverage = (sum(weights[t] for t in matched) / total_w) if total_w else 0.0
+
+        order = np.argsort(-unit_scores, kind="stable")
+        bullets = []
+        for i in order:
+            sec, ti, bi, text = self.units[i]
+            if bi < 0 or ti is None:
+                continue
+            bullets.append({
+                "section": sec, "table_index": ti, "bullet_index": bi,
+                "text": text, "score": round(float(unit_scores[i]), 4),
+            })
+            if len(bullets) >= top_bullets:
+                break
+
+        return {
+            "overall_score": round(overall, 4),
+            "keyword_coverage": round(coverage, 4),
+            "matched_keywords": matched,
+            "missing_keywords": missing,
+            "sections": [
+                {"section": s, "score": round(float(sec_scores[i]), 4)} for i, s in enumerate(self.sections)
+            ],
+            "bullets": bullets,
+        }
+
+
+def score_texts(job_description: str, texts: list[str]) -> np.ndarray:
+    """
+    Cosine relevance of every text to the JD in one vectorized batch
+    (TF-IDF with the texts + JD as the corpus). For ad-hoc pools such as
+    candidate bullets, so nothing is cached.
+    """
+    vocab = {}
+    rows, cols, vals = [], [], []
+    for i, text in enumerate(texts):
+        for t, n in Counter(tokenize(text)).items():
+            rows.append(i)
+            cols.append(vocab.setdefault(t, len(vocab)))
+            vals.append(n)
+
+    tf = np.zeros((len(texts), max(len(vocab), 1)), dtype=np.float32)
+    tf[rows, cols] = vals
+
+    q = np.zeros(tf.shape[1], dtype=np.float32)
+    oov = []
+    for t, n in Counter(tokenize(job_description)).items():
+        col = vocab.get(t)
+        if col is None:
+            oov.append(n)
+        else:
+            q[col] = n
+
+    n_docs = len(texts) + 1
+    idf = np.log((n_docs + 1) / ((tf > 0).sum(axis=0) + (q > 0) + 1)) + 1.0
+    oov_idf = math.log((n_docs + 1) / 2) + 1.0
+
+    w = _sublinear(tf) * idf
+    qw = _sublinear(q) * idf
+    # JD-only terms don't change the ranking, but keep the scores true cosines
+    q_norm = math.sqrt(float(qw @ qw) + sum(((1.0 + math.log(n)) * oov_idf) ** 2 for n in oov))
+
+    den = np.linalg.norm(w, axis=1) * q_norm
+    num = w @ qw
+    return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+
+def get_term_index(resume_id: str) -> tuple[int, TermIndex]:
+    """
+    Cached TermIndex for the resume's current version; rebuilt only when
+    the version in the metadata index moves.
+    """
+    version = meta_index.get_version(resume_id)
+    idx = _index_cache.get((resume_id, version)) if version is not None else None
+    if idx is not None:
+        return version, idx
+
+    outline = get_outline(resume_id)  # may be newer than version by now: key by its own
+    version = outline.version
+    idx = TermIndex(resume_units(outline.extracted()))
+    if version is not None:
+        _index_cache.put((resume_id, version), idx)
+        _index_cache.discard_where(lambda k: k[0] == resume_id and k[1] < version)
+    return version, idx
+
+
+def score_resume(resume_id: str, job_description: str, top_keywords: int = 40, top_bullets: int = 20) -> dict:
+    version, idx = get_term_index(resume_id)
+    digest = hashlib.sha1(job_description.encode("utf-8")).hexdigest()
+    key = (resume_id, version, digest, top_keywords, top_bullets)
+    res = _result_cache.get(key)
+    if res is None:
+        res = idx.score(job_description, top_keywords=top_keywords, top_bullets=top_bullets)
+        _result_cache.put(key, res)
+    return {"resume_id": resume_id, "version": version, **res}
@@ -0,0 +1,261 @@
+"""
+Single-section reads straight from the .docx zip, without parsing the
+whole document.
+
+preview_section_text(path, ...) used to load the entire document.xml and
+build doc.paragraphs even when only the SUMMARY lines were wanted. This
+reader streams word/document.xml with iterparse instead, hands over one
+top-level body element (paragraph or table) at a time, frees each once it
+has been looked at, and stops at the end of the requested section or
+table entry. Memory is bounded by the largest single element and the time
+by the position of the section, not the length of the document.
+
+Elements are built with python-docx's element classes, so paragraph and
+cell text come out exactly as python-docx reads them, and bullet checks
+use the same StyleIndex (only needed for table entries, and shared by
+documents with identical styles.xml / numbering.xml).
+"""
+import posixpath
+import zipfile
+
+from lxml import etree
+from docx.oxml.ns import qn
+from docx.oxml.parser import element_class_lookup
+from docx.table import Table
+
+from ..services import editor  # noqa: F401  (puts the repo root on sys.path)
+from ..services.cache import LRUCache
+from style_index import StyleIndex
+
+_BODY = qn("w:body")
+_P = qn("w:p")
+_TBL = qn("w:tbl")
+_SECT_PR = qn("w:sectPr")
+
+_RELS_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_REL_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+_REL_STYLES = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"
+_REL_NUMBERING = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/numbering"
+
+_parser = etree.XMLParser(resolve_entities=False, no_network=True)
+# most uploads share a handful of templates: (CRC, size) of styles.xml and numbering.xml -> StyleIndex
+_style_indexes = LRUCache(maxsize=64)
+
+
+# --------------------------
+# Package parts
+# --------------------------
+
+def _rel_targets(zf: zipfile.ZipFile, source: str) -> dict:
+    """
+    {reltype: part name} of the internal relationships of part source
+    ("" for the package).
+    """
+    folder, name = posixpath.split(source)
+    try:
+        root = etree.fromstring(zf.read(posixpath.join(folder, "_rels", name + ".rels")), _parser)
+    except KeyError:
+        return {}
+    targets = {}
+    for rel in root.iter(_RELS_NS + "Relationship"):
+        if rel.get("TargetMode") == "External":
+            continue
+        target = rel.get("Target", "")
+        path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join(folder, target))
+        targets.setdefault(rel.get("Type"), path)
+    return targets
+
+
+class DocxPackage:
+    """
+    The part names a reader needs, looked up once per opened file.
+    """
+    __slots__ = ("zf", "document", "_rels")
+
+    def __init__(self, zf: zipfile.ZipFile):
+        self.zf = zf
+        self.document = _rel_targets(zf, "").get(_REL_DOCUMENT, "word/document.xml")
+        self._rels = None
+
+    def _info(self, reltype: str):
+        if self._rels is None:
+            self._rels = _rel_targets(self.zf, self.document)
+        name = self._rels.get(reltype)
+        try:
+            return self.zf.getinfo(name) if name is not None else None
+        except KeyError:
+            return None
+
+    def style_index(self) -> StyleIndex:
+        """
+        StyleIndex for bullet checks. Keyed on the parts' checksums from
+        the zip directory, so a template seen before is not read again.
+        """
+        styles, numbering = self._info(_REL_STYLES), self._info(_REL_NUMBERING)
+        key = tuple((i.CRC, i.file_size) if i is not None else None for i in (styles, numbering))
+        idx = _style_indexes.get(key)
+        if idx is None:
+            idx = StyleIndex(
+                styles=etree.fromstring(self.zf.read(styles), _parser) if styles is not None else None,
+                numbering=etree.fromstring(self.zf.read(numbering), _parser) if numbering is not None else None,
+            )
+            _style_indexes.put(key, idx)
+        return idx
+
+    def body(self):
+        """
+        Yields the top-level body elements (w:p, w:tbl, w:sectPr) in order.
+        Each one is cleared, with everything before it, when the consumer
+        asks for the next; stop iterating to stop reading.
+        """
+        with self.zf.open(self.document) as f:
+            context = etree.iterparse(
+                f, events=("end",), tag=(_P, _TBL, _SECT_PR),  # runs, text etc. never reach Python
+                remove_blank_text=True, resolve_entities=False, no_network=True,
+            )
+            context.set_element_class_lookup(element_class_lookup)
+            for _, elem in context:
+                parent = elem.getparent()
+                if parent is None or parent.tag != _BODY:
+                    continue  # inside a body element (kept until that one ends) or the root
+                yield elem
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+
+# --------------------------
+# Preview text
+# --------------------------
+# The one definition of a section preview. read_section_text() walks the
+# streamed body, preview.preview_section_text() a parsed document's and
+# Outline.preview() the texts it kept, all through these.
+
+def header_text(lines) -> str:
+    """
+    Everything above the first section heading, from the non-empty
+    paragraph texts.
+    """
+    out = []
+    for txt in lines:
+        if out and txt.isupper() and len(txt) < 40:
+            break
+        out.append(txt)
+        if len(out) >= 10:
+            break
+    return "\n".join(out) if out else "(No preview text found for HEADER. Download to verify.)"
+
+
+def section_text(lines, section: str) -> str:
+    """
+    Up to 10 lines after the section's heading, up to the next heading.
+    """
+    out = []
+    hit = False
+    for txt in lines:
+        if txt == section:
+            hit = True
+            continue
+        if hit:
+            if txt.isupper() and len(txt) < 40:
+                break
+            out.append(txt)
+            if len(out) >= 10:
+                break
+
+    if not out:
+        return f"(No preview text found for {section}. Download to verify.)"
+    return "\n".join(out)
+
+
+def entry_text(left: str, right: str, bullets) -> str:
+    out = []
+    if left or right:
+        out.append(f"{left} | {right}".strip(" |"))
+    if bullets:
+        out.extend(bullets)
+    else:
+        out.append("(No bullets found under this entry. Download to verify.)")
+    return "\n".join(out)
+
+
+def invalid_entry(table_index: int) -> str:
+    return f"(Invalid table_index: {table_index}. Download to verify.)"
+
+
+def paragraph_texts(body):
+    """
+    doc.paragraphs' texts, stripped, empty ones left out, from the
+    top-level body elements.
+    """
+    for elem in body:
+        if elem.tag == _P:
+            txt = (elem.text or "").strip()
+            if txt:
+                yield txt
+
+
+def entry_parts(tbl, following, styles) -> tuple[str, str, list[str]]:
+    """
+    (left, right, bullets) of a table entry: the first row's two cells, then
+    the bullet paragraphs among the body elements following it, up to the
+    next table or the first non-bullet once started. styles() returns the
+    StyleIndex, asked for only once there is a paragraph to check.
+    """
+    cells = Table(tbl, None).rows[0].cells  # before moving on: a streamed table is cleared then
+    left = cells[0].text.strip() if len(cells) > 0 else ""
+    right = cells[1].text.strip() if len(cells) > 1 else ""
+
+    index = None
+    bullets = []
+    for elem in following:
+        if elem.tag == _TBL:
+            break
+        if elem.tag != _P:
+            continue
+        txt = (elem.text or "").strip()
+        if not txt:
+            continue
+        if index is None:
+            index = styles()
+        if index.is_bullet(elem, txt):
+            bullets.append(txt)
+        elif bullets:
+            break
+    return left, right, bullets
+
+
+def body_section_text(body, section: str, table_index: int | None, styles) -> str:
+    """
+    The preview of a section from an iterator over the top-level body
+    elements, read only as far as the section goes. styles as for
+    entry_parts().
+    """
+    if section in ("EXPERIENCE", "PROJECTS") and table_index is not None:
+        if table_index < 0:
+            return invalid_entry(table_index)
+        seen = 0
+        for elem in body:
+            if elem.tag != _TBL:
+                continue
+            if seen == table_index:
+                return entry_text(*entry_parts(elem, body, styles))
+            seen += 1
+        return invalid_entry(table_index)
+    if section == "HEADER":
+        return header_text(paragraph_texts(body))
+    return section_text(paragraph_texts(body), section)
+
+
+def read_section_text(doc_path: str, section: str, table_index: int | None = None) -> str:
+    """
+    preview.preview_section_text for a file on disk, reading document.xml
+    only as far as the section goes.
+    """
+    with zipfile.ZipFile(doc_path) as zf:
+        package = DocxPackage(zf)
+        body = package.body()
+        try:
+            return body_section_text(body, section, table_index, package.style_index)
+        finally:
+            body.close()
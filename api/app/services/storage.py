@@ -1,31 +1,247 @@
+from contextlib import contextmanager
 from pathlib import Path
+import os
 import uuid
 import shutil
-from ..config import WORK_DIR
+import tempfile
+from ..config import (
+    WORK_DIR, STORAGE_BACKEND, STORAGE_SQLITE_PATH, S3_BUCKET, S3_PREFIX, S3_ENDPOINT_URL,
+)
+from ..services.backends import ShardedFSBackend, SQLiteBlobBackend, S3Backend
+
+BULLET_LIBRARY = "bullet_library.json"  # saved candidate bullets (services/tailor.py)
+
+_backend = None
+_tree = None
+
+
+def get_backend():
+    """
+    The configured StorageBackend (created on first use).
+    """
+    global _backend
+    if _backend is None:
+        if STORAGE_BACKEND == "local":
+            _backend = local_tree()
+        elif STORAGE_BACKEND == "sqlite":
+            _backend = SQLiteBlobBackend(STORAGE_SQLITE_PATH)
+        elif STORAGE_BACKEND == "s3":
+            _backend = S3Backend(S3_BUCKET, prefix=S3_PREFIX, endpoint_url=S3_ENDPOINT_URL)
+        else:
+            raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
+    return _backend
+
+
+def local_tree() -> ShardedFSBackend:
+    """
+    Sharded directory tree the editors read/write. It is the store itself for
+    the local backend and a read-through cache (WORK_DIR/.cache) otherwise.
+    """
+    global _tree
+    if _tree is None:
+        if STORAGE_BACKEND == "local":
+            _tree = ShardedFSBackend(WORK_DIR, legacy_root=WORK_DIR)
+        else:
+            _tree = ShardedFSBackend(WORK_DIR / ".cache")
+    return _tree
+
+
+def _is_remote() -> bool:
+    return get_backend() is not local_tree()
 
 
 def new_resume_id() -> str:
     return str(uuid.uuid4())
 
 
-def resume_dir(resume_id: str) -> Path:
-    d = WORK_DIR / resume_id
-    d.mkdir(parents=True, exist_ok=True)
-    return d
+def is_resume_id(resume_id: str) -> bool:
+    """
+    True for ids new_resume_id() hands out (canonical UUID strings); anything
+    else never names a stored resume and must not reach the file system.
+    """
+    try:
+        return str(uuid.UUID(resume_id)) == resume_id
+    except (ValueError, TypeError, AttributeError):
+        return False
+
+
+def resume_dir(resume_id: str, create: bool = False) -> Path:
+    # lookups never create anything; only uploads pass create=True
+    if not is_resume_id(resume_id):
+        raise ValueError(f"not a resume id: {resume_id!r}")
+    return local_tree().dir_for(resume_id, create=create)
+
+
+def touch(resume_id: str):
+    """
+    Record an access on the resume directory (its mtime is the "last access"
+    the reaper uses for TTL / LRU decisions).
+    """
+    try:
+        os.utime(resume_dir(resume_id), None)
+    except FileNotFoundError:
+        pass
+
+
+def iter_resume_dirs():
+    """
+    Lazily yields every local resume directory (see ShardedFSBackend.iter_dirs).
+    """
+    return local_tree().iter_dirs()
+
+
+def list_resume_ids():
+    """
+    Lazily yields every stored resume id, from the backend of record.
+    """
+    return get_backend().iter_ids()
 
 
 def save_upload(resume_id: str, upload_path: Path):
-    d = resume_dir(resume_id)
+    d = resume_dir(resume_id, create=True)
     orig = d / "original.docx"
     cur = d / "current.docx"
     shutil.copy2(upload_path, orig)
     shutil.copy2(upload_path, cur)
+    _sync_upload(resume_id, cur)
+
+
+def save_upload_bytes(resume_id: str, data: bytes):
+    """
+    save_upload for a document already in memory (bulk uploads).
+    """
+    d = resume_dir(resume_id, create=True)
+    (d / "original.docx").write_bytes(data)
+    cur = d / "current.docx"
+    cur.write_bytes(data)
+    _sync_upload(resume_id, cur)
+
+
+def _sync_upload(resume_id: str, cur: Path):
+    if _is_remote():
+        data = cur.read_bytes()
+        stored = get_backend().put_many({(resume_id, "original.docx"): data, (resume_id, "current.docx"): data})
+        mtime = stored[(resume_id, "current.docx")]
+        os.utime(cur, (mtime, mtime))
+
+
+def _sync_down(resume_id: str, name: str) -> Path:
+    """
+    Refresh the local copy of a remote blob if it is missing or older than
+    the stored one (another worker may have written it).
+    """
+    local = resume_dir(resume_id) / name
+    st = get_backend().stat(resume_id, name)
+    if st is None:
+        return local
+    _, mtime = st
+    try:
+        fresh = local.stat().st_mtime >= mtime
+    except FileNotFoundError:
+        fresh = False
+    if not fresh:
+        data = get_backend().get(resume_id, name)
+        if data is not None:
+            resume_dir(resume_id, create=True)
+            tmp = local.with_name(local.name + ".part")
+            tmp.write_bytes(data)
+            os.utime(tmp, (mtime, mtime))
+            os.replace(tmp, local)
+    return local
+
+
+def get_doc_path(resume_id: str, name: str) -> Path:
+    """
+    Local path of a stored document ("current.docx" / "original.docx").
+    """
+    if _is_remote():
+        p = _sync_down(resume_id, name)
+    else:
+        p = resume_dir(resume_id) / name
+    touch(resume_id)
+    return p
 
 
 def get_current_path(resume_id: str) -> Path:
-    return resume_dir(resume_id) / "current.docx"
+    return get_doc_path(resume_id, "current.docx")
+
+
+def read_current(resume_id: str) -> bytes | None:
+    """
+    current.docx's bytes from the backend of record, for batch jobs (export,
+    reindex): neither an access (see touch) nor a copy in the local tree.
+    """
+    return get_backend().get(resume_id, "current.docx")
+
+
+def read_current_many(resume_ids: list[str]) -> dict:
+    """
+    Batched fetch of current.docx bytes: {resume_id: bytes | None}.
+    """
+    got = get_backend().get_many([(rid, "current.docx") for rid in resume_ids])
+    return {rid: data for (rid, _), data in got.items()}
+
+
+@contextmanager
+def scratch_file(resume_id: str):
+    """
+    with scratch_file(rid) as tmp: a new, uniquely named .docx path next to
+    current.docx to save an edit to before overwrite_current (workers may
+    save the same resume at once); removed afterwards.
+    """
+    with tempfile.NamedTemporaryFile(dir=resume_dir(resume_id), prefix="tmp-", suffix=".docx", delete=False) as f:
+        tmp = Path(f.name)
+    try:
+        yield tmp
+    finally:
+        tmp.unlink(missing_ok=True)
 
 
 def overwrite_current(resume_id: str, new_doc_path: Path):
     cur = get_current_path(resume_id)
     shutil.copy2(new_doc_path, cur)
+
+    if _is_remote():
+        mtime = get_backend().put(resume_id, "current.docx", cur.read_bytes())
+        os.utime(cur, (mtime, mtime))
+
+
+def read_blob(resume_id: str, name: str) -> bytes | None:
+    """
+    Side files stored next to the documents (e.g. BULLET_LIBRARY).
+    """
+    return get_backend().get(resume_id, name)
+
+
+def write_blob(resume_id: str, name: str, data: bytes):
+    get_backend().put(resume_id, name, data)
+
+
+def delete_resume(resume_id: str):
+    """
+    Delete a resume's files and everything kept about it (forget_resume),
+    under its lock so no edit or read of it is halfway through.
+    """
+    from ..services import hot_docs
+
+    with hot_docs.resume_lock(resume_id):
+        get_backend().delete(resume_id)
+        if _is_remote():
+            local_tree().delete(resume_id)
+        forget_resume(resume_id)
+
+
+def forget_resume(resume_id: str):
+    """
+    Drop the index rows of a resume whose files are gone, and this process's
+    parsed documents and outlines of it; open event streams then report it
+    deleted. Caller holds hot_docs.resume_lock(resume_id).
+    """
+    # hot_docs and outline import this module
+    from ..services import events, hot_docs, inverted_index, meta_index, outline
+
+    meta_index.forget(resume_id)
+    inverted_index.remove(resume_id)
+    outline.forget(resume_id)
+    hot_docs.forget(resume_id)
+    events.notify(resume_id)
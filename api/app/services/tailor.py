@@ -0,0 +1,125 @@
+"""
+Auto-tailoring of EXPERIENCE / PROJECTS bullets to a job description.
+
+For every entry (table_index) the candidate pool is its current bullets,
+its saved library bullets and any extra candidates sent with the request.
+All candidates of all entries are scored against the JD in one batch
+(scoring.score_texts); each entry then keeps its best top_k within a
+character budget, best first, and everything is written with one save.
+"""
+import json
+
+from ..services.storage import read_blob, write_blob, BULLET_LIBRARY
+from ..services.scoring import get_term_index, score_texts
+from ..services.editor import analyze_resume, apply_bullet_selection
+from bullet_text import sanitize_bullet_text  # repo root (on sys.path via editor)
+
+
+def get_library(resume_id: str) -> dict[int, list[str]]:
+    raw = read_blob(resume_id, BULLET_LIBRARY)
+    if not raw:
+        return {}
+    return {int(k): v for k, v in json.loads(raw).items()}
+
+
+def save_library(resume_id: str, library: dict[int, list[str]]):
+    clean = {}
+    for ti, bullets in library.items():
+        bullets = [sanitize_bullet_text(b) for b in bullets]
+        clean[str(ti)] = list(dict.fromkeys(b for b in bullets if b))
+    write_blob(resume_id, BULLET_LIBRARY, json.dumps(clean).encode("utf-8"))
+
+
+def _select(pool: list[tuple], top_k: int, max_chars: int | None, min_score: float) -> list[tuple]:
+    """
+    pool: [(text, source, score)] for one entry. Best first, no duplicates,
+    at most top_k bullets and max_chars characters in total.
+    """
+    chosen, seen, used = [], set(), 0
+    for text, source, score in sorted(pool, key=lambda c: -c[2]):
+        if len(chosen) >= top_k or score < min_score:
+            break
+        key = " ".join(text.lower().split())
+        if key in seen:
+            continue
+        if max_chars is not None and used + len(text) > max_chars:
+            continue  # a shorter one may still fit
+        seen.add(key)
+        chosen.append((text, source, score))
+        used += len(text)
+    return chosen
+
+
+def tailor_bullets(
+    resume_id: str,
+    section: str,
+    job_description: str,
+    table_indices: list[int] | None = None,
+    candidates: dict[int, list[str]] | None = None,
+    use_library: bool = True,
+    top_k: int = 4,
+    max_chars: int | None = None,
+    min_score: float = 0.0,
+    apply: bool = True,
+    keep_one_blank_line_before_next: bool = True,
+) -> dict:
+    _, _, mapping = analyze_resume(resume_id)
+    section_tables = mapping.get(section, [])
+    if table_indices is None:
+        table_indices = section_tables
+    bad = [ti for ti in table_indices if ti not in section_tables]
+    if bad:
+        raise ValueError(f"table_index {bad} not in {section} (tables {section_tables}).")
+
+    # current bullets come from the cached TermIndex units: no re-parse
+    version, idx = get_term_index(resume_id)
+    current = {ti: [] for ti in table_indices}
+    for sec, ti, bi, text in idx.units:
+        if sec == section and ti in current and bi >= 0:
+            current[ti].append(text)
+
+    library = get_library(resume_id) if use_library else {}
+    candidates = candidates or {}
+
+    # one flat pool so everything is scored in a single batch
+    owners, texts, sources = [], [], []
+    for ti in table_indices:
+        for source, bullets in (
+            ("current", current[ti]),
+            ("library", library.get(ti, [])),
+            ("request", candidates.get(ti, [])),
+        ):
+            for b in bullets:
+                b = sanitize_bullet_text(b)
+                if b:
+                    owners.append(ti)
+                    texts.append(b)
+                    sources.append(source)
+
+    scores = score_texts(job_description, texts) if texts else []
+
+    pools = {ti: [] for ti in table_indices}
+    for ti, text, source, score in zip(owners, texts, sources, scores):
+        pools[ti].append((text, source, float(score)))
+
+    entries, selections = [], {}
+    for ti in table_indices:
+        chosen = _select(pools[ti], top_k, max_chars, min_score)
+        entries.append({
+            "table_index": ti,
+            "candidates": len(pools[ti]),
+            "selected": [{"text": t, "source": src, "score": round(sc, 4)} for t, src, sc in chosen],
+        })
+        if chosen:
+            selections[ti] = [t for t, _, _ in chosen]
+
+    applied = False
+    if apply and selections:
+        meta = apply_bullet_selection(
+            resume_id, section, selections,
+            keep_one_blank_line_before_next=keep_one_blank_line_before_next,
+        )
+        version = meta["version"]
+        applied = True
+
+    return {"resume_id": resume_id, "section": section, "version": version, "applied": applied, "entries": entries}
@@ -0,0 +1,60 @@
+"""
+Text -> terms, shared by the scoring, ranking and tailoring code so a term
+means the same thing everywhere.
+"""
+import re
+
+PHRASE_SPLIT_RE = re.compile(r"[,;:()\[\]|\u2022\n]|\.(?:\s|$)")
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-/][a-z0-9+#]+)*")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each etc few for from further had
+has have having he her here hers him his how i if in into is it its itself just me more most my no
+nor not now of off on once only or other our ours out over own per same she should so some such than
+that the their theirs them then there these they this those through to too under until up upon us
+very via was we were what when where which while who whom why will with within without would you
+your yours
+ability able across strong excellent good great include includes
+experience experienced work working role responsibilities requirements required preferred plus
+years year team teams using use used new well based level candidate candidates join looking
+need needs want wants must
+""".split())
+
+
+def tokenize(text: str, bigrams: bool = True) -> list[str]:
+    """
+    Lowercased word tokens minus stopwords, plus adjacent-pair bigrams
+    within a phrase ("machine learning", but not across "spark, kafka") so
+    multi-word skills can match as a unit. Keeps tech spellings like c++,
+    c#, node.js, ci/cd.
+    """
+    words, pairs = [], []
+    for phrase in PHRASE_SPLIT_RE.split((text or "").lower()):
+        raw = [w if w not in STOPWORDS and len(w) > 1 else None for w in TOKEN_RE.findall(phrase)]
+        words += [w for w in raw if w]
+        if bigrams:
+            # only truly adjacent words: "airflow and sql" is not "airflow sql"
+            pairs += [f"{a} {b}" for a, b in zip(raw, raw[1:]) if a and b]
+    return words + pairs
+
+
+def resume_units(extracted: dict) -> list[tuple]:
+    """
+    Flattens editor.extract_resume output into text units:
+    (section, table_index, index, text). index is the bullet index for
+    table entries, the line index otherwise; entry headers use index -1.
+    """
+    units = []
+    for sec, body in extracted["sections"].items():
+        if "entries" in body:
+            for e in body["entries"]:
+                header = f"{e['left']} {e['right']}".strip()
+                if header:
+                    units.append((sec, e["table_index"], -1, header))
+                for bi, b in enumerate(e["bullets"]):
+                    units.append((sec, e["table_index"], bi, b))
+        else:
+            for li, line in enumerate(body["lines"]):
+                units.append((sec, None, li, line))
+    return units
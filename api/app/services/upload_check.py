@@ -0,0 +1,194 @@
+"""
+Cheap checks of an uploaded .docx before anything parses it.
+
+Upload used to look at the file name only: python-docx then read whatever
+arrived, and a document.xml inflating to gigabytes (a zip bomb) or holding
+millions of elements kept a worker busy for seconds and took its memory
+with it. check_docx() turns such files away first, in milliseconds, from
+what they declare about themselves:
+
+- the zip's end record: at most UPLOAD_MAX_ENTRIES entries, read before
+  zipfile loads the central directory;
+- the central directory: no encrypted or unusually compressed entries, no
+  duplicate names, a total declared size within UPLOAD_MAX_UNCOMPRESSED_MB
+  (python-docx reads every part into memory) and, for parts over 1 MB, an
+  inflation ratio within UPLOAD_MAX_RATIO (Word's XML deflates ~30x, bombs
+  ~1000x);
+- the package: [Content_Types].xml, the package relationships and the
+  main document part they point to, of the Word document content type;
+- word/document.xml itself, streamed: no DTD, a w:document root and at
+  most UPLOAD_MAX_ELEMENTS elements (start tags counted in the raw bytes),
+  then well-formed (through libxml2, without building a tree). Its
+  declared size is capped at UPLOAD_MAX_XML_MB, and zipfile never inflates
+  an entry past its declared size (it fails the CRC check instead), so
+  that is a hard byte budget for these reads and for python-docx's.
+
+Malformed files are a 400, files over a limit a 413.
+"""
+import struct
+import zipfile
+import zlib
+
+from lxml import etree
+from docx.opc.constants import CONTENT_TYPE as CT
+from docx.oxml.ns import qn
+
+from ..config import (
+    MAX_UPLOAD_MB, UPLOAD_MAX_ENTRIES, UPLOAD_MAX_UNCOMPRESSED_MB, UPLOAD_MAX_RATIO, UPLOAD_MAX_XML_MB,
+    UPLOAD_MAX_ELEMENTS,
+)
+from ..services.section_reader import _REL_DOCUMENT, _parser, _rel_targets
+
+_MB = 1024 * 1024
+_RATIO_MIN_BYTES = _MB  # smaller parts can't inflate to anything worth checking
+_CHUNK = 64 * 1024
+
+# end of central directory record: signature, disk numbers, entries on this disk, entries, ...
+_EOCD = struct.Struct("<4s4H2LH")
+_EOCD_SIGNATURE = b"PK\x05\x06"
+
+_CT_NS = "{http://schemas.openxmlformats.org/package/2006/content-types}"
+_DOCUMENT = qn("w:document")
+
+
+class InvalidDocx(ValueError):
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _too_large(message: str) -> InvalidDocx:
+    return InvalidDocx(message, status_code=413)
+
+
+# --------------------------
+# Zip directory
+# --------------------------
+
+def _declared_entries(f) -> int | None:
+    """
+    Entry count from the end of central directory record; None if there is
+    none (zipfile reports that).
+    """
+    size = f.seek(0, 2)
+    tail = min(size, _EOCD.size + 0xFFFF)  # the record is followed by a comment of up to 64 KB
+    f.seek(size - tail)
+    data = f.read(tail)
+    at = data.rfind(_EOCD_SIGNATURE)
+    if at < 0 or len(data) - at < _EOCD.size:
+        return None
+    return _EOCD.unpack_from(data, at)[4]  # 0xFFFF for zip64, which no resume needs
+
+
+def _check_directory(zf: zipfile.ZipFile):
+    infos = zf.infolist()
+    if len(infos) > UPLOAD_MAX_ENTRIES:
+        raise _too_large(f"more than {UPLOAD_MAX_ENTRIES} parts")
+    if len({i.filename for i in infos}) != len(infos):
+        raise InvalidDocx("duplicate part names")
+
+    total = 0
+    for info in infos:
+        if info.flag_bits & 0x1:
+            raise InvalidDocx(f"{info.filename} is encrypted")
+        if info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            raise InvalidDocx(f"{info.filename} uses an unsupported compression")
+        if info.file_size > _RATIO_MIN_BYTES and info.file_size > UPLOAD_MAX_RATIO * max(info.compress_size, 1):
+            raise _too_large(f"{info.filename} inflates more than {UPLOAD_MAX_RATIO}x")
+        total += info.file_size
+    if total > UPLOAD_MAX_UNCOMPRESSED_MB * _MB:
+        raise _too_large(f"more than {UPLOAD_MAX_UNCOMPRESSED_MB} MB uncompressed")
+
+
+# --------------------------
+# Package parts
+# --------------------------
+
+def _content_type(zf: zipfile.ZipFile, part: str) -> str | None:
+    root = etree.fromstring(zf.read("[Content_Types].xml"), _parser)
+    for override in root.iter(_CT_NS + "Override"):
+        if override.get("PartName", "").lstrip("/").lower() == part.lower():
+            return override.get("ContentType")
+    ext = part.rpartition(".")[2].lower()
+    for default in root.iter(_CT_NS + "Default"):
+        if default.get("Extension", "").lower() == ext:
+            return default.get("ContentType")
+    return None
+
+
+def _main_part(zf: zipfile.ZipFile) -> zipfile.ZipInfo:
+    names = set(zf.namelist())
+    for required in ("[Content_Types].xml", "_rels/.rels"):
+        if required not in names:
+            raise InvalidDocx(f"not a Word document: {required} missing")
+    document = _rel_targets(zf, "").get(_REL_DOCUMENT)
+    if document is None or document not in names:
+        raise InvalidDocx("not a Word document: no main document part")
+    if _content_type(zf, document) != CT.WML_DOCUMENT_MAIN:
+        raise InvalidDocx("not a Word document (.docm, .dotx or another package)")
+    return zf.getinfo(document)
+
+
+class _NoTree:
+    # parser target without start / end callbacks: libxml2 checks the XML and builds nothing
+    def close(self):
+        return None
+
+
+def _check_document(zf: zipfile.ZipFile, info: zipfile.ZipInfo):
+    if info.file_size > UPLOAD_MAX_XML_MB * _MB:
+        raise _too_large(f"document body larger than {UPLOAD_MAX_XML_MB} MB")
+
+    # first pass, cheap: the root, and the elements counted in the raw bytes
+    head = etree.XMLPullParser(events=("start",), resolve_entities=False, no_network=True, load_dtd=False)
+    root = None
+    elements = 0
+    with zf.open(info) as f:
+        while chunk := f.read(_CHUNK):
+            elements += chunk.count(b"<") - chunk.count(b"</")  # start tags: text can't hold a bare '<'
+            if elements > UPLOAD_MAX_ELEMENTS:
+                raise _too_large(f"document body has more than {UPLOAD_MAX_ELEMENTS} elements")
+            if root is None:  # parsed up to the root's start tag only
+                head.feed(chunk)
+                for _, root in head.read_events():
+                    if root.getroottree().docinfo.doctype:
+                        raise InvalidDocx("document body declares a DTD")
+                    if root.tag != _DOCUMENT:
+                        raise InvalidDocx("document body is not a w:document")
+                    break
+    if root is None:
+        raise InvalidDocx("document body is empty")
+
+    # then all of it, for well-formedness
+    parser = etree.XMLParser(target=_NoTree(), resolve_entities=False, no_network=True, load_dtd=False)
+    with zf.open(info) as f:
+        while chunk := f.read(_CHUNK):
+            parser.feed(chunk)
+    parser.close()
+
+
+def check_docx(f):
+    """
+    Raise InvalidDocx unless the seekable binary file f (an upload) passes
+    the checks in the module docstring. Leaves f at the start.
+    """
+    try:
+        size = f.seek(0, 2)
+        if size > MAX_UPLOAD_MB * _MB:
+            raise _too_large(f"larger than {MAX_UPLOAD_MB} MB")
+        entries = _declared_entries(f)
+        if entries is not None and entries > UPLOAD_MAX_ENTRIES:
+            raise _too_large(f"more than {UPLOAD_MAX_ENTRIES} parts")
+        f.seek(0)
+        with zipfile.ZipFile(f) as zf:
+            _check_directory(zf)
+            _check_document(zf, _main_part(zf))
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, EOFError, zlib.error):
+        raise InvalidDocx("not a .docx file (damaged or not a zip archive)") from None
+    except (NotImplementedError, RuntimeError) as e:
+        # zipfile: an unsupported zip feature (compression, zip64 variant), a password needed
+        raise InvalidDocx(f"not a readable .docx file: {e}") from None
+    except etree.XMLSyntaxError as e:
+        raise InvalidDocx(f"malformed XML: {e}") from None
+    finally:
+        f.seek(0)
@@ -0,0 +1,344 @@
+"""
+Load test: synthetic workload mixes or a replayed trace against the API.
+
+    cd api && python -m benchmarks.loadtest --docx resume.docx --mix mixed -c 16 -d 30
+    python -m benchmarks.loadtest --docx resume.docx --mix patch-storm --url http://127.0.0.1:8000
+    python -m benchmarks.loadtest --docx resume.docx --mix mixed -d 30 --record trace.ndjson
+    python -m benchmarks.loadtest --docx resume.docx --replay trace.ndjson --speed 2
+
+Without --url the app runs in this process (create_app() behind httpx's ASGI
+transport, sync routes on the usual threadpool); with --url it drives a
+running server. Needs httpx, which the service itself doesn't.
+
+Synthetic runs are closed-loop: --concurrency clients, each picking the
+next operation from the mix until --duration or --requests runs out. A
+share of the operations (the mix's "hot" fraction) go to one resume, so
+patch storms contend on the same document. Resumes are uploaded from
+--docx before the clock starts; they stay in .work (the reaper ages them
+out).
+
+Traces are NDJSON, one request per line:
+    {"t": 0.132, "method": "PATCH", "path": "/resume/<id>/summary", "json": {...}}
+    {"t": 0.140, "method": "POST", "path": "/resume/upload", "upload": true, "resume_id": "<id>"}
+("endpoint", the route template the report groups by, is optional),
+replayed open-loop at t / --speed. Resume ids are mapped onto this run's
+resumes: ids an upload in the trace produced map to the replayed upload,
+any other id to a resume of the pool.
+
+The report (stdout or --out) is JSON: throughput, error rate, and per
+endpoint (route template) count, status codes, p50/p95/p99/max latency.
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import math
+import random
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+_ID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+JD = (
+    "Data engineer: Python, SQL, Spark, Kafka and AWS. Build ETL pipelines, "
+    "tune query latency, CI/CD with Docker and Kubernetes, mentor engineers."
+)
+
+# name: (operation weights, share of operations aimed at the hot resume)
+MIXES = {
+    "read-heavy": ({"page_load": 6, "preview": 3, "outline": 1, "score": 1}, 0.2),
+    "patch-storm": ({"patch_summary": 4, "patch_bullet": 4, "preview": 2}, 1.0),
+    "upload": ({"upload": 1}, 0.0),
+    "mixed": ({"upload": 1, "page_load": 4, "preview": 4, "patch_summary": 2, "patch_bullet": 2,
+               "score": 1, "rank": 1}, 0.2),
+}
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)  # nearest rank
+    return sorted_values[k]
+
+
+class Run:
+    """
+    One load test: the client, the resume pool and the per-endpoint stats.
+    """
+
+    def __init__(self, client, docx: list[Path], seed: int = 0, record=None):
+        self.client = client
+        self.docx = [p.read_bytes() for p in docx]
+        self.names = [p.name for p in docx]
+        self.rng = random.Random(seed)
+        self.record = record
+        self.pool: list[str] = []
+        self.latency = defaultdict(list)
+        self.status = defaultdict(Counter)
+        self.errors = Counter()
+        self.started = None
+        self.counter = 0
+
+    # --------------------------
+    # Requests
+    # --------------------------
+    async def request(self, method: str, path: str, endpoint: str, json_body=None, params=None, upload: int | None = None):
+        t = time.perf_counter()
+        kwargs = {"json": json_body, "params": params}
+        if upload is not None:
+            kwargs = {"files": {"file": (self.names[upload], self.docx[upload])}}
+        try:
+            r = await self.client.request(method, path, **kwargs)
+            code = r.status_code
+        except Exception as e:  # connection reset, timeout ...
+            r, code = None, type(e).__name__
+        dt = time.perf_counter() - t
+
+        if self.started is not None:
+            self.latency[endpoint].append(dt)
+            self.status[endpoint][str(code)] += 1
+            if not isinstance(code, int) or code >= 400:
+                self.errors[endpoint] += 1
+            if self.record is not None:
+                line = {"t": round(t - self.started, 4), "method": method, "path": path, "endpoint": endpoint}
+                if json_body is not None:
+                    line["json"] = json_body
+                if params:
+                    line["params"] = params
+                if upload is not None:
+                    line["upload"] = True
+                    if code == 200:
+                        line["resume_id"] = r.json()["resume_id"]
+                self.record.write(json.dumps(line) + "\n")
+        return r if code == 200 else None
+
+    async def upload(self, i: int | None = None) -> str | None:
+        i = self.rng.randrange(len(self.docx)) if i is None else i
+        r = await self.request("POST", "/resume/upload", "POST /resume/upload", upload=i)
+        return r.json()["resume_id"] if r is not None else None
+
+    async def setup(self, n: int):
+        for i in range(n):
+            rid = await self.upload(i % len(self.docx))
+            if rid is None:
+                sys.exit("setup: upload failed (is --docx a resume the API accepts?)")
+            self.pool.append(rid)
+
+    def pick(self, hot: float) -> str:
+        return self.pool[0] if self.rng.random() < hot else self.rng.choice(self.pool)
+
+    # --------------------------
+    # Operations
+    # --------------------------
+    async def op_upload(self, rid):
+        new = await self.upload()
+        if new is not None:
+            self.pool.append(new)
+
+    async def op_page_load(self, rid):
+        # what the editor page fires at once: sections, meta and a few previews
+        await asyncio.gather(
+            self.request("GET", f"/resume/{rid}/sections", "GET /resume/{id}/sections"),
+            self.request("GET", f"/resume/{rid}/meta", "GET /resume/{id}/meta"),
+            *[
+                self.request("GET", f"/resume/{rid}/preview/{sec}", "GET /resume/{id}/preview/{section}", params=params)
+                for sec, params in (("SUMMARY", None), ("TECHNICAL SKILLS", None), ("EXPERIENCE", {"table_index": 1}))
+            ],
+        )
+
+    async def op_preview(self, rid):
+        sec, params = self.rng.choice([("SUMMARY", None), ("HEADER", None), ("EXPERIENCE", {"table_index": 1})])
+        await self.request("GET", f"/resume/{rid}/preview/{sec}", "GET /resume/{id}/preview/{section}", params=params)
+
+    async def op_outline(self, rid):
+        await self.request("GET", f"/resume/{rid}/outline", "GET /resume/{id}/outline")
+
+    async def op_score(self, rid):
+        await self.request("POST", f"/resume/{rid}/score", "POST /resume/{id}/score", json_body={"job_description": JD})
+
+    async def op_rank(self, rid):
+        await self.request("POST", "/resume/rank", "POST /resume/rank", json_body={"job_description": JD, "top_k": 10})
+
+    async def op_patch_summary(self, rid):
+        self.counter += 1
+        await self.request("PATCH", f"/resume/{rid}/summary", "PATCH /resume/{id}/summary",
+                           json_body={"summary": f"Data engineer, load test edit {self.counter}."})
+
+    async def op_patch_bullet(self, rid):
+        self.counter += 1
+        await self.request("PATCH", f"/resume/{rid}/experience/bullets/1/0",
+                           "PATCH /resume/{id}/{section}/bullets/{ti}/{bi}",
+                           json_body={"text": f"Built Spark ETL pipelines, revision {self.counter}."})
+
+    # --------------------------
+    # Drivers
+    # --------------------------
+    async def synthetic(self, weights: dict, hot: float, concurrency: int, duration: float, requests: int | None):
+        ops = [getattr(self, f"op_{name}") for name in weights]
+        cum = list(weights.values())
+        deadline = time.perf_counter() + duration
+        budget = [requests]
+
+        async def client_loop():
+            while time.perf_counter() < deadline:
+                if budget[0] is not None:
+                    if budget[0] <= 0:
+                        return
+                    budget[0] -= 1
+                op = self.rng.choices(ops, weights=cum)[0]
+                await op(self.pick(hot))
+
+        self.started = time.perf_counter()
+        await asyncio.gather(*[client_loop() for _ in range(concurrency)])
+
+    async def replay(self, lines: list[dict], speed: float, concurrency: int):
+        mapping = {}
+        sem = asyncio.Semaphore(concurrency)
+        uploaded = {}  # trace id -> Event set once its replayed upload is done
+
+        def map_ids(s: str) -> str:
+            def one(m):
+                old = m.group(0)
+                if old not in mapping and old not in uploaded:
+                    mapping[old] = self.pool[len(mapping) % len(self.pool)]
+                return mapping.get(old, old)
+            return _ID_RE.sub(one, s)
+
+        for line in lines:
+            if line.get("upload") and line.get("resume_id"):
+                uploaded[line["resume_id"]] = asyncio.Event()
+
+        async def send(line):
+            await asyncio.sleep(max(0.0, self.started + line["t"] / speed - time.perf_counter()))
+            for old in set(_ID_RE.findall(line["path"])) & uploaded.keys():
+                await uploaded[old].wait()
+            async with sem:
+                path = map_ids(line["path"])
+                endpoint = line.get("endpoint") or f"{line['method']} {_ID_RE.sub('{id}', line['path'])}"
+                if line.get("upload"):
+                    new = await self.upload()
+                    old = line.get("resume_id")
+                    if old in uploaded:
+                        mapping[old] = new or self.pool[0]
+                        uploaded[old].set()
+                    return
+                await self.request(line["method"], path, endpoint, json_body=line.get("json"), params=line.get("params"))
+
+        self.started = time.perf_counter()
+        await asyncio.gather(*[send(line) for line in lines])
+
+    # --------------------------
+    # Report
+    # --------------------------
+    def report(self, elapsed: float, config: dict) -> dict:
+        endpoints = {}
+        total = errors = 0
+        for ep in sorted(self.latency):
+            lat = sorted(self.latency[ep])
+            n = len(lat)
+            total += n
+            errors += self.errors[ep]
+            endpoints[ep] = {
+                "count": n,
+                "rps": round(n / elapsed, 2),
+                "errors": self.errors[ep],
+                "error_rate": round(self.errors[ep] / n, 4),
+                "status": dict(self.status[ep]),
+                **{f"p{q}_ms": round(_percentile(lat, q) * 1000, 2) for q in (50, 95, 99)},
+                "max_ms": round(lat[-1] * 1000, 2),
+            }
+        return {
+            "config": config,
+            "elapsed_s": round(elapsed, 3),
+            "requests": total,
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+async def _call_all(handlers):
+    for h in handlers:
+        res = h()
+        if inspect.isawaitable(res):
+            await res
+
+
+async def main_async(args) -> dict:
+    try:
+        import httpx
+    except ImportError:
+        sys.exit("the load test needs httpx: pip install httpx")
+
+    app = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        from app.main import create_app
+        app = create_app()
+        await _call_all(app.router.on_startup)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=args.timeout)
+
+    record = open(args.record, "w") if args.record else None
+    try:
+        run = Run(client, [Path(p) for p in args.docx], seed=args.seed, record=record)
+        await run.setup(args.resumes)
+
+        config = {"target": args.url or "in-process", "concurrency": args.concurrency, "resumes": args.resumes}
+        t = time.perf_counter()
+        if args.replay:
+            lines = sorted(
+                (json.loads(line) for line in Path(args.replay).read_text().splitlines() if line.strip()),
+                key=lambda line: line["t"],
+            )
+            config.update(replay=args.replay, speed=args.speed, trace_requests=len(lines))
+            await run.replay(lines, args.speed, args.concurrency)
+        else:
+            weights, hot = MIXES[args.mix]
+            if args.mix_json:
+                weights = json.loads(args.mix_json)
+            hot = hot if args.hot is None else args.hot
+            config.update(mix=args.mix, weights=weights, hot=hot, duration_s=args.duration, max_requests=args.requests)
+            await run.synthetic(weights, hot, args.concurrency, args.duration, args.requests)
+        return run.report(time.perf_counter() - t, config)
+    finally:
+        await client.aclose()
+        if record is not None:
+            record.close()
+        if app is not None:
+            await _call_all(app.router.on_shutdown)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load test the resume API.")
+    ap.add_argument("--docx", nargs="+", required=True, help="resume(s) to upload")
+    ap.add_argument("--url", help="running server (default: the app in this process)")
+    ap.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    ap.add_argument("--mix-json", help='custom weights, e.g. \'{"preview": 3, "patch_summary": 1}\'')
+    ap.add_argument("--hot", type=float, help="share of operations on the hot resume (default: per mix)")
+    ap.add_argument("-c", "--concurrency", type=int, default=8)
+    ap.add_argument("-d", "--duration", type=float, default=10.0, help="seconds (synthetic runs)")
+    ap.add_argument("-n", "--requests", type=int, help="stop after this many operations")
+    ap.add_argument("--resumes", type=int, default=8, help="resumes uploaded before the run")
+    ap.add_argument("--replay", help="NDJSON trace to replay instead of a mix")
+    ap.add_argument("--speed", type=float, default=1.0, help="replay speed-up")
+    ap.add_argument("--record", help="write the requests sent as a replayable trace")
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help="write the JSON report here instead of stdout")
+    args = ap.parse_args()
+
+    report = asyncio.run(main_async(args))
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
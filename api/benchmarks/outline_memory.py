@@ -0,0 +1,94 @@
+"""
+Memory per resume: parsed Document vs Outline (services/outline.py).
+
+    cd api && python -m benchmarks.outline_memory resume.docx [more.docx ...] [-n 200]
+
+Document: growth of the process RSS while holding n parses of the file
+(lxml allocates outside the Python heap, so tracemalloc can't see it).
+Outline: bytes still allocated by build_outline once the document it was
+built from is gone (tracemalloc; an outline is plain Python objects).
+Each measurement runs in a fresh process, warmed up on the blank template.
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import gc
+import multiprocessing
+import os
+import time
+import tracemalloc
+from pathlib import Path
+
+from docx import Document
+
+from app.services.outline import build_outline
+from app.services.preview import preview_section_text
+
+
+def _rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def document_bytes(path: str, n: int) -> float:
+    Document().paragraphs
+    gc.collect()
+    before = _rss()
+    docs = [Document(path) for _ in range(n)]
+    for d in docs:
+        d.paragraphs  # what a reader touches
+    gc.collect()
+    per_doc = (_rss() - before) / n
+    del docs
+    return per_doc
+
+
+def outline_bytes(path: str) -> int:
+    build_outline(Document())
+    doc = Document(path)
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    outline = build_outline(doc)   # kept alive while measuring
+    del doc
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del outline
+    return size
+
+
+def _fresh(fn, *args):
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def _ms(fn, repeat: int = 50) -> float:
+    t = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t) * 1000 / repeat
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("paths", nargs="+")
+    ap.add_argument("-n", type=int, default=200, help="parses held for the RSS measurement")
+    args = ap.parse_args()
+
+    print(f"{'file':<28}{'document':>12}{'outline':>12}{'ratio':>8}{'build ms':>10}{'preview ms doc/outline':>26}")
+    for path in args.paths:
+        doc_b = _fresh(document_bytes, path, args.n)
+        out_b = _fresh(outline_bytes, path)
+
+        doc = Document(path)
+        outline = build_outline(doc)
+        build = _ms(lambda: build_outline(doc), repeat=20)
+        prev_doc = _ms(lambda: preview_section_text(path, "EXPERIENCE", 1, doc=doc))
+        prev_out = _ms(lambda: outline.preview("EXPERIENCE", 1))
+
+        print(f"{Path(path).name[:27]:<28}{doc_b / 1024:>10.1f}KB{out_b / 1024:>10.1f}KB"
+              f"{doc_b / max(out_b, 1):>7.0f}x{build:>10.2f}{prev_doc:>16.3f} / {prev_out:.4f}")
+
+
+if __name__ == "__main__":
+    main()
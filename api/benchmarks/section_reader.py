@@ -0,0 +1,109 @@
+"""
+Single-section preview: full parse vs the streaming reader
+(services/section_reader.py).
+
+    cd api && python -m benchmarks.section_reader resume.docx [...] [-n 50] [--pad 10 100]
+
+For each file, and copies of it with the body repeated --pad times:
+latency of SUMMARY (near the top) and of the last EXPERIENCE entry,
+parsing the document (Document(path) + the preview, as before) vs
+streaming document.xml; and the peak RSS growth of one read in a fresh
+process warmed up on the blank template (Linux: VmHWM, reset through
+/proc/self/clear_refs). Streaming SUMMARY should stay flat however long
+the document is.
+"""
+import argparse
+import copy
+import gc
+import io
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from docx import Document
+
+from app.services.preview import preview_section_text
+from app.services.section_reader import read_section_text
+
+
+def _padded(path: str, copies: int, out_dir: str) -> str:
+    doc = Document(path)
+    body = doc.element.body
+    content = [child for child in body if not child.tag.endswith("}sectPr")]
+    sect = body[-1] if len(body) and body[-1].tag.endswith("}sectPr") else None
+    for _ in range(copies - 1):
+        for child in content:
+            clone = copy.deepcopy(child)
+            if sect is not None:
+                sect.addprevious(clone)
+            else:
+                body.append(clone)
+    out = str(Path(out_dir) / f"{Path(path).stem}_x{copies}.docx")
+    doc.save(out)
+    return out
+
+
+def _parsed(path: str, section: str, table_index):
+    return preview_section_text(path, section, table_index, doc=Document(path))
+
+
+def _peak_growth_kb(reader: str, path: str, section: str, table_index) -> int:
+    fn = _parsed if reader == "parse" else read_section_text
+    blank = io.BytesIO()
+    Document().save(blank)
+    fn(io.BytesIO(blank.getvalue()), "HEADER", None)  # imports and one-off setup, on the blank template
+    gc.collect()
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")  # resets the peak (VmHWM) to the current RSS
+    before = _status_kb("VmHWM")
+    fn(path, section, table_index)
+    return _status_kb("VmHWM") - before
+
+
+def _status_kb(field: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def _fresh(fn, *args):
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def _ms(fn, repeat: int) -> float:
+    t = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t) * 1000 / repeat
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("paths", nargs="+")
+    ap.add_argument("-n", type=int, default=50)
+    ap.add_argument("--pad", type=int, nargs="*", default=[10, 100], help="body repeated this many times")
+    args = ap.parse_args()
+    tmp = tempfile.mkdtemp()
+    paths = [p for path in args.paths for p in [path] + [_padded(path, k, tmp) for k in args.pad]]
+
+    print(f"{'file':<20}{'xml KB':>8}  {'read':<16}{'parse ms':>10}{'stream ms':>11}{'parse KB':>10}{'stream KB':>11}")
+    for path in paths:
+        xml_kb = zipfile.ZipFile(path).getinfo("word/document.xml").file_size / 1024
+        last_entry = len(Document(path).tables) - 1
+        for label, section, ti in (("SUMMARY", "SUMMARY", None), (f"EXPERIENCE #{last_entry}", "EXPERIENCE", last_entry)):
+            assert _parsed(path, section, ti) == read_section_text(path, section, ti)
+            parse = _ms(lambda: _parsed(path, section, ti), args.n)
+            stream = _ms(lambda: read_section_text(path, section, ti), args.n)
+            parse_kb = _fresh(_peak_growth_kb, "parse", path, section, ti)
+            stream_kb = _fresh(_peak_growth_kb, "stream", path, section, ti)
+            print(f"{Path(path).name[:19]:<20}{xml_kb:>8.0f}  {label:<16}{parse:>10.2f}{stream:>11.2f}{parse_kb:>10}{stream_kb:>11}")
+
+
+if __name__ == "__main__":
+    main()
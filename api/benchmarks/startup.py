@@ -0,0 +1,74 @@
+"""
+Cold start: import time and time-to-first-response, each in fresh processes.
+
+    cd api && python -m benchmarks.startup [-n 7]
+
+api lazy   create_app(), services imported by the first request needing them
+api warm   create_app(warm=True): every service imported at startup (as before)
+edit.py    importing the CLI (editors now load after the menu choice)
+
+Per run: wall time of the whole process, the app import, startup, the
+first light request (GET /resume, metadata index only) and the first heavy
+one (POST /resume/rank: numpy + inverted index). Medians over n runs.
+starlette's TestClient is imported before the clock starts.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parents[1]
+REPO_ROOT = API_DIR.parent
+
+_CHILD = """
+from starlette.testclient import TestClient
+import json, time
+t0 = time.perf_counter()
+from app.main import create_app
+t1 = time.perf_counter()
+app = create_app(warm={warm})
+with TestClient(app) as c:
+    t2 = time.perf_counter()
+    c.get("/resume", params={{"limit": 1}})
+    t3 = time.perf_counter()
+    c.post("/resume/rank", json={{"job_description": "python", "top_k": 1}})
+    t4 = time.perf_counter()
+print(json.dumps({{"import": t1 - t0, "startup": t2 - t1, "first": t3 - t2, "heavy": t4 - t3}}))
+"""
+
+
+def _run(args: list[str], cwd: Path) -> tuple[float, dict]:
+    t = time.perf_counter()
+    out = subprocess.run([sys.executable, *args], cwd=cwd, capture_output=True, text=True, check=True).stdout
+    wall = time.perf_counter() - t
+    last = out.strip().splitlines()[-1] if out.strip() else "{}"
+    return wall, json.loads(last) if last.startswith("{") else {}
+
+
+def _median_ms(values) -> str:
+    return f"{statistics.median(values) * 1000:8.1f}"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=7)
+    args = ap.parse_args()
+
+    print(f"{'':<12}{'process':>9}{'import':>9}{'startup':>9}{'1st GET':>9}{'1st rank':>9}   (ms)")
+    for label, warm in (("api lazy", False), ("api warm", True)):
+        runs = [_run(["-c", _CHILD.format(warm=warm)], API_DIR) for _ in range(args.n)]
+        cols = [_median_ms(w for w, _ in runs)] + [
+            _median_ms(r[k] for _, r in runs) for k in ("import", "startup", "first", "heavy")
+        ]
+        print(f"{label:<12}" + " ".join(cols))
+
+    walls = [_run(["-c", "import edit"], REPO_ROOT)[0] for _ in range(args.n)]
+    bare = [_run(["-c", "pass"], REPO_ROOT)[0] for _ in range(args.n)]
+    print(f"{'edit.py':<12}{_median_ms(walls)}{_median_ms([w - b for w, b in zip(walls, bare)])}")
+
+
+if __name__ == "__main__":
+    main()
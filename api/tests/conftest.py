@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+from docx import Document
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # api/, for "app"
+
+# read by app.config on import: the tests' documents and indexes stay out of .work
+os.environ.setdefault("RESUME_WORK_DIR", tempfile.mkdtemp(prefix="resume-tests-"))
+os.environ.setdefault("RESUME_REAPER_ENABLED", "0")
+
+
+def _entry(doc, left: str, right: str, bullets: list[str]):
+    cells = doc.add_table(rows=1, cols=2).rows[0].cells
+    cells[0].text = left
+    cells[1].text = right
+    for b in bullets:
+        doc.add_paragraph(b, style="List Bullet")
+
+
+@pytest.fixture
+def template_resume(tmp_path) -> Path:
+    """
+    A resume laid out like the template the editors expect: education in
+    table 0, experience in tables 1-3, projects in tables 4-6.
+    """
+    doc = Document()
+    doc.add_paragraph("JANE DOE")
+    doc.add_paragraph("Boston, MA | jane@example.com | 555-0100")
+    doc.add_paragraph("")
+    doc.add_paragraph("SUMMARY")
+    doc.add_paragraph("Data engineer with eight years of pipelines.")
+    doc.add_paragraph("Python, SQL and Spark.")
+    doc.add_paragraph("EDUCATION")
+    _entry(doc, "MIT - B.S. Computer Science", "2019", [])
+    doc.add_paragraph("EXPERIENCE")
+    _entry(doc, "Acme Corp - Data Engineer", "2022 - Present",
+           ["Built Spark ETL pipelines.", "Cut query latency 40%.", "Mentored two engineers."])
+    _entry(doc, "Globex - Analyst", "2020 - 2022", ["Owned the KPI dashboards."])
+    doc.add_paragraph("Contract work, not a bullet.")
+    _entry(doc, "Initech - Intern", "2019", ["Wrote tests.", "SHIPPED CI."])
+    doc.add_paragraph("PROJECTS")
+    _entry(doc, "Resume Optimizer", "2024", ["FastAPI service editing .docx resumes."])
+    _entry(doc, "Query Planner", "2023", [])
+    _entry(doc, "Log Shipper", "2021", ["Kafka to S3.", "Backpressure handling."])
+    doc.add_paragraph("TECHNICAL SKILLS")
+    doc.add_paragraph("Languages: Python, Go, SQL")
+    doc.add_paragraph("Cloud: AWS")
+    path = tmp_path / "resume.docx"
+    doc.save(str(path))
+    return path
+
+
+@pytest.fixture
+def client():
+    from starlette.testclient import TestClient
+    from app.main import create_app
+
+    return TestClient(create_app(warm=False))
+
+
+@pytest.fixture
+def uploaded(client, template_resume) -> str:
+    """
+    Resume id of template_resume, uploaded.
+    """
+    with template_resume.open("rb") as f:
+        r = client.post("/resume/upload", files={"file": ("resume.docx", f)})
+    assert r.status_code == 200, r.text
+    return r.json()["resume_id"]
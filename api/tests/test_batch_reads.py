@@ -0,0 +1,48 @@
+import os
+
+from app.services import export, inverted_index, meta_index, outline, outline_store, storage
+from app.services.storage import resume_dir
+
+OLD = 1_000_000_000.0  # last access long ago, as the reaper sees it
+
+
+def _age(rid):
+    os.utime(resume_dir(rid), (OLD, OLD))
+
+
+def test_export_is_no_access(uploaded):
+    _age(uploaded)
+    rec = export.record(uploaded)
+    assert rec["resume_id"] == uploaded and rec["version"] == 1
+    assert resume_dir(uploaded).stat().st_mtime == OLD
+
+
+def test_export_parse_is_no_access(uploaded):
+    # nothing cached: the outline is built from the stored bytes
+    outline._outlines.discard_where(lambda k: k[0] == uploaded)
+    outline_store.forget(uploaded)
+    meta_index.forget(uploaded)
+    _age(uploaded)
+    rec = export.record(uploaded)
+    assert "EXPERIENCE" in [s["name"] for s in rec["sections"]]
+    assert resume_dir(uploaded).stat().st_mtime == OLD
+
+
+def test_reindex_is_no_access(uploaded):
+    inverted_index.remove(uploaded)
+    _age(uploaded)
+    assert inverted_index.rebuild() >= 1
+    assert resume_dir(uploaded).stat().st_mtime == OLD
+
+
+def test_reindex_skips_up_to_date(uploaded, monkeypatch):
+    inverted_index.rebuild()
+    read = []
+    real = storage.read_current
+    monkeypatch.setattr(storage, "read_current", lambda rid: read.append(rid) or real(rid))
+    assert inverted_index.rebuild() == 0
+    assert read == []
+
+    inverted_index.remove(uploaded)
+    assert inverted_index.rebuild() == 1
+    assert read == [uploaded]
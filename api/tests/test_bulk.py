@@ -0,0 +1,40 @@
+import io
+import json
+import zipfile
+
+from app.services import bulk
+
+
+def _zip(**entries) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as z:
+        for name, data in entries.items():
+            z.writestr(name, data)
+    return buf.getvalue()
+
+
+def test_bulk_reads_the_request_files_while_streaming(client, template_resume):
+    data = template_resume.read_bytes()
+    r = client.post(
+        "/resume/bulk",
+        files=[
+            ("files", ("batch.zip", _zip(**{"a.docx": data, "b.docx": data, "notes.txt": b"x"}), "application/zip")),
+            ("files", ("single.docx", data, "application/octet-stream")),
+        ],
+        params={"dedupe_existing": False},
+    )
+    assert r.status_code == 200
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert lines[-1] == {"status": "done", "stored": 1, "duplicates": 2, "errors": 1}
+    by_name = {line["name"]: line for line in lines[:-1]}
+    assert by_name["batch.zip/notes.txt"]["status"] == "error"
+    assert {by_name[n]["status"] for n in ("batch.zip/a.docx", "batch.zip/b.docx", "single.docx")} == {"stored", "duplicate"}
+
+
+def test_entries_read_each_file_when_reached(template_resume):
+    first, second = io.BytesIO(template_resume.read_bytes()), io.BytesIO(b"not a zip")
+    entries = bulk._entries([("a.docx", first), ("b.zip", second)])
+    name, data, error = next(entries)
+    assert (name, error) == ("a.docx", None) and data == first.getvalue()
+    assert second.tell() == 0  # not touched yet
+    assert next(entries) == ("b.zip", None, "not a zip archive")
@@ -0,0 +1,19 @@
+from app.services import dedupe
+
+
+def test_signature_is_exact_modular_hash():
+    assert int(dedupe._A.max()) < dedupe.PRIME < 1 << 32
+    assert int(dedupe._B.max()) < dedupe.PRIME
+    sh = {0, 1, 12345, (1 << 32) - 1, (1 << 32) - 6}   # crc32 values up to 2^32 - 1
+    expected = [
+        min((int(a) * x + int(b)) % dedupe.PRIME for x in sh)
+        for a, b in zip(dedupe._A, dedupe._B)
+    ]
+    assert dedupe._signature(sh).tolist() == expected
+
+
+def test_signature_estimates_jaccard():
+    a = dedupe._shingles("Built Spark ETL pipelines on AWS processing 2TB a day.")
+    b = dedupe._shingles("Built Spark ETL pipelines on AWS processing 3TB a day.")
+    same = (dedupe._signature(a) == dedupe._signature(b)).mean()
+    assert abs(same - dedupe._jaccard(a, b)) < 0.15
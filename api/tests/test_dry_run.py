@@ -0,0 +1,25 @@
+from app import config
+from app.services import hot_docs
+from app.services.cache import LRUCache
+from app.services.storage import get_current_path
+
+
+def test_parsed_documents_bounded_by_config(client, template_resume, monkeypatch):
+    assert hot_docs._parsed.maxsize == config.PARSED_DOCS_MAX
+    monkeypatch.setattr(hot_docs, "_parsed", LRUCache(maxsize=2))
+    for i in range(3):
+        with template_resume.open("rb") as f:
+            rid = client.post("/resume/upload", files={"file": ("resume.docx", f)}).json()["resume_id"]
+        assert client.patch(f"/resume/{rid}/summary", json={"summary": f"Summary {i}."}).status_code == 200
+    assert len(hot_docs._parsed) == 2
+
+
+def test_dry_run_without_parsed_copies(client, uploaded, monkeypatch):
+    monkeypatch.setattr(hot_docs, "_parsed", LRUCache(maxsize=0))
+    before = get_current_path(uploaded).read_bytes()
+    r = client.patch(f"/resume/{uploaded}/summary", params={"dry_run": True}, json={"summary": "Only a draft."})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["dry_run"] and body["changed"] and body["version"] == 1
+    assert "Only a draft." in body["preview"]
+    assert get_current_path(uploaded).read_bytes() == before
@@ -0,0 +1,52 @@
+import pytest
+from docx import Document
+
+from app.services import editor, meta_index
+from app.services.storage import get_current_path, resume_dir
+
+
+def _bullets(client, rid, table_index=1):
+    return client.get(f"/resume/{rid}/preview/EXPERIENCE", params={"table_index": table_index}).json()["preview_text"]
+
+
+def test_expected_version_conflict(client, uploaded):
+    r = client.patch(f"/resume/{uploaded}/EXPERIENCE/bullets/1/0", json={"text": "Rewritten.", "expected_version": 1})
+    assert r.status_code == 200 and r.json()["version"] == 2
+    r = client.patch(f"/resume/{uploaded}/EXPERIENCE/bullets/1/0", json={"text": "Stale.", "expected_version": 1})
+    assert r.status_code == 409
+    assert r.json()["detail"]["current_version"] == 2
+
+
+def test_commit_based_on_old_version_is_refused(client, uploaded, tmp_path):
+    # another worker's edit, started at version 1, commits after this one
+    stale = tmp_path / "stale.docx"
+    Document(str(get_current_path(uploaded))).save(str(stale))
+    assert client.patch(f"/resume/{uploaded}/summary", json={"summary": "Newer summary."}).status_code == 200
+    saved = get_current_path(uploaded).read_bytes()
+
+    with pytest.raises(meta_index.VersionConflict):
+        editor._published(uploaded, stale, {}, 1, doc=Document(str(stale)))
+    assert meta_index.get_version(uploaded) == 2
+    assert get_current_path(uploaded).read_bytes() == saved
+
+
+def test_record_is_compare_and_swap(uploaded):
+    meta = dict(meta_index.get(uploaded), entries={})
+    written = []
+    with pytest.raises(meta_index.VersionConflict):
+        meta_index.record(uploaded, meta, expected_version=0, write=lambda: written.append(1))
+    assert not written
+    assert meta_index.record(uploaded, meta, expected_version=1, write=lambda: written.append(1)) == 2
+    assert written == [1]
+
+
+def test_edits_leave_no_scratch_files(client, uploaded):
+    assert client.patch(f"/resume/{uploaded}/summary", json={"summary": "Another summary."}).status_code == 200
+    assert sorted(p.name for p in resume_dir(uploaded).iterdir()) == ["current.docx", "original.docx", "resume.docx"]
+
+
+def test_blank_bullet_edit_rejected(client, uploaded):
+    before = _bullets(client, uploaded)
+    r = client.patch(f"/resume/{uploaded}/EXPERIENCE/bullets/1/0", json={"text": "   "})
+    assert r.status_code == 400
+    assert _bullets(client, uploaded) == before
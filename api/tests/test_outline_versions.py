@@ -0,0 +1,59 @@
+from contextlib import contextmanager
+
+from docx import Document
+
+from app.models import PatchSummaryRequest
+from app.services import editor, hot_docs, outline, outline_store, scoring
+from app.services.storage import get_current_path
+
+
+def _forget_outlines(rid):
+    outline._outlines.discard_where(lambda k: k[0] == rid)
+    outline_store.forget(rid)
+
+
+def test_commit_while_outline_is_read(uploaded, monkeypatch):
+    _forget_outlines(uploaded)
+    reading = hot_docs.reading
+
+    @contextmanager
+    def racing(rid):
+        # another request commits version 2 after get_outline read version 1
+        editor.apply_summary_patch(rid, PatchSummaryRequest(summary="Committed meanwhile."))
+        with reading(rid) as doc:
+            yield doc
+
+    monkeypatch.setattr(hot_docs, "reading", racing)
+    o = outline.get_outline(uploaded)
+    assert o.version == 2
+    assert o.preview("SUMMARY") == "Committed meanwhile."
+    assert outline.cached_outline(uploaded) is o
+
+
+def test_older_outline_does_not_evict_newer(uploaded):
+    editor.apply_summary_patch(uploaded, PatchSummaryRequest(summary="Version two."))
+    newest = outline.cached_outline(uploaded)
+    assert newest.version == 2
+    old = outline.build_outline(Document(str(get_current_path(uploaded))), 1)
+    outline._remember(uploaded, old)
+    assert outline._outlines.get((uploaded, 2)) is newest
+
+
+def test_file_of_unfinished_commit_is_not_published(uploaded):
+    # bytes another worker wrote before its version shows up
+    _forget_outlines(uploaded)
+    doc = Document(str(get_current_path(uploaded)))
+    doc.add_paragraph("Written by another worker.")
+    doc.save(str(get_current_path(uploaded)))
+
+    o = outline.get_outline(uploaded)
+    assert o.version is None
+    assert outline.cached_outline(uploaded) is None
+
+
+def test_term_index_keyed_by_outline_version(uploaded):
+    assert scoring.get_term_index(uploaded)[0] == 1
+    editor.apply_summary_patch(uploaded, PatchSummaryRequest(summary="Spark and Kafka."))
+    version, idx = scoring.get_term_index(uploaded)
+    assert version == 2
+    assert scoring._index_cache.get((uploaded, 1)) is None
@@ -0,0 +1,38 @@
+from docx import Document
+
+from app.services.outline import build_outline, dumps, loads
+from app.services.preview import preview_section_text
+from app.services.section_reader import read_section_text
+
+SECTIONS = ["HEADER", "SUMMARY", "EDUCATION", "EXPERIENCE", "PROJECTS", "TECHNICAL SKILLS", "NOT A SECTION"]
+
+
+def _cases(doc):
+    for section in SECTIONS:
+        yield section, None
+    for section in ("EXPERIENCE", "PROJECTS"):
+        for ti in range(-1, len(doc.tables) + 1):
+            yield section, ti
+
+
+def test_outline_preview_matches_parsed_preview(template_resume):
+    doc = Document(str(template_resume))
+    outline = build_outline(doc)
+    stored = loads(dumps(outline))
+    for section, ti in _cases(doc):
+        expected = preview_section_text(str(template_resume), section, ti, doc=doc)
+        assert outline.preview(section, ti) == expected, (section, ti)
+        assert stored.preview(section, ti) == expected, (section, ti)
+
+
+def test_streamed_preview_matches_parsed_preview(template_resume):
+    doc = Document(str(template_resume))
+    for section, ti in _cases(doc):
+        expected = preview_section_text(str(template_resume), section, ti, doc=doc)
+        assert read_section_text(str(template_resume), section, ti) == expected, (section, ti)
+
+
+def test_generic_preview_skips_table_headers(template_resume):
+    outline = build_outline(Document(str(template_resume)))
+    assert "|" not in outline.preview("EXPERIENCE")
+    assert outline.preview("EDUCATION") == "(No preview text found for EDUCATION. Download to verify.)"
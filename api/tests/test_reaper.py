@@ -0,0 +1,62 @@
+import os
+import threading
+import time
+
+from app.models import PatchSummaryRequest
+from app.services import editor, hot_docs, inverted_index, meta_index, outline, outline_store
+from app.services.reaper import Reaper
+from app.services.storage import delete_resume, resume_dir
+
+OLD = 1_000_000_000.0
+
+
+def _warm(rid):
+    editor.apply_summary_patch(rid, PatchSummaryRequest(summary="Cached everywhere."))
+    outline.get_outline(rid)
+    hot_docs.snapshot(rid)
+    inverted_index.rebuild()
+
+
+def _assert_forgotten(rid):
+    assert meta_index.get(rid) is None
+    assert hot_docs._parsed.get(rid) is None
+    assert hot_docs.peek(rid) is None
+    assert outline._outlines.get((rid, 2)) is None
+    assert outline_store.get(rid, 2) is None
+    assert rid not in dict(inverted_index._conn().execute("SELECT resume_id, version FROM docs"))
+
+
+def test_reaped_resume_is_forgotten(uploaded):
+    _warm(uploaded)
+    d = resume_dir(uploaded)
+    os.utime(d, (OLD, OLD))
+
+    report = Reaper(ttl_seconds=3600).run_pass()
+    assert uploaded in report["expired"]
+    assert not d.exists()
+    _assert_forgotten(uploaded)
+
+
+def test_reaper_skips_a_resume_used_while_it_waited(uploaded):
+    d = resume_dir(uploaded)
+    os.utime(d, (OLD, OLD))
+    reaper = Reaper(ttl_seconds=3600)
+
+    with hot_docs.resume_lock(uploaded):
+        t = threading.Thread(target=reaper.run_pass)
+        t.start()
+        time.sleep(0.2)   # the reaper waits for the lock
+        assert d.exists()
+        os.utime(d)       # e.g. the edit holding the lock
+    t.join()
+
+    assert d.exists()
+    assert uploaded not in reaper.last_report["expired"]
+    assert meta_index.get_version(uploaded) == 1
+
+
+def test_delete_resume_is_forgotten(uploaded):
+    _warm(uploaded)
+    delete_resume(uploaded)
+    assert not resume_dir(uploaded).exists()
+    _assert_forgotten(uploaded)
@@ -0,0 +1,43 @@
+import uuid
+
+import pytest
+
+from app.services.backends import ShardedFSBackend, shard_of
+from app.services.storage import is_resume_id, resume_dir
+
+
+def test_legacy_adoption_leaves_shard_dirs_alone(tmp_path):
+    tree = ShardedFSBackend(tmp_path, legacy_root=tmp_path)
+    rid = str(uuid.uuid4())
+    tree.put(rid, "current.docx", b"x")
+    a, _ = shard_of(rid)
+
+    tree.dir_for(a)  # a lookup by a shard's name must not move the shard
+    assert (tmp_path / a).is_dir()
+    assert tree.stat(rid, "current.docx") is not None
+
+
+def test_legacy_dir_adopted_on_lookup(tmp_path):
+    tree = ShardedFSBackend(tmp_path, legacy_root=tmp_path)
+    rid = str(uuid.uuid4())
+    (tmp_path / rid).mkdir()
+    (tmp_path / rid / "current.docx").write_bytes(b"x")
+
+    assert tree.get(rid, "current.docx") == b"x"
+    assert not (tmp_path / rid).exists()
+
+
+def test_resume_ids_are_uuids():
+    rid = str(uuid.uuid4())
+    assert is_resume_id(rid)
+    for bad in ("5d", "..", rid.upper(), rid + "/x", ""):
+        assert not is_resume_id(bad)
+        with pytest.raises(ValueError):
+            resume_dir(bad)
+
+
+def test_routes_404_for_non_ids(client):
+    assert client.get("/resume/5d/meta").status_code == 404
+    assert client.get("/resume/5d/download").status_code == 404
+    r = client.get(f"/resume/{uuid.uuid4()}/duplicates", params={"compare_with": ["5d"]})
+    assert r.status_code == 404
@@ -0,0 +1,39 @@
+import io
+import struct
+import zipfile
+
+import pytest
+
+from app.services.bulk import _entries
+from app.services.upload_check import InvalidDocx, check_docx
+
+
+def _corrupt_deflate(path) -> bytes:
+    """
+    The .docx at path with word/document.xml's deflate stream broken (an
+    invalid block type), its sizes and CRC left as declared.
+    """
+    data = bytearray(path.read_bytes())
+    with zipfile.ZipFile(path) as zf:
+        info = zf.getinfo("word/document.xml")
+    name_len, extra_len = struct.unpack_from("<2H", data, info.header_offset + 26)  # local file header
+    start = info.header_offset + 30 + name_len + extra_len
+    data[start] = 0xFF
+    return bytes(data)
+
+
+def test_corrupt_deflate_is_invalid(template_resume):
+    check_docx(io.BytesIO(template_resume.read_bytes()))
+    with pytest.raises(InvalidDocx) as e:
+        check_docx(io.BytesIO(_corrupt_deflate(template_resume)))
+    assert e.value.status_code == 400
+
+
+def test_bulk_skips_corrupt_entry(template_resume, tmp_path):
+    archive = tmp_path / "batch.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("bad.docx", _corrupt_deflate(template_resume))
+        zf.writestr("good.docx", template_resume.read_bytes())
+    results = {name: error for name, _, error in _entries([("batch.zip", archive)])}
+    assert results["batch.zip/bad.docx"]
+    assert results["batch.zip/good.docx"] is None
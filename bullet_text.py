@@ -0,0 +1,11 @@
+# bullet_text.py
+import re
+
+
+def sanitize_bullet_text(s: str) -> str:
+    s = s.strip()
+    # remove leading bullet chars like "•", "-", "*", "·"
+    s = re.sub(r"^[•\-\*·]+\s*", "", s)  # • - * ·
+    # also remove accidental multiple leading bullets/spaces like "•    •    text"
+    s = re.sub(r"^(?:[•\-\*·]\s*)+", "", s)
+    return s.strip()
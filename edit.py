@@ -1,20 +1,16 @@
 # editing.py
 from pathlib import Path
-import re
-from education_table_edit import EducationTableEditor
-from summary_section_edit import SummaryEditor
-from header_edit_class import HeaderEditor
-from skills_edit import SkillsEditor
-from experience_edit import ExperienceEditor
-
-def sanitize_bullet_text(s: str) -> str:
-    s = s.strip()
-    # remove leading bullet chars like "•", "-", "*", "·"
-    s = re.sub(r"^[\u2022\-\*\u00B7]+\s*", "", s)  # • - * ·
-    # also remove accidental multiple leading bullets/spaces like "•    •    text"
-    s = re.sub(r"^(?:[\u2022\-\*\u00B7]\s*)+", "", s)
-    return s.strip()
+import importlib
+import threading
+from typing import TYPE_CHECKING
 
+from bullet_text import sanitize_bullet_text
+
+if TYPE_CHECKING:
+    from experience_edit import ExperienceEditor
+
+# the editors (and python-docx under them) are imported once a choice is made;
+# main() starts loading python-docx in the background while the menu is up
 
 def prompt_keep(label: str, old: str) -> str:
     val = input(f"{label} [{old}]: ").strip()
@@ -47,7 +43,7 @@ def paste_bullets_done() -> list[str]:
     current: list[str] = []
 
     def flush_current():
-        nonlocal current, bullets
+        nonlocal current
         if not current:
             return
         text = " ".join(" ".join(current).split()).strip()
@@ -74,7 +70,7 @@ def paste_bullets_done() -> list[str]:
 
 
 def edit_table_section_scoped(
-    editor: ExperienceEditor,
+    editor: "ExperienceEditor",
     section_label: str,
     rp: Path,
     table_indices: list[int],
@@ -155,6 +151,8 @@ def main():
         print("❌ File not found.")
         return
 
+    threading.Thread(target=importlib.import_module, args=("docx",), daemon=True).start()
+
     print("\nChoose what to edit:")
     print("1) Header (Location/Phone/Email/Links)")
     print("2) Summary")
@@ -166,6 +164,7 @@ def main():
     choice = input("Enter 1/2/3/4/5/6: ").strip()
 
     if choice == "1":
+        from header_edit_class import HeaderEditor
         editor = HeaderEditor(str(rp))
         cur = editor.get_current()
         print("\n=== Current Header ===")
@@ -185,6 +184,7 @@ def main():
         print("\n✅ Saved:", out_path)
 
     elif choice == "2":
+        from summary_section_edit import SummaryEditor
         editor = SummaryEditor(str(rp))
         print("\n=== Current SUMMARY ===")
         print(editor.get_current())
@@ -197,6 +197,7 @@ def main():
         print("\n✅ Saved:", out_path)
 
     elif choice == "3":
+        from education_table_edit import EducationTableEditor
         editor = EducationTableEditor(str(rp), table_index=0, row_index=0)
         cur = editor.get_current()
 
@@ -215,6 +216,7 @@ def main():
         print("\n✅ Saved:", out_path)
 
     elif choice == "4":
+        from skills_edit import SkillsEditor
         editor = SkillsEditor(str(rp))
 
         print("\n=== Current TECHNICAL SKILLS ===")
@@ -238,11 +240,13 @@ def main():
         print("\n✅ Saved:", out_path)
 
     elif choice == "5":
+        from experience_edit import ExperienceEditor
         exp = ExperienceEditor(str(rp))
         exp_tables = [1, 2, 3]
         edit_table_section_scoped(exp, "company", rp, exp_tables, "EXPERIENCE_EDITED")
 
     elif choice == "6":
+        from experience_edit import ExperienceEditor
         proj = ExperienceEditor(str(rp))
         proj_tables = [4, 5, 6]
         edit_table_section_scoped(proj, "project", rp, proj_tables, "PROJECTS_EDITED")
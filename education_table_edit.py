@@ -4,9 +4,10 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 
 
 class EducationTableEditor:
-    def __init__(self, resume_path: str, table_index: int = 0, row_index: int = 0):
+    def __init__(self, resume_path: str, table_index: int = 0, row_index: int = 0, doc=None):
         self.resume_path = resume_path
-        self.doc = Document(resume_path)
+        # an already-parsed Document can be passed in to skip re-parsing
+        self.doc = doc if doc is not None else Document(resume_path)
         self.table_index = table_index
         self.row_index = row_index
 
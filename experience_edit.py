@@ -1,13 +1,19 @@
 # experience_edit.py
 from docx import Document
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
 from copy import deepcopy
 
+from style_index import style_index
+
 
 class ExperienceEditor:
-    def __init__(self, resume_path: str):
+    def __init__(self, resume_path: str, doc=None):
         self.resume_path = resume_path
-        self.doc = Document(resume_path)
+        # an already-parsed Document can be passed in to skip re-parsing
+        self.doc = doc if doc is not None else Document(resume_path)
 
     # --------------------------
     # Table header helpers
@@ -64,10 +70,10 @@ class ExperienceEditor:
         return list(self.doc._body._element)
 
     def _paragraph_from_elem(self, elem):
-        for p in self.doc.paragraphs:
-            if p._p is elem:
-                return p
-        return None
+        # wrap the body-level <w:p> directly (no scan of doc.paragraphs)
+        if elem is None or not elem.tag.endswith("}p"):
+            return None
+        return Paragraph(elem, self.doc._body)
 
     def _delete_paragraph(self, paragraph):
         el = paragraph._element
@@ -94,20 +100,11 @@ class ExperienceEditor:
     # Paragraph format helpers
     # --------------------------
     def _is_bullet_paragraph(self, p) -> bool:
-        # true numbering/bullets in XML
-        if p._p is not None and p._p.pPr is not None and p._p.pPr.numPr is not None:
-            return True
-
-        # style heuristics
-        try:
-            style_name = (p.style.name or "").lower()
-        except Exception:
-            style_name = ""
-        if "list" in style_name or "bullet" in style_name:
-            return True
-
-        # literal bullet char
-        return (p.text or "").lstrip().startswith("•")
+        # numbering (direct or via the style's numPr), list/bullet style names
+        # or a literal bullet char; styles/numbering resolved once per document
+        if p._p is None:
+            return False
+        return style_index(self.doc).is_bullet(p._p, p.text or "")
 
     def _set_para_spacing(self, p, space_before=None, space_after=None):
         pf = p.paragraph_format
@@ -250,6 +247,10 @@ class ExperienceEditor:
         return [(p.text or "").strip() for p in self.get_bullets_after_table(table_index)]
 
     def edit_bullet(self, table_index: int, bullet_index: int, new_text: str):
+        new_text = new_text.strip()
+        if not new_text:
+            raise ValueError("No bullet text provided.")  # an empty bullet drops out of the entry on the next read
+
         bullets = self.get_bullets_after_table(table_index)
         if bullet_index < 0 or bullet_index >= len(bullets):
             raise ValueError("Invalid bullet index.")
@@ -265,6 +266,85 @@ class ExperienceEditor:
 
         p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
 
+    def _bullet_at(self, bullets: list, bullet_index: int):
+        if bullet_index < 0 or bullet_index >= len(bullets):
+            raise ValueError("Invalid bullet index.")
+        return bullets[bullet_index]
+
+    def _keep_block_edges(self, old_block: list, new_block: list):
+        """
+        The first/last bullet carry the block's outer spacing (space before the
+        first, space after the last). When a different paragraph ends up at an
+        edge, move that spacing over and reset the old edge to the style's.
+        """
+        old_first, old_last = old_block[0], old_block[-1]
+        new_first, new_last = new_block[0], new_block[-1]
+        if new_first._p is not old_first._p:
+            new_first.paragraph_format.space_before = old_first.paragraph_format.space_before
+            if old_first._p is not None and old_first._p.getparent() is not None:
+                old_first.paragraph_format.space_before = 0  # like every inner bullet
+        if new_last._p is not old_last._p:
+            new_last.paragraph_format.space_after = old_last.paragraph_format.space_after
+            if old_last._p is not None and old_last._p.getparent() is not None:
+                old_last.paragraph_format.space_after = None
+
+    def insert_bullet(self, table_index: int, bullet_index: int | None, text: str):
+        """
+        Insert one bullet before bullet_index (None = after the last one),
+        formatted like the entry's first bullet. Returns the new bullet list.
+        """
+        text = text.strip()
+        if not text:
+            raise ValueError("No bullet text provided.")
+        bullets = self.get_bullets_after_table(table_index)
+        if not bullets:
+            raise ValueError("No bullet block detected under this entry. Not modifying to avoid breaking layout.")
+        if bullet_index is None or bullet_index == len(bullets):
+            anchor = bullets[-1]._p.getnext()  # right after the last bullet (None: end of body)
+        else:
+            anchor = self._bullet_at(bullets, bullet_index)._p
+
+        template_p = bullets[0]
+        proto = self._bullet_prototype(template_p, template_p.runs[0] if template_p.runs else None)
+        self._insert_bullet_block(proto, [text], anchor)
+
+        new_block = self.get_bullets_after_table(table_index)
+        self._keep_block_edges(bullets, new_block)
+        return new_block
+
+    def delete_bullet(self, table_index: int, bullet_index: int):
+        """
+        Remove one bullet. The last bullet of an entry can't be deleted (the
+        block is what later edits anchor on). Returns the new bullet list.
+        """
+        bullets = self.get_bullets_after_table(table_index)
+        p = self._bullet_at(bullets, bullet_index)
+        if len(bullets) == 1:
+            raise ValueError("Cannot delete the only bullet of an entry; replace it instead.")
+        rest = [b for b in bullets if b is not p]
+        self._keep_block_edges(bullets, rest)
+        self._delete_paragraph(p)
+        return rest
+
+    def move_bullet(self, table_index: int, from_index: int, to_index: int):
+        """
+        Move one bullet so it ends up at to_index. Returns the new bullet list.
+        """
+        bullets = self.get_bullets_after_table(table_index)
+        p = self._bullet_at(bullets, from_index)
+        self._bullet_at(bullets, to_index)
+        if from_index == to_index:
+            return bullets
+
+        order = [b for b in bullets if b is not p]
+        order.insert(to_index, p)
+        if to_index == len(order) - 1:
+            order[-2]._p.addnext(p._p)
+        else:
+            order[to_index + 1]._p.addprevious(p._p)
+        self._keep_block_edges(bullets, order)
+        return order
+
     def replace_all_bullets_scoped(
         self,
         table_index: int,
@@ -292,9 +372,6 @@ class ExperienceEditor:
         if template_p._p is None or template_p._p.pPr is None:
             raise ValueError("Template bullet paragraph has no pPr; cannot preserve bullet formatting.")
 
-        template_ppr = deepcopy(template_p._p.pPr)
-        template_style = template_p.style
-
         # anchor
         if next_table_override is not None:
             next_tbl_elem = self.doc.tables[next_table_override]._tbl
@@ -302,6 +379,7 @@ class ExperienceEditor:
             next_tbl_elem = self._find_next_table_elem(table_index)
 
         spacer_tpl = self._snapshot_spacer_before_elem(next_tbl_elem)
+        proto = self._bullet_prototype(template_p, template_run)
 
         # delete old bullets
         for p in reversed(bullets):
@@ -310,68 +388,61 @@ class ExperienceEditor:
         # remove gap before bullets
         self._remove_leading_empty_paragraphs_after_table(table_index)
 
-        # insert new bullets in NORMAL order
-        if next_tbl_elem is not None:
-            for b in new_bullets:
-                new_p = self.doc.add_paragraph("")
-                next_tbl_elem.addprevious(new_p._p)
-
-                # ensure pPr exists before removal/reinsert
-                if new_p._p.pPr is not None:
-                    new_p._p.remove(new_p._p.pPr)
-
-                new_p._p.insert(0, deepcopy(template_ppr))
-                new_p.style = template_style
-                new_p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-
-                r0 = new_p.add_run(b)
-                if template_run:
-                    self._copy_run_style(template_run, r0)
-
-                # prevent bullet paragraphs from adding extra space
-                self._set_para_spacing(new_p, space_before=0)
+        # insert new bullets in NORMAL order, as one block
+        new_block = self._insert_bullet_block(proto, new_bullets, next_tbl_elem)
 
-            # remove space before first bullet + ensure justify
-            new_block = self.get_bullets_after_table(table_index)
-            if new_block:
-                self._set_para_spacing(new_block[0], space_before=0)
-                new_block[0].alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-
-                # ✅ key fix: prevent 2-line gap before next header
-                self._set_para_spacing(new_block[-1], space_after=0)
+        # ✅ key fix: prevent 2-line gap before next header
+        self._set_para_spacing(new_block[-1], space_after=0)
 
+        if next_tbl_elem is not None:
             # enforce exactly ONE blank line before next header table
             self._remove_all_empty_paragraphs_before_elem(next_tbl_elem, max_remove=50)
             if keep_one_blank_line_before_next:
                 self._insert_one_clean_spacer_before_elem(next_tbl_elem, spacer_tpl, fallback_run_src=template_run)
-            else:
-                # user wants NO extra blank line
-                self._remove_all_empty_paragraphs_before_elem(next_tbl_elem, max_remove=50)
-
-        else:
-            # append to end (last entry)
-            body = self.doc._body._element
-            for b in new_bullets:
-                new_p = self.doc.add_paragraph("")
-                body.append(new_p._p)
-
-                if new_p._p.pPr is not None:
-                    new_p._p.remove(new_p._p.pPr)
 
-                new_p._p.insert(0, deepcopy(template_ppr))
-                new_p.style = template_style
-                new_p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+        return new_block
 
-                r0 = new_p.add_run(b)
-                if template_run:
-                    self._copy_run_style(template_run, r0)
-
-                self._set_para_spacing(new_p, space_before=0)
+    def _bullet_prototype(self, template_p, template_run):
+        """
+        One detached bullet <w:p> (template pPr + style, justified, no space
+        before, one styled run) that every new bullet is cloned from.
+        """
+        p_elem = OxmlElement("w:p")
+        p_elem.append(deepcopy(template_p._p.pPr))
+        proto = Paragraph(p_elem, self.doc._body)
+        proto.style = template_p.style
+        proto.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+        # prevent bullet paragraphs from adding extra space
+        self._set_para_spacing(proto, space_before=0)
+
+        r0 = proto.add_run("")
+        if template_run:
+            self._copy_run_style(template_run, r0)
+        return p_elem
+
+    def _insert_bullet_block(self, proto, texts: list[str], anchor) -> list:
+        """
+        Clone proto once per text and splice the whole block in with a single
+        insert: before anchor, or at the end of the body (ahead of sectPr).
+        Returns the new paragraphs.
+        """
+        block = []
+        for text in texts:
+            p_elem = deepcopy(proto)
+            # CT_R.text, as Run.text: "\t" / "\n" become w:tab / w:br, spaces keep xml:space
+            p_elem.find(qn("w:r")).text = text
+            block.append(p_elem)
+
+        if anchor is not None:
+            parent = anchor.getparent()
+            pos = parent.index(anchor)
+        else:
+            parent = self.doc._body._element
+            sect = parent.find(qn("w:sectPr"))
+            pos = parent.index(sect) if sect is not None else len(parent)
+        parent[pos:pos] = block
 
-            new_block = self.get_bullets_after_table(table_index)
-            if new_block:
-                self._set_para_spacing(new_block[0], space_before=0)
-                self._set_para_spacing(new_block[-1], space_after=0)
+        return [Paragraph(p_elem, self.doc._body) for p_elem in block]
 
     def save(self, output_path: str):
         self.doc.save(output_path)
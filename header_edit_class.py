@@ -9,9 +9,10 @@ class HeaderEditor:
     EMAIL_RE = re.compile(r"\b[\w\.-]+@[\w\.-]+\.\w+\b")
     PHONE_RE = re.compile(r"\+?\d[\d\-\s\(\)]{7,}\d")
 
-    def __init__(self, resume_path: str):
+    def __init__(self, resume_path: str, doc=None):
         self.resume_path = resume_path
-        self.doc = Document(resume_path)
+        # an already-parsed Document can be passed in to skip re-parsing
+        self.doc = doc if doc is not None else Document(resume_path)
 
     def _is_caps_header(self, text: str) -> bool:
         t = (text or "").strip()
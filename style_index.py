@@ -0,0 +1,202 @@
+# style_index.py
+from weakref import WeakKeyDictionary
+
+from docx.oxml.ns import qn
+
+
+class StyleInfo:
+    """
+    What bullet detection needs to know about one paragraph style, with
+    basedOn inheritance already applied.
+    """
+    __slots__ = ("style_id", "name", "num_id", "ilvl", "kind")
+
+    def __init__(self, style_id, name, num_id, ilvl, kind):
+        self.style_id = style_id
+        self.name = name
+        self.num_id = num_id
+        self.ilvl = ilvl
+        self.kind = kind    # "bullet" | "decimal" | ... (numFmt) or None
+
+    @property
+    def is_list(self) -> bool:
+        return self.num_id is not None
+
+
+class StyleIndex:
+    """
+    styleId -> StyleInfo and numId/ilvl -> numFmt, built once per document
+    from styles.xml and numbering.xml. Use style_index(doc) to get the
+    shared instance; bullet checks are then dict lookups instead of a
+    styles-part search per paragraph (p.style.name).
+    """
+
+    def __init__(self, doc=None, styles=None, numbering=None):
+        """
+        doc: a parsed Document. Readers without one pass the root elements
+        of styles.xml / numbering.xml instead (None when the part is absent).
+        """
+        if doc is not None:
+            styles, numbering = self._roots(doc)
+        self._levels = self._read_numbering(numbering)
+        self.styles = {}
+        self.default_style = None
+        self._read_styles(styles)
+
+    @staticmethod
+    def _roots(doc):
+        try:
+            numbering = doc.part.numbering_part.element
+        except (KeyError, NotImplementedError, AttributeError):
+            numbering = None
+        try:
+            styles = doc.styles.element
+        except Exception:
+            styles = None
+        return styles, numbering
+
+    # --------------------------
+    # numbering.xml
+    # --------------------------
+    def _read_numbering(self, root) -> dict:
+        """
+        {numId: {ilvl: numFmt}}, lvlOverride applied.
+        """
+        if root is None:
+            return {}
+
+        abstract = {}
+        for an in root.iterchildren(qn("w:abstractNum")):
+            abstract[an.get(qn("w:abstractNumId"))] = {
+                int(lvl.get(qn("w:ilvl"), 0)): self._num_fmt(lvl) for lvl in an.iterchildren(qn("w:lvl"))
+            }
+
+        levels = {}
+        for num in root.iterchildren(qn("w:num")):
+            ref = num.find(qn("w:abstractNumId"))
+            lv = dict(abstract.get(ref.get(qn("w:val")) if ref is not None else None, {}))
+            for ov in num.iterchildren(qn("w:lvlOverride")):
+                lvl = ov.find(qn("w:lvl"))
+                if lvl is not None:
+                    lv[int(ov.get(qn("w:ilvl"), 0))] = self._num_fmt(lvl)
+            levels[num.get(qn("w:numId"))] = lv
+        return levels
+
+    def _num_fmt(self, lvl):
+        f = lvl.find(qn("w:numFmt"))
+        return f.get(qn("w:val")) if f is not None else None
+
+    # --------------------------
+    # styles.xml
+    # --------------------------
+    def _read_styles(self, root):
+        if root is None:
+            return
+
+        raw = {}
+        for s in root.iterchildren(qn("w:style")):
+            if s.get(qn("w:type")) != "paragraph":
+                continue
+            sid = s.get(qn("w:styleId"))
+            name = s.find(qn("w:name"))
+            based = s.find(qn("w:basedOn"))
+            num_pr = s.find(qn("w:pPr") + "/" + qn("w:numPr"))
+            raw[sid] = (
+                name.get(qn("w:val")) if name is not None else sid,
+                based.get(qn("w:val")) if based is not None else None,
+                self._num_pr(num_pr),
+            )
+            if s.get(qn("w:default")) in ("1", "true"):
+                self.default_style = sid
+
+        for sid in raw:
+            self.styles[sid] = self._resolve(sid, raw)
+
+    def _num_pr(self, num_pr):
+        if num_pr is None:
+            return None, None
+        num_id = num_pr.find(qn("w:numId"))
+        ilvl = num_pr.find(qn("w:ilvl"))
+        return (
+            num_id.get(qn("w:val")) if num_id is not None else None,
+            int(ilvl.get(qn("w:val"))) if ilvl is not None else None,
+        )
+
+    def _resolve(self, sid, raw) -> StyleInfo:
+        name = raw[sid][0]
+        num_id = ilvl = None
+        cur, seen = sid, set()
+        # nearest numId / ilvl up the basedOn chain
+        while cur in raw and cur not in seen and (num_id is None or ilvl is None):
+            seen.add(cur)
+            _, based, (n, lv) = raw[cur]
+            num_id = n if num_id is None else num_id
+            ilvl = lv if ilvl is None else ilvl
+            cur = based
+        if num_id == "0":  # numId 0 switches inherited numbering off
+            num_id = None
+        return StyleInfo(sid, name, num_id, ilvl or 0, self.kind_of(num_id, ilvl or 0))
+
+    # --------------------------
+    # Lookups
+    # --------------------------
+    def kind_of(self, num_id, ilvl: int = 0):
+        if num_id is None:
+            return None
+        return self._levels.get(num_id, {}).get(ilvl)
+
+    def style_of(self, p_elem) -> StyleInfo | None:
+        ppr = p_elem.pPr
+        sid = ppr.pStyle.val if ppr is not None and ppr.pStyle is not None else self.default_style
+        return self.styles.get(sid)
+
+    def list_info(self, p_elem):
+        """
+        (numId, ilvl, kind) of a paragraph's numbering, direct numPr first and
+        then its style's; None if it is not in a list.
+        """
+        ppr = p_elem.pPr
+        style = self.style_of(p_elem)
+        if ppr is not None and ppr.numPr is not None:
+            num_id, ilvl = self._num_pr(ppr.numPr)
+            if num_id is None and style is not None:
+                num_id = style.num_id
+            if ilvl is None:
+                ilvl = style.ilvl if style is not None else 0
+            if num_id is None or num_id == "0":
+                return None
+            return num_id, ilvl, self.kind_of(num_id, ilvl)
+        if style is not None and style.is_list:
+            return style.num_id, style.ilvl, style.kind
+        return None
+
+    def is_bullet(self, p_elem, text: str | None = None) -> bool:
+        """
+        Same rules as before (numbering, "list"/"bullet" style names, a literal
+        "•"), now also true for lists inherited from the style's numPr.
+        """
+        if self.list_info(p_elem) is not None:
+            return True
+        style = self.style_of(p_elem)
+        name = (style.name if style is not None else "").lower()
+        if "list" in name or "bullet" in name:
+            return True
+        if text is None:
+            text = "".join(t.text or "" for t in p_elem.iter(qn("w:t")))
+        return text.lstrip().startswith("•")
+
+
+_indexes = WeakKeyDictionary()
+
+
+def style_index(doc) -> StyleIndex:
+    """
+    The StyleIndex of a document, built on first use and shared by every
+    editor / reader holding the same parsed document.
+    """
+    part = doc.part
+    idx = _indexes.get(part)
+    if idx is None:
+        idx = StyleIndex(doc)
+        _indexes[part] = idx
+    return idx
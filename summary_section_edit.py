@@ -6,9 +6,10 @@ import re
 class SummaryEditor:
     HEADING_RE = re.compile(r"^[A-Z0-9 &/\-]+$")
 
-    def __init__(self, resume_path: str):
+    def __init__(self, resume_path: str, doc=None):
         self.resume_path = resume_path
-        self.doc = Document(resume_path)
+        # an already-parsed Document can be passed in to skip re-parsing
+        self.doc = doc if doc is not None else Document(resume_path)
 
     def _is_caps_header(self, text: str) -> bool:
         t = (text or "").strip()